@@ -1,77 +1,468 @@
 import pandas as pd
+import numpy as np
 import os
 import re
+import json
+import hashlib
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-print("🚀 Script dimulai...")
+from master_store import PARQUET_AVAILABLE
+from sector_dim import get_sector_dimension, KOLOM_ATRIBUT, KOLOM_ID
 
 # --- 1. PENGATURAN PATH ---
 folder_path_kuartal = r'C:\Users\ASUS\Documents\Investasi\Rekap Analisa Fundamental\ID'
 file_path_sektor = r'C:\Users\ASUS\Documents\Investasi\Klasifikasi Sektor Subindustri.xlsx'
 output_path_csv = r'C:\Users\ASUS\Documents\Investasi\data_fundamental_konsolidasi.csv'
+# Output Parquet terpartisi Tahun/Kuartal (untuk Power BI/notebook), ditulis di samping CSV
+output_path_parquet = r'C:\Users\ASUS\Documents\Investasi\data_fundamental_konsolidasi_parquet'
+TULIS_PARQUET = True
+# True = tabel fakta membawa Kode Emiten + ID Emiten (integer) tanpa nama & kolom sektor; keduanya
+# ditulis sekali ke tabel dimensi terpisah (relasi ID Emiten di Power BI). False = kolom sektor di setiap baris.
+MODE_DIMENSI_SEKTOR = False
+output_path_dimensi = r'C:\Users\ASUS\Documents\Investasi\dim_sektor.csv'
 
-# --- 2. PROSES SEMUA FILE EXCEL KUARTALAN ---
-list_dataframes = []
+# Kolom teks berulang yang disimpan sebagai kategori (dictionary-encoded)
+KOLOM_KATEGORI = ['Kode Emiten', 'Sektor', 'Subsektor', 'Industri', 'Subindustri']
+KOLOM_PARTISI = ['Tahun', 'Kuartal']
+# Kolom dari file klasifikasi sektor & urutan kolom terdepan di output
+KOLOM_SEKTOR = list(KOLOM_ATRIBUT)
+KOLOM_DEPAN = KOLOM_PARTISI + ['Kode Emiten'] + KOLOM_SEKTOR
+# Kode Emiten tetap ada di mode dimensi: emiten yang tidak ada di file klasifikasi semuanya ber-ID 0
+KOLOM_DEPAN_DIMENSI = KOLOM_PARTISI + ['Kode Emiten', KOLOM_ID]
 
-print(f"Membaca file dari folder: '{folder_path_kuartal}'")
+# Cache hasil parsing per file kuartal (manifest + frame pickle) di subfolder folder kuartal,
+# hanya file baru/berubah yang dibaca ulang
+NAMA_FOLDER_CACHE = '_cache_konsolidasi'
+MAX_WORKERS = None  # None = jumlah core
+
+
+def hitung_sha1(file_path):
+    h = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def gabung_data_rekap(df_data, df_rekap, tahun, kuartal):
+    """Gabungkan sheet 'Data' dan 'Rekap' 1 kuartal per Kode Emiten."""
+    df_data = df_data.copy()
+    df_rekap = df_rekap.copy()
+
+    # --- PERBAIKAN AKURAT DI SINI ---
+    df_data.rename(columns={'Saham': 'Kode Emiten'}, inplace=True)
+    df_rekap.rename(columns={'Saham': 'Kode Emiten'}, inplace=True)
+    # ---------------------------------
+
+    df_merged = pd.merge(df_data, df_rekap, on='Kode Emiten', how='outer')
+    df_merged['Tahun'] = tahun
+    df_merged['Kuartal'] = kuartal
+    return df_merged
+
+
+def baca_file_kuartal(file_path, tahun, kuartal):
+    """Baca sheet 'Data' dan 'Rekap' dari 1 file kuartal lalu gabungkan per Kode Emiten."""
+    sheets = pd.read_excel(file_path, sheet_name=['Data', 'Rekap'])
+    return gabung_data_rekap(sheets['Data'], sheets['Rekap'], tahun, kuartal)
+
+
+def muat_manifest(path_manifest):
+    if not os.path.exists(path_manifest):
+        return {}
+    try:
+        with open(path_manifest, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"  - ⚠️  Manifest cache tidak bisa dibaca, semua file dibaca ulang. Error: {e}")
+        return {}
+
+
+def simpan_manifest(path_manifest, manifest):
+    os.makedirs(os.path.dirname(path_manifest), exist_ok=True)
+    tmp_path = path_manifest + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path_manifest)
+
+
+def cache_masih_valid(entry, file_path, stat):
+    """True jika pickle cache ada dan file tidak berubah (mtime+ukuran, atau isi sama persis). Pickle tidak dimuat."""
+    if not entry or not os.path.exists(entry.get('cache_file', '')):
+        return False
+    if entry['size'] != stat.st_size:
+        return False
+    if entry['mtime_ns'] != stat.st_mtime_ns:
+        # File tersentuh (misal disimpan ulang): cek isi sebelum memakai cache
+        if hitung_sha1(file_path) != entry['sha1']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+    return True
 
-for filename in os.listdir(folder_path_kuartal):
-    # Proses file dengan ekstensi .xlsx dan .xlsm
-    if filename.endswith(".xlsx") or filename.endswith(".xlsm"):
-        try:
-            match = re.search(r'(\d{4})\sKuartal\s(\d)', filename)
-            if not match:
-                print(f"  - ⚠️  Format nama file '{filename}' tidak sesuai, dilewati.")
-                continue
 
-            tahun = int(match.group(1))
-            kuartal = int(match.group(2))
-            
-            print(f"  - Memproses file: {filename} (Tahun: {tahun}, Kuartal: {kuartal})")
+def dtypes_ke_manifest(dtypes):
+    """Skema frame (urutan kolom + tipe) dalam bentuk JSON untuk entri manifest."""
+    return [[col, str(dt)] for col, dt in dtypes.items()]
 
-            file_path = os.path.join(folder_path_kuartal, filename)
 
-            df_data = pd.read_excel(file_path, sheet_name='Data')
-            df_rekap = pd.read_excel(file_path, sheet_name='Rekap')
+def dtypes_dari_manifest(entry):
+    """Kebalikan dtypes_ke_manifest: Series tipe per kolom, seperti DataFrame.dtypes."""
+    return pd.Series([pd.api.types.pandas_dtype(dt) for _, dt in entry['dtypes']],
+                     index=[col for col, _ in entry['dtypes']], dtype=object)
 
-            # --- PERBAIKAN AKURAT DI SINI ---
-            df_data.rename(columns={'Saham': 'Kode Emiten'}, inplace=True)
-            df_rekap.rename(columns={'Saham': 'Kode Emiten'}, inplace=True)
-            # ---------------------------------
 
-            df_merged = pd.merge(df_data, df_rekap, on='Kode Emiten', how='outer')
-            df_merged['Tahun'] = tahun
-            df_merged['Kuartal'] = kuartal
-            
-            list_dataframes.append(df_merged)
+def kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=None, frames_override=None):
+    """
+    Daftar sumber data per file kuartal, terurut (tahun, kuartal, nama file):
+    [(tahun, kuartal, nama, sumber, dtypes)] dengan sumber = path cache pickle,
+    atau DataFrame (dari `frames_override`, atau bila cache gagal ditulis).
+    File yang tidak berubah sejak run sebelumnya diambil dari cache; file
+    baru/berubah dibaca paralel (multi-proses) lalu langsung disimpan ke
+    cache, sehingga frame-nya tidak ditahan di memori. Skema (dtypes) tiap
+    cache disimpan di manifest, jadi pickle baru dimuat saat chunk-nya ditulis.
+    `frames_override`
+    {(tahun, kuartal): DataFrame} dipakai langsung tanpa membaca file
+    kuartal tersebut (misal hasil rekap yang masih di memori); entri cache
+    file kuartal itu tidak dibuang, dan diperiksa ulang pada run berikutnya.
+    """
+    frames_override = dict(frames_override or {})
+    path_manifest = os.path.join(folder_cache, 'manifest.json')
+    manifest = muat_manifest(path_manifest)
+    manifest_baru = {}
+    daftar_sumber = []
+    perlu_dibaca = []
 
+    for filename in sorted(os.listdir(folder)):
+        # Proses file dengan ekstensi .xlsx dan .xlsm
+        if not (filename.endswith(".xlsx") or filename.endswith(".xlsm")):
+            continue
+        match = re.search(r'(\d{4})\sKuartal\s(\d)', filename)
+        if not match:
+            print(f"  - ⚠️  Format nama file '{filename}' tidak sesuai, dilewati.")
+            continue
+
+        tahun = int(match.group(1))
+        kuartal = int(match.group(2))
+        if (tahun, kuartal) in frames_override:
+            # Kuartal ini diambil dari memori; cache file-nya tetap disimpan untuk run berikutnya
+            if filename in manifest:
+                manifest_baru[filename] = manifest[filename]
+            continue
+        file_path = os.path.join(folder, filename)
+        stat = os.stat(file_path)
+
+        entry = manifest.get(filename)
+        try:
+            valid = cache_masih_valid(entry, file_path, stat)
+            if valid and 'dtypes' not in entry:
+                # Entri manifest lama tanpa skema: pickle dimuat sekali untuk melengkapinya
+                entry['dtypes'] = dtypes_ke_manifest(pd.read_pickle(entry['cache_file']).dtypes)
+            dtypes = dtypes_dari_manifest(entry) if valid else None
         except Exception as e:
-            print(f"  - ❌ Gagal memproses file {filename}. Error: {e}")
-
-# --- 3. GABUNGKAN SEMUA DATA & TAMBAHKAN INFO SEKTOR ---
-if not list_dataframes:
-    print("\nTidak ada data yang berhasil diproses. Script berhenti.")
-else:
-    print("\nMenggabungkan semua data kuartalan...")
-    df_master = pd.concat(list_dataframes, ignore_index=True)
-    
+            print(f"  - ⚠️  Cache {filename} rusak, dibaca ulang. Error: {e}")
+            dtypes = None
+
+        if dtypes is not None:
+            print(f"  - Dari cache: {filename} (Tahun: {tahun}, Kuartal: {kuartal})")
+            # Hanya skemanya yang disimpan; isinya dimuat saat chunk kuartal ini ditulis
+            daftar_sumber.append((tahun, kuartal, filename, entry['cache_file'], dtypes))
+            manifest_baru[filename] = entry
+        else:
+            perlu_dibaca.append((filename, file_path, tahun, kuartal, stat))
+
+    if perlu_dibaca:
+        print(f"Membaca {len(perlu_dibaca)} file baru/berubah secara paralel...")
+        os.makedirs(folder_cache, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(baca_file_kuartal, file_path, tahun, kuartal): (filename, file_path, tahun, kuartal, stat)
+                for filename, file_path, tahun, kuartal, stat in perlu_dibaca
+            }
+            for future in as_completed(futures):
+                # Future dilepas begitu selesai supaya frame hasilnya tidak tertahan sampai semua file selesai
+                filename, file_path, tahun, kuartal, stat = futures.pop(future)
+                try:
+                    df_merged = future.result()
+                except Exception as e:
+                    print(f"  - ❌ Gagal memproses file {filename}. Error: {e}")
+                    continue
+
+                print(f"  - Memproses file: {filename} (Tahun: {tahun}, Kuartal: {kuartal})")
+                sha1 = hitung_sha1(file_path)
+                cache_file = os.path.join(folder_cache, f"{tahun}_Q{kuartal}_{sha1[:12]}.pkl")
+                try:
+                    df_merged.to_pickle(cache_file)
+                    manifest_baru[filename] = {
+                        'path': file_path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                        'sha1': sha1, 'cache_file': cache_file, 'dtypes': dtypes_ke_manifest(df_merged.dtypes),
+                    }
+                    daftar_sumber.append((tahun, kuartal, filename, cache_file, df_merged.dtypes))
+                except Exception as e:
+                    print(f"  - ⚠️  Gagal menyimpan cache {filename}. Error: {e}")
+                    daftar_sumber.append((tahun, kuartal, filename, df_merged, df_merged.dtypes))
+                del df_merged, future
+
+    # Buang cache milik file yang sudah dihapus/berubah
+    dipakai = {e['cache_file'] for e in manifest_baru.values()}
+    for entry in manifest.values():
+        cache_file = entry.get('cache_file')
+        if cache_file and cache_file not in dipakai and os.path.exists(cache_file):
+            os.remove(cache_file)
+    if manifest_baru or manifest:
+        simpan_manifest(path_manifest, manifest_baru)
+
+    for (tahun, kuartal), df_merged in frames_override.items():
+        print(f"  - Dari memori: Tahun {tahun}, Kuartal {kuartal}")
+        daftar_sumber.append((int(tahun), int(kuartal), '', df_merged, df_merged.dtypes))
+
+    # Urutan stabil (tahun, kuartal, nama file) agar hasil konsolidasi tidak tergantung urutan selesai worker
+    daftar_sumber.sort(key=lambda sumber: sumber[:3])
+    return daftar_sumber
+
+
+def muat_sumber(sumber):
+    return sumber if isinstance(sumber, pd.DataFrame) else pd.read_pickle(sumber)
+
+
+def _tipe_gabungan(daftar_dtype, ada_yang_kosong):
+    """Tipe 1 kolom setelah semua kuartal digabung (mengikuti aturan pd.concat)."""
+    pertama = daftar_dtype[0]
+    if all(dt == pertama for dt in daftar_dtype) and not (ada_yang_kosong and pertama.kind in 'iub'):
+        return pertama
+    if all(dt.kind in 'iuf' for dt in daftar_dtype):
+        return np.dtype('float64')
+    return np.dtype(object)
+
+
+def skema_gabungan(daftar_dtypes):
+    """
+    Skema kolom tetap untuk semua chunk: urutan kolom sesuai kemunculan
+    (seperti pd.concat) dan 1 tipe per kolom, sehingga tiap chunk kuartal
+    ditulis dengan kolom dan format angka yang sama.
+    """
+    kolom, tipe = [], {}
+    for dtypes in daftar_dtypes:
+        for col, dt in dtypes.items():
+            if col not in tipe:
+                kolom.append(col)
+                tipe[col] = []
+            tipe[col].append(dt)
+    return kolom, {col: _tipe_gabungan(tipe[col], len(tipe[col]) < len(daftar_dtypes)) for col in kolom}
+
+
+def siapkan_chunk(df, dimensi, kolom, tipe, mode_dimensi=False):
+    """
+    1 chunk kuartal: samakan ke skema tetap, tambahkan info sektor (ID Emiten
+    saja di mode dimensi, atau kolom sektor kategorikal), lalu urutkan kolom output.
+    """
+    df = df.reindex(columns=kolom)
+    for col in kolom:
+        if df[col].dtype != tipe[col]:
+            df[col] = df[col].astype(tipe[col])
+    if mode_dimensi:
+        df[KOLOM_ID] = dimensi.keys(df['Kode Emiten'])
+        depan = KOLOM_DEPAN_DIMENSI
+    else:
+        for col, values in dimensi.attributes(df['Kode Emiten']).items():
+            df[col] = values
+        depan = KOLOM_DEPAN
+    return df[depan + [col for col in df.columns if col not in depan]]
+
+
+def tulis_dimensi(dimensi, path_csv, tulis_parquet):
+    """Tabel dimensi sektor ke CSV (dan .parquet di sampingnya). Kembalikan DataFrame dimensi."""
+    df_dim = dimensi.to_frame()
+    tmp_path = path_csv + '.tmp'
+    df_dim.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path_csv)
+    if tulis_parquet:
+        path_parquet = os.path.splitext(path_csv)[0] + '.parquet'
+        df_dim.astype({col: 'category' for col in KOLOM_SEKTOR[1:]}).to_parquet(path_parquet + '.tmp', index=False)
+        os.replace(path_parquet + '.tmp', path_parquet)
+    return df_dim
+
+
+def siapkan_tipe_parquet(df):
+    """
+    Tipe eksplisit untuk Parquet: kolom kategori -> category, kolom angka ->
+    float64, teks lain -> string. Kolom partisi (Tahun/Kuartal) dibuang karena
+    sudah ada di path partisi.
+    """
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        if col in KOLOM_PARTISI:
+            continue
+        s = df[col]
+        if col in KOLOM_KATEGORI:
+            out[col] = s.astype('string').astype('category')
+        elif col == KOLOM_ID:
+            out[col] = s.astype('int32')
+        elif s.dtype.kind in 'iufb':
+            out[col] = s.astype('float64')
+        else:
+            angka = pd.to_numeric(s, errors='coerce')
+            if angka.notna().sum() == s.notna().sum():
+                out[col] = angka.astype('float64')
+            else:
+                out[col] = s.astype('string')
+    return out.reset_index(drop=True)
+
+
+def hash_frame(df):
+    h = hashlib.sha1()
+    h.update(repr([(c, str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def tulis_partisi(df_part, tahun, kuartal, root, manifest):
+    """
+    Tulis 1 partisi Parquet <root>/Tahun=2025/Kuartal=3/part-0.parquet, kecuali
+    isinya sama dengan run sebelumnya (hash di `manifest`). Kembalikan
+    (kunci, hash, ditulis).
+    """
+    kunci = f"Tahun={int(tahun)}/Kuartal={int(kuartal)}"
+    df_part = siapkan_tipe_parquet(df_part)
+    digest = hash_frame(df_part)
+    path_part = os.path.join(root, f"Tahun={int(tahun)}", f"Kuartal={int(kuartal)}", 'part-0.parquet')
+    if manifest.get(kunci) == digest and os.path.exists(path_part):
+        return kunci, digest, False
+
+    os.makedirs(os.path.dirname(path_part), exist_ok=True)
+    tmp_path = path_part + '.tmp'
+    df_part.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path_part)
+    return kunci, digest, True
+
+
+def hapus_partisi_usang(root, manifest, manifest_baru):
+    """Hapus partisi yang tercatat di run sebelumnya tapi sudah tidak ada datanya."""
+    for kunci in set(manifest) - set(manifest_baru):
+        path_part = os.path.join(root, *kunci.split('/'), 'part-0.parquet')
+        if os.path.exists(path_part):
+            os.remove(path_part)
+            for folder in (os.path.dirname(path_part), os.path.dirname(os.path.dirname(path_part))):
+                if not os.listdir(folder):
+                    os.rmdir(folder)
+
+
+class PenulisKonsolidasi:
+    """
+    Tulis hasil konsolidasi per chunk kuartal: CSV di-append ke file sementara
+    (menggantikan file lama hanya bila semua chunk sukses) dan tiap kuartal
+    menjadi 1 partisi Parquet. Partisi yang isinya sama dengan run sebelumnya
+    (hash tersimpan di _partisi.json) tidak ditulis ulang.
+    """
+
+    def __init__(self, path_csv, path_parquet=None):
+        self.path_csv = path_csv
+        self.tmp_csv = path_csv + '.tmp'
+        self.path_parquet = path_parquet
+        self.baris = 0
+        self.kuartal = 0
+        self.kolom = None
+        self.parquet_ditulis = 0
+        if path_parquet is not None:
+            self.path_manifest = os.path.join(path_parquet, '_partisi.json')
+            self.manifest = muat_manifest(self.path_manifest)
+            self.manifest_baru = {}
+
+    def tulis(self, tahun, kuartal, df_chunk):
+        if self.kolom is None:
+            self.kolom = list(df_chunk.columns)
+        elif list(df_chunk.columns) != self.kolom:
+            raise ValueError(f"Kolom chunk {tahun} Q{kuartal} tidak sama dengan skema output")
+        df_chunk.to_csv(self.tmp_csv, index=False, mode='w' if self.kuartal == 0 else 'a', header=self.kuartal == 0)
+        self.baris += len(df_chunk)
+        self.kuartal += 1
+        if self.path_parquet is not None:
+            kunci, digest, ditulis = tulis_partisi(df_chunk, tahun, kuartal, self.path_parquet, self.manifest)
+            self.manifest_baru[kunci] = digest
+            self.parquet_ditulis += ditulis
+
+    def selesai(self):
+        os.replace(self.tmp_csv, self.path_csv)
+        if self.path_parquet is not None:
+            hapus_partisi_usang(self.path_parquet, self.manifest, self.manifest_baru)
+            simpan_manifest(self.path_manifest, self.manifest_baru)
+        return {'baris': self.baris, 'kuartal': self.kuartal, 'kolom': self.kolom, 'path_csv': self.path_csv,
+                'parquet_ditulis': self.parquet_ditulis if self.path_parquet is not None else None}
+
+    def batal(self):
+        if os.path.exists(self.tmp_csv):
+            os.remove(self.tmp_csv)
+
+
+def run_konsolidasi(frames_override=None, folder=None, path_sektor=None, path_csv=None, path_parquet=None,
+                    path_dimensi=None):
+    """
+    Konsolidasi semua kuartal + info sektor ke CSV (dan Parquet), per chunk
+    kuartal: hanya 1 kuartal yang dimuat di memori pada satu waktu, jadi
+    pemakaian memori tidak bertambah dengan panjang histori. Kembalikan
+    ringkasan {baris, kuartal, kolom, path_csv, parquet_ditulis}, atau None
+    bila tidak ada data / gagal. Lihat kumpulkan_sumber_kuartal untuk
+    `frames_override`. Di MODE_DIMENSI_SEKTOR, tabel dimensi sektor ditulis
+    ke `path_dimensi`.
+    """
+    folder = folder or folder_path_kuartal
+    path_sektor = path_sektor or file_path_sektor
+    path_csv = path_csv or output_path_csv
+    path_parquet = path_parquet or output_path_parquet
+    path_dimensi = path_dimensi or output_path_dimensi
+
+    # --- 2. PROSES SEMUA FILE EXCEL KUARTALAN ---
+    print(f"Membaca file dari folder: '{folder}'")
+    daftar_sumber = kumpulkan_sumber_kuartal(folder, os.path.join(folder, NAMA_FOLDER_CACHE), MAX_WORKERS, frames_override)
+
+    if not daftar_sumber:
+        print("\nTidak ada data yang berhasil diproses. Script berhenti.")
+        return None
+
+    # --- 3. INFO SEKTOR (1x) ---
     try:
-        print(f"Menambahkan data klasifikasi dari: '{file_path_sektor}'")
-        df_sektor = pd.read_excel(file_path_sektor)
-        
-        # Kolom di file sektor sudah benar 'Kode Emiten'
-        kolom_sektor = ['Kode Emiten', 'Nama Entitas', 'Sektor', 'Subsektor', 'Industri', 'Subindustri']
-        
-        df_final = pd.merge(df_master, df_sektor[kolom_sektor], on='Kode Emiten', how='left')
-
-        cols_to_move = ['Tahun', 'Kuartal', 'Kode Emiten', 'Nama Entitas', 'Sektor', 'Subsektor', 'Industri', 'Subindustri']
-        df_final = df_final[cols_to_move + [col for col in df_final.columns if col not in cols_to_move]]
-        
-        # --- 4. SIMPAN HASIL KE CSV ---
-        df_final.to_csv(output_path_csv, index=False)
-        print(f"\n✅ Sukses! Data telah dikonsolidasi dan disimpan di '{output_path_csv}'")
-        print(f"Total {len(df_final)} baris data telah diproses.")
-    
+        print(f"Menambahkan data klasifikasi dari: '{path_sektor}'")
+        # Di-parse 1x lalu di-cache (versi + ID tetap antar run) oleh sector_dim
+        dimensi = get_sector_dimension(path_sektor)
     except FileNotFoundError:
-        print(f"  - ❌ Gagal! File klasifikasi tidak ditemukan di '{file_path_sektor}'. Pastikan nama dan lokasinya benar.")
+        print(f"  - ❌ Gagal! File klasifikasi tidak ditemukan di '{path_sektor}'. Pastikan nama dan lokasinya benar.")
+        return None
+    except Exception as e:
+        print(f"  - ❌ Gagal menambahkan info sektor. Error: {e}")
+        return None
+
+    tulis_parquet = TULIS_PARQUET and PARQUET_AVAILABLE
+    if TULIS_PARQUET and not PARQUET_AVAILABLE:
+        print("  - ⚠️  pyarrow belum terpasang, output Parquet dilewati (pip install pyarrow).")
+
+    # --- 4. GABUNGKAN & SIMPAN PER KUARTAL (CSV + PARQUET) ---
+    kolom, tipe = skema_gabungan([sumber[4] for sumber in daftar_sumber])
+    penulis = PenulisKonsolidasi(path_csv, path_parquet if tulis_parquet else None)
+    print("\nMenggabungkan & menulis data per kuartal...")
+    try:
+        for (tahun, kuartal), grup in groupby(daftar_sumber, key=lambda sumber: sumber[:2]):
+            frames = [muat_sumber(sumber[3]) for sumber in grup]
+            df_kuartal = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            penulis.tulis(tahun, kuartal, siapkan_chunk(df_kuartal, dimensi, kolom, tipe, MODE_DIMENSI_SEKTOR))
+        hasil = penulis.selesai()
     except Exception as e:
-        print(f"  - ❌ Gagal menambahkan info sektor. Error: {e}")
\ No newline at end of file
+        penulis.batal()
+        print(f"  - ❌ Gagal menulis hasil konsolidasi. Error: {e}")
+        return None
+
+    print(f"\n✅ Sukses! Data telah dikonsolidasi dan disimpan di '{path_csv}'")
+    print(f"Total {hasil['baris']} baris data dari {hasil['kuartal']} kuartal telah diproses.")
+    if tulis_parquet:
+        print(f"✅ Parquet: {hasil['parquet_ditulis']}/{hasil['kuartal']} partisi ditulis ulang di '{path_parquet}'")
+    if MODE_DIMENSI_SEKTOR:
+        try:
+            tulis_dimensi(dimensi, path_dimensi, tulis_parquet)
+            print(f"✅ Dimensi sektor (versi {dimensi.version}, {len(dimensi)} emiten) disimpan di '{path_dimensi}'")
+        except Exception as e:
+            print(f"  - ❌ Gagal menyimpan tabel dimensi sektor. Error: {e}")
+            return None
+    return hasil
+
+
+if __name__ == "__main__":
+    print("🚀 Script dimulai...")
+    run_konsolidasi()
@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+from typing import List, Optional
+
+import rekap_fundamental as rf
+import Konsolidasi
+from synthetic_idx import generate_quarter, write_sektor, EXPECTED_NAME
+
+# ----------------------------
+# BENCHMARK EKSTRAKSI, REKAP & KONSOLIDASI
+# Data: laporan sintetis (synthetic_idx.py) di folder kerja sementara, bukan
+# path Windows di konfigurasi. Hasil tiap run ditambahkan ke file riwayat JSON
+# dan dibandingkan dengan run sebelumnya untuk melihat regresi.
+#
+# Catatan: pada platform "spawn" (Windows) proses worker memuat ulang
+# konfigurasi rekap_fundamental, sehingga stage extract_records di sana
+# memakai indeks lokasi sheet dari SHEET_INDEX_PATH asli (hanya dibaca).
+# ----------------------------
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+# Riwayat hasil disimpan di repo (folder benchmarks/ di-gitignore) agar tetap ada walau folder temp dibersihkan
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "benchmark_results.json")
+KURS_USD = 16_000.0
+TAHUN, KUARTAL = 2025, 3
+STAGES = ("fast_extract_all_metrics", "process_file_worker", "extract_records", "build_rekap",
+          "save_workbook_with_autofit", "konsolidasi")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    """Bungkam print tahap yang diukur (progress per batch) agar tidak mengganggu output benchmark."""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _arahkan_rekap_ke(folder: str) -> None:
+    """Arahkan semua path output/cache rekap_fundamental ke folder kerja benchmark."""
+    rf.OUTPUT_FOLDER = folder
+    rf.CACHE_PATH = os.path.join(folder, "_cache_ekstraksi.sqlite")
+    rf.SHEET_INDEX_PATH = os.path.join(folder, "_indeks_lokasi_sheet.json")
+    rf.MASTER_STORE_ROOT = os.path.join(folder, "_master_store")
+    rf._SHEET_INDEX = None
+
+
+def _reset_state(folder: str) -> None:
+    for name in ("_cache_ekstraksi.sqlite", "_indeks_lokasi_sheet.json", "_master_store"):
+        path = os.path.join(folder, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    rf._SHEET_INDEX = None
+
+
+def siapkan_korpus(workdir: str, n_files: int, seed: int = 0) -> tuple:
+    """Folder berisi n_files laporan sintetis; dipakai ulang bila sudah ada dengan isi yang sama."""
+    folder = os.path.join(workdir, f"korpus_{n_files}", f"{TAHUN} Q{KUARTAL}")
+    expected_path = os.path.join(folder, EXPECTED_NAME)
+    if os.path.exists(expected_path):
+        with open(expected_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("seed") == seed and len(data.get("reports", {})) == n_files:
+            return folder, data["reports"]
+        shutil.rmtree(folder)
+    print(f"Membuat {n_files} laporan sintetis di {folder} ...")
+    start = time.perf_counter()
+    expected = generate_quarter(folder, n_files, TAHUN, KUARTAL, seed)
+    print(f"  selesai dalam {time.perf_counter() - start:.1f} detik")
+    return folder, expected
+
+
+class BenchRun:
+    """Kumpulan hasil 1 run benchmark."""
+
+    def __init__(self):
+        self.results = []
+
+    def add(self, stage: str, n_files: int, seconds: float, items: Optional[int] = None, **extra) -> dict:
+        items = n_files if items is None else items
+        result = {
+            "stage": stage,
+            "n_files": n_files,
+            "seconds": round(seconds, 4),
+            "items": items,
+            "ms_per_item": round(seconds * 1000 / items, 4) if items else None,
+            "items_per_second": round(items / seconds, 2) if seconds > 0 else None,
+        }
+        result.update(extra)
+        self.results.append(result)
+        rate = f"{result['items_per_second']:.1f}/detik" if result["items_per_second"] else "-"
+        print(f"  {stage:<42} {seconds:9.3f} detik  {rate:>14}" + (f"  {extra}" if extra else ""))
+        return result
+
+
+def bench_size(run: BenchRun, workdir: str, n_files: int, stages, seed: int = 0, quiet: bool = True) -> None:
+    folder, expected = siapkan_korpus(workdir, n_files, seed)
+    data_files, ringkasan_files = rf.list_input_files(folder)
+    out_dir = os.path.join(workdir, f"output_{n_files}")
+    os.makedirs(out_dir, exist_ok=True)
+    _arahkan_rekap_ke(out_dir)
+    print(f"\n=== {n_files} file ===")
+
+    if "fast_extract_all_metrics" in stages:
+        _reset_state(out_dir)
+        start = time.perf_counter()
+        for path in data_files:
+            rf.fast_extract_all_metrics(path)
+        run.add("fast_extract_all_metrics", n_files, time.perf_counter() - start)
+
+    if "process_file_worker" in stages:
+        start = time.perf_counter()
+        rows = [rf.process_file_worker(path, KURS_USD, set()) for path in data_files]
+        elapsed = time.perf_counter() - start
+        run.add("process_file_worker", n_files, elapsed, salah=_hitung_salah(rows, expected))
+
+    records = None
+    if stages & {"extract_records", "build_rekap", "save_workbook_with_autofit", "konsolidasi"}:
+        _reset_state(out_dir)
+        start = time.perf_counter()
+        with _quiet(quiet):
+            extracted = rf.extract_records(data_files, KURS_USD, set())
+        elapsed = time.perf_counter() - start
+        records = extracted["records"]
+        if "extract_records" in stages:
+            run.add("extract_records (cache dingin)", n_files, elapsed, gagal=extracted["errors"])
+            start = time.perf_counter()
+            with _quiet(quiet):
+                rf.extract_records(data_files, KURS_USD, set())
+            run.add("extract_records (cache hangat)", n_files, time.perf_counter() - start)
+
+    if records is None:
+        return
+    with _quiet(quiet):
+        df_data = rf.build_data(records, TAHUN, KUARTAL, None, None)
+        df_ringkasan = rf.read_ringkasan(ringkasan_files)
+    start = time.perf_counter()
+    df_rekap = rf.build_rekap(df_data, df_ringkasan, rf._ANNUALIZATION_MAP[KUARTAL])
+    if "build_rekap" in stages:
+        run.add("build_rekap", n_files, time.perf_counter() - start)
+
+    workbook_path = os.path.join(out_dir, f"{TAHUN} Kuartal {KUARTAL}.xlsx")
+    start = time.perf_counter()
+    with _quiet(quiet):
+        rf.save_workbook_with_autofit(workbook_path, df_data, df_ringkasan, df_rekap)
+    if "save_workbook_with_autofit" in stages:
+        run.add("save_workbook_with_autofit", n_files, time.perf_counter() - start)
+
+    if "konsolidasi" in stages:
+        # 4 kuartal dari workbook yang sama: konsolidasi membaca 4 x n_files baris
+        kons_dir = os.path.join(workdir, f"konsolidasi_{n_files}")
+        if os.path.isdir(kons_dir):
+            shutil.rmtree(kons_dir)
+        os.makedirs(kons_dir)
+        for k in range(1, 5):
+            shutil.copy(workbook_path, os.path.join(kons_dir, f"{TAHUN} Kuartal {k}.xlsx"))
+        path_sektor = write_sektor(os.path.join(workdir, f"sektor_{n_files}.xlsx"), sorted(expected), seed)
+        kwargs = dict(folder=kons_dir, path_sektor=path_sektor, path_csv=os.path.join(kons_dir, "konsolidasi.csv"),
+                      path_parquet=os.path.join(kons_dir, "konsolidasi_parquet"))
+        for label in ("cache dingin", "cache hangat"):
+            start = time.perf_counter()
+            with _quiet(quiet):
+                hasil = Konsolidasi.run_konsolidasi(**kwargs)
+            run.add(f"konsolidasi ({label})", n_files, time.perf_counter() - start,
+                    items=hasil['baris'] if hasil is not None else 0)
+
+
+def _hitung_salah(rows: List[dict], expected: dict) -> int:
+    """Jumlah file yang hasil ekstraksinya tidak sama dengan nilai yang ditulis generator."""
+    salah = 0
+    for row in rows:
+        info = expected.get(row.get("Saham"))
+        if info is None:
+            salah += 1
+            continue
+        mult = (KURS_USD if info["currency"] == "USD" else 1.0) * info["divisor"]
+        for key in rf.FINANCIAL_KEYS:
+            want = info["values"].get(key, 0) * mult
+            if abs(row.get(key, 0.0) - want) > 1e-6 * max(1.0, abs(want)):
+                salah += 1
+                break
+    return salah
+
+
+def bandingkan(history: list, run: dict) -> None:
+    """Cetak perubahan waktu tiap stage terhadap run sebelumnya dengan stage & ukuran yang sama."""
+    sebelumnya = {}
+    for old in history:
+        for r in old.get("results", []):
+            sebelumnya[(r["stage"], r["n_files"])] = (old.get("commit"), r)
+    baris = []
+    for r in run["results"]:
+        lama = sebelumnya.get((r["stage"], r["n_files"]))
+        if lama is None or not lama[1]["seconds"]:
+            continue
+        delta = (r["seconds"] - lama[1]["seconds"]) / lama[1]["seconds"] * 100
+        tanda = "LEBIH LAMBAT" if delta > 10 else ("lebih cepat" if delta < -10 else "")
+        baris.append(f"  {r['stage']:<42} n={r['n_files']:<6} {lama[1]['seconds']:9.3f} -> {r['seconds']:9.3f} detik "
+                     f"({delta:+.1f}%, vs {lama[0] or '?'}) {tanda}")
+    if baris:
+        print("\n--- Dibandingkan run sebelumnya ---")
+        print("\n".join(baris))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tahap ekstraksi/rekap/konsolidasi dengan data sintetis.")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="Jumlah file per ukuran, dipisah koma (default 100,1000,10000)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Stage yang diukur: {', '.join(STAGES)}")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "idx_benchmark"),
+                        help="Folder kerja (korpus sintetis dipakai ulang antar run)")
+    parser.add_argument("--output", default=DEFAULT_HISTORY,
+                        help="File riwayat hasil (JSON, ditambahkan tiap run; default benchmarks/benchmark_results.json di repo)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan output tahap yang diukur")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = {s.strip() for s in args.stages.split(",") if s.strip()}
+    unknown = stages - set(STAGES)
+    if unknown:
+        print(f"Stage tidak dikenal: {', '.join(sorted(unknown))}")
+        return 1
+    os.makedirs(args.workdir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    Konsolidasi.MAX_WORKERS = rf.MAX_WORKERS
+
+    bench = BenchRun()
+    for n in sizes:
+        bench_size(bench, args.workdir, n, stages, args.seed, quiet=not args.verbose)
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "EXECUTOR_MODE": rf.EXECUTOR_MODE, "MAX_WORKERS": rf.MAX_WORKERS, "CHUNK_SIZE": rf.CHUNK_SIZE,
+            "EXTRACTOR_BACKEND": rf.EXTRACTOR_BACKEND, "USE_SHEET_INDEX": rf.USE_SHEET_INDEX,
+            "USE_EXTRACTION_CACHE": rf.USE_EXTRACTION_CACHE, "EXTRACTOR_VERSION": rf.EXTRACTOR_VERSION,
+        },
+        "results": bench.results,
+    }
+    history = []
+    if os.path.exists(args.output):
+        try:
+            with open(args.output, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            print(f"Peringatan: riwayat {args.output} tidak terbaca, dibuat baru.")
+    bandingkan(history, run)
+    history.append(run)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    print(f"\nHasil disimpan ke {args.output} ({len(history)} run tercatat).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import os
+import sys
+import time
+import select
+import zipfile
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# ----------------------------
+# KONFIGURASI DEFAULT
+# ----------------------------
+
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")  # file setengah jadi (Chrome / http_downloader)
+STABLE_SECONDS = 0.25     # ukuran file harus tetap selama ini sebelum dianggap selesai
+POLL_INTERVAL = 0.1       # jeda backend polling (cadangan bila notifikasi OS tidak tersedia)
+
+# Konstanta inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, "O_NONBLOCK") else 0
+_IN_CLOEXEC = 0o2000000
+
+
+# ----------------------------
+# BACKEND NOTIFIKASI
+# Semua backend cukup menyediakan wait(timeout): blok sampai ada perubahan di
+# folder atau timeout habis. Pemeriksaan file dilakukan oleh DownloadWatcher.
+# ----------------------------
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 gagal")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch gagal untuk {folder}")
+
+    def wait(self, timeout: float) -> None:
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return
+        # Kosongkan antrean event; isinya tidak perlu diurai
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _WatchdogBackend:
+    name = "watchdog"
+
+    def __init__(self, folder: str):
+        self._changed = threading.Event()
+        changed = self._changed
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                changed.set()
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), folder, recursive=False)
+        self._observer.start()
+
+    def wait(self, timeout: float) -> None:
+        self._changed.wait(max(0.0, timeout))
+        self._changed.clear()
+
+    def close(self) -> None:
+        self._observer.stop()
+        self._observer.join()
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self, folder: str, interval: float = POLL_INTERVAL):
+        self.interval = interval
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(max(0.0, min(self.interval, timeout)))
+
+    def close(self) -> None:
+        pass
+
+
+def _make_backend(folder: str, backend: Optional[str]):
+    """Pilih backend: inotify (Linux) -> watchdog (bila terpasang, mis. Windows) -> polling."""
+    candidates = [backend] if backend else ["inotify", "watchdog", "polling"]
+    for name in candidates:
+        try:
+            if name == "inotify" and sys.platform.startswith("linux"):
+                return _InotifyBackend(folder)
+            if name == "watchdog" and WATCHDOG_AVAILABLE:
+                return _WatchdogBackend(folder)
+            if name == "polling":
+                return _PollingBackend(folder)
+        except OSError:
+            continue
+    return _PollingBackend(folder)
+
+
+# ----------------------------
+# WATCHER
+# ----------------------------
+
+def is_download_complete(file_path: str) -> bool:
+    """File akhir ada, tidak ada file parsial pendampingnya, dan zip-nya valid."""
+    if not os.path.exists(file_path):
+        return False
+    if any(os.path.exists(file_path + sfx) for sfx in PARTIAL_SUFFIXES):
+        return False
+    return zipfile.is_zipfile(file_path)
+
+
+class DownloadWatcher:
+    """
+    Menunggu banyak file download sekaligus di 1 folder. Dibangunkan oleh
+    notifikasi sistem berkas (rename '.crdownload' -> nama akhir, close-write,
+    dsb.), bukan sleep tetap. Sebuah file dianggap selesai bila nama akhirnya
+    ada, file parsialnya sudah hilang, ukurannya stabil selama STABLE_SECONDS,
+    dan isinya zip (xlsx) yang valid.
+    """
+
+    def __init__(self, folder: str, backend: Optional[str] = None, stable_seconds: float = STABLE_SECONDS):
+        self.folder = folder
+        self.stable_seconds = stable_seconds
+        self._backend = _make_backend(folder, backend)
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
+
+    def wait_for(self, file_names: Iterable[str], timeout: float = 120,
+                 on_done: Optional[Callable[[str, bool], None]] = None) -> Dict[str, bool]:
+        """
+        Tunggu semua nama file (relatif terhadap folder) sampai selesai atau
+        timeout. Kembalikan {nama: berhasil}. `on_done(nama, True)` dipanggil
+        begitu tiap file selesai; file yang belum selesai saat timeout
+        dilaporkan False.
+        """
+        pending = {name: None for name in dict.fromkeys(file_names)}  # nama -> (size, mtime_ns, sejak)
+        results = {}
+        deadline = time.monotonic() + timeout
+
+        while pending:
+            now = time.monotonic()
+            next_check = deadline
+            for name in list(pending):
+                path = os.path.join(self.folder, name)
+                if not is_download_complete(path):
+                    pending[name] = None
+                    continue
+                st = os.stat(path)
+                sig = (st.st_size, st.st_mtime_ns)
+                seen = pending[name]
+                if seen is None or seen[:2] != sig:
+                    pending[name] = (*sig, now)
+                    next_check = min(next_check, now + self.stable_seconds)
+                elif now - seen[2] >= self.stable_seconds:
+                    del pending[name]
+                    results[name] = True
+                    if on_done:
+                        on_done(name, True)
+                else:
+                    next_check = min(next_check, seen[2] + self.stable_seconds)
+
+            if not pending:
+                break
+            if now >= deadline:
+                break
+            self._backend.wait(min(next_check, deadline) - now)
+
+        for name in pending:
+            results[name] = False
+            if on_done:
+                on_done(name, False)
+        return results
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,16 +1,295 @@
-import subprocess
+import os
 import sys
 import time  # tambahan
+import argparse
+
+from stage_cache import StageState, fingerprint
+from period_range import parse_period_range, format_period
+import metrics
+
+# Folder tempat script tiap tahap berada (ditambahkan ke sys.path agar bisa di-import langsung)
+SCRIPT_DIRS = [
+    r"C:\Users\ASUS\Documents\Investasi\Automation\Web Scarping",  # scarper_lk.py
+    r"C:\Users\ASUS\Documents\Investasi\Automation",               # rekap_fundamental.py, Konsolidasi.py
+]
+
+# True = download dan ekstraksi rekap berjalan bersamaan (file diekstrak begitu
+# selesai diunduh); False = tahap berurutan seperti semula.
+PIPELINE_MODE = True
+
+# Status tahap ala make: tahap dilewati bila input-nya (file laporan, kurs,
+# klasifikasi sektor, kode script) tidak berubah sejak run sukses terakhir dan
+# output-nya masih utuh. Paksa ulang dari 1 tahap dengan --force <tahap>.
+STATE_PATH = r"C:\Users\ASUS\Documents\Investasi\_status_tahap.json"
+TAHAP = ("scraper", "rekap", "konsolidasi")
+# Isi server IDX tidak bisa di-hash: hasil scraper dianggap segar selama ini
+SCRAPER_MAX_AGE_JAM = 24
+# Folder laporan per kuartal (<folder>\<tahun> Q<kuartal>), harus sama dengan BASE_DOWNLOAD_PATH
+# di scarper_lk.py dan BASE_INPUT_PATH di rekap_fundamental.py. Dipakai untuk cek output tahap
+# scraper tanpa meng-import modul scraper/rekap.
+FOLDER_LAPORAN = r"C:\Users\ASUS\Documents\Investasi\Laporan Keuangan"
+
+# Metrik tiap run (span per tahap & per file, JSON lines) + ringkasan p50/p95/maks
+METRICS_FOLDER = r"C:\Users\ASUS\Documents\Investasi\_metrik"
 
 def _fmt_hms(seconds: float) -> str:
     return time.strftime("%H:%M:%S", time.gmtime(seconds))
 
-def jalankan_semua_script():
+def _siapkan_sys_path():
+    for folder in [os.path.dirname(os.path.abspath(__file__))] + SCRIPT_DIRS:
+        if os.path.isdir(folder) and folder not in sys.path:
+            sys.path.append(folder)
+
+# ----------------------------
+# TAHAPAN
+# Import modul dilakukan di dalam fungsi: selenium/pandas/openpyxl hanya dimuat
+# saat tahap yang membutuhkannya benar-benar dijalankan, dan cukup sekali.
+# ----------------------------
+
+def tahap_scraper(tahun: str, kuartal: str, on_file_ready=None) -> dict:
+    import scarper_lk
+    return scarper_lk.run_scraper(tahun, kuartal, on_file_ready=on_file_ready)
+
+def tahap_rekap(tahun: str, kuartal: str):
+    import rekap_fundamental
+    return rekap_fundamental.run_rekap(int(tahun), int(kuartal))
+
+def tahap_scraper_batch(periods) -> tuple:
+    import scarper_lk
+    return scarper_lk.run_scraper_batch(periods)
+
+def tahap_rekap_batch(periods) -> tuple:
+    import rekap_fundamental
+    return rekap_fundamental.run_rekap_batch(periods)
+
+def tahap_scraper_dan_rekap(tahun: str, kuartal: str):
+    """
+    Mode pipeline: scraper sebagai produsen, ekstraksi rekap sebagai konsumen.
+    Tiap file yang selesai diunduh langsung masuk antrean ekstraksi, sehingga
+    parsing berjalan selama download masih berlangsung. Kembalikan
+    (hasil_scraper, hasil_rekap, statistik_antrean).
+    """
+    import rekap_fundamental
+    ctx = rekap_fundamental.prepare_rekap(int(tahun), int(kuartal), require_input=False)
+    extractor = rekap_fundamental.StreamingExtractor(ctx['kurs_usd'], ctx['existing_saham']).start()
+    try:
+        hasil_scraper = tahap_scraper(tahun, kuartal, on_file_ready=extractor.submit)
+        # Pengaman: file di folder input yang tidak dilaporkan scraper (duplikat diabaikan)
+        if os.path.isdir(ctx['input_folder']):
+            data_files, _ = rekap_fundamental.list_input_files(ctx['input_folder'])
+            for file_path in data_files:
+                extractor.submit(file_path)
+    except BaseException:
+        # Ekstraktor tetap dihentikan, tapi error saat menutupnya tidak boleh menutupi error scraper
+        try:
+            extractor.close()
+        except Exception as e:
+            print(f"Peringatan: Gagal menghentikan ekstraksi setelah scraper gagal. Error: {e}")
+        raise
+    extracted = extractor.close()
+    hasil_rekap = rekap_fundamental.finish_rekap(ctx, extracted)
+    return hasil_scraper, hasil_rekap, extracted['stream']
+
+def tahap_konsolidasi(daftar_hasil_rekap):
+    """Jalankan konsolidasi; RuntimeError bila gagal supaya tahap tidak dicatat sebagai berhasil."""
+    import Konsolidasi
+    frames = {}
+    for hasil_rekap in daftar_hasil_rekap:
+        if hasil_rekap is None:
+            continue
+        # Hasil rekap kuartal yang baru dijalankan diteruskan dari memori, tidak dibaca ulang dari Excel
+        t, k = hasil_rekap['tahun'], hasil_rekap['kuartal']
+        frames[(t, k)] = Konsolidasi.gabung_data_rekap(hasil_rekap['df_data'], hasil_rekap['df_rekap'], t, k)
+    with metrics.span("konsolidasi", kuartal_dari_memori=len(frames)) as attrs:
+        hasil = Konsolidasi.run_konsolidasi(frames_override=frames)
+        attrs["rows"] = hasil['baris'] if hasil is not None else 0
+    if hasil is None:
+        raise RuntimeError("Konsolidasi gagal atau tidak ada data (lihat pesan di atas), output tidak diperbarui.")
+    return hasil
+
+# ----------------------------
+# INPUT & OUTPUT TIAP TAHAP
+# ----------------------------
+
+def spek_tahap(tahap: str, tahun: str, kuartal: str) -> dict:
+    """Kunci, sidik jari input, sidik jari output, dan batas umur hasil 1 tahap."""
+    periode = f"{tahun}Q{kuartal}"
+    if tahap == "scraper":
+        folder = os.path.join(FOLDER_LAPORAN, f"{tahun} Q{kuartal}")
+        return {
+            'key': periode,
+            'inputs': {'periode': periode},
+            'outputs': fingerprint([folder], "*.xlsx"),
+            'max_age': SCRAPER_MAX_AGE_JAM * 3600,
+        }
+    if tahap == "rekap":
+        import rekap_fundamental as rf
+        folder = os.path.join(rf.BASE_INPUT_PATH, f"{tahun} Q{kuartal}")
+        try:
+            # Hanya kurs periode ini: baris kurs kuartal lain tidak memicu rekap ulang
+            kurs = repr(rf.get_kurs_usd_to_idr(tahun, kuartal))
+        except rf.KursError:
+            kurs = "tidak ada"
+        return {
+            'key': periode,
+            'inputs': {
+                'laporan': fingerprint([folder], "*.xlsx"),
+                'kurs': kurs,
+                'kode': fingerprint([rf.__file__]),
+                'ekstraktor': rf.EXTRACTOR_VERSION,
+            },
+            'outputs': fingerprint([os.path.join(rf.OUTPUT_FOLDER, f"{tahun} Kuartal {kuartal}.xlsx")]),
+            'max_age': None,
+        }
+    if tahap == "konsolidasi":
+        import Konsolidasi
+        import sector_dim
+        import json_cache
+        outputs = [Konsolidasi.output_path_csv, os.path.join(Konsolidasi.output_path_parquet, '_partisi.json')]
+        if Konsolidasi.MODE_DIMENSI_SEKTOR:
+            outputs.append(Konsolidasi.output_path_dimensi)
+        return {
+            'key': "semua",
+            'inputs': {
+                'rekap_kuartal': fingerprint([Konsolidasi.folder_path_kuartal], "*Kuartal*.xlsx"),
+                'sektor': fingerprint([Konsolidasi.file_path_sektor]),
+                'kode': fingerprint([Konsolidasi.__file__, sector_dim.__file__, json_cache.__file__]),
+                'mode_dimensi': repr(Konsolidasi.MODE_DIMENSI_SEKTOR),
+            },
+            'outputs': fingerprint(outputs),
+            'max_age': None,
+        }
+    raise ValueError(f"Tahap tidak dikenal: {tahap}")
+
+def perlu_dijalankan(state: StageState, tahap: str, tahun: str, kuartal: str, dipaksa: set) -> bool:
+    label = tahap if tahap == "konsolidasi" else f"{tahap} {format_period(tahun, kuartal)}"
+    if tahap in dipaksa:
+        print(f"[{label}] dijalankan: dipaksa (--force)")
+        return True
+    spek = spek_tahap(tahap, tahun, kuartal)
+    segar, alasan = state.check(tahap, spek['key'], spek['inputs'], spek['outputs'], spek['max_age'])
+    print(f"[{label}] {'dilewati' if segar else 'dijalankan'}: {alasan}")
+    return not segar
+
+def catat_tahap(state: StageState, tahap: str, tahun: str, kuartal: str) -> None:
+    # Sidik jari diambil setelah tahap selesai: input yang dibaca & output yang ditulis
+    spek = spek_tahap(tahap, tahun, kuartal)
+    state.record(tahap, spek['key'], spek['inputs'], spek['outputs'])
+
+def catat_scraper(state: StageState, tahun: str, kuartal: str, hasil_scraper) -> None:
+    """Tahap scraper hanya dicatat bila tidak ada file yang gagal diunduh (run berikutnya mencoba lagi)."""
+    gagal = (hasil_scraper or {}).get('failed', 0)
+    if gagal:
+        print(f"[scraper {format_period(tahun, kuartal)}] tidak dicatat: {gagal} file gagal diunduh")
+        return
+    catat_tahap(state, "scraper", tahun, kuartal)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan scraper -> rekap -> konsolidasi, lewati tahap yang tidak berubah.")
+    parser.add_argument("--tahun", help="Tahun laporan (misal 2025); ditanyakan bila kosong")
+    parser.add_argument("--kuartal", help="Kuartal 1/2/3/4; ditanyakan bila kosong")
+    parser.add_argument("--periode", help="Mode batch untuk rentang periode, misal 2020Q1..2025Q3 (menggantikan --tahun/--kuartal)")
+    parser.add_argument("--force", choices=TAHAP + ("semua",),
+                        help="Jalankan ulang tahap ini dan semua tahap sesudahnya walau input tidak berubah")
+    return parser.parse_args(argv)
+
+def _cetak_durasi(nama: str, durasi) -> None:
+    if durasi is None:
+        print(f"Waktu Eksekusi {nama}: dilewati (tidak ada perubahan)")
+    else:
+        print(f"Waktu Eksekusi {nama}: {_fmt_hms(durasi)} ({durasi:.2f} detik)")
+
+def _selesaikan_metrik(durasi: dict, run_info: dict) -> None:
+    """Catat durasi tiap tahap, lalu tulis file metrik run ini beserta ringkasannya."""
+    for nama, detik in durasi.items():
+        if detik is not None:
+            metrics.record(f"tahap {nama}", detik)
+    metrics.finish_run(METRICS_FOLDER, "metrik", run_info)
+
+def _tahap_dipaksa(force) -> set:
+    if not force:
+        return set()
+    mulai = 0 if force == "semua" else TAHAP.index(force)
+    return set(TAHAP[mulai:])
+
+def jalankan_batch(periods, dipaksa: set) -> dict:
+    """
+    Mode batch banyak periode: scraper per periode, lalu rekap semua periode
+    yang berubah lewat 1 pool worker & cache bersama, lalu 1x konsolidasi.
+    Periode yang gagal dicatat dan tidak menghentikan periode lain.
+    Kembalikan {periode: pesan gagal}.
+    """
+    total_start_time = time.perf_counter()
+    state = StageState(STATE_PATH)
+    gagal = {}
+    gagal_konsolidasi = None
+    durasi = {}
+
+    perlu_scraper = [p for p in periods if perlu_dijalankan(state, "scraper", *p, dipaksa)]
+    if perlu_scraper:
+        print(f"\n--- Menjalankan scarper_lk untuk {len(perlu_scraper)} periode ---")
+        start = time.perf_counter()
+        hasil_scraper, gagal_scraper = tahap_scraper_batch(perlu_scraper)
+        durasi['scarper_lk'] = time.perf_counter() - start
+        for p, hasil in hasil_scraper.items():
+            catat_scraper(state, *p, hasil)
+        gagal.update({p: f"scraper: {pesan}" for p, pesan in gagal_scraper.items()})
+
+    hasil_rekap = {}
+    perlu_rekap = [p for p in periods if p not in gagal and perlu_dijalankan(state, "rekap", *p, dipaksa)]
+    if perlu_rekap:
+        print(f"\n--- Menjalankan rekap_fundamental untuk {len(perlu_rekap)} periode ---")
+        start = time.perf_counter()
+        hasil_rekap, gagal_rekap = tahap_rekap_batch(perlu_rekap)
+        durasi['rekap_fundamental'] = time.perf_counter() - start
+        for p in hasil_rekap:
+            catat_tahap(state, "rekap", *p)
+        gagal.update({p: f"rekap: {pesan}" for p, pesan in gagal_rekap.items()})
+
+    if perlu_dijalankan(state, "konsolidasi", *periods[-1], dipaksa):
+        print("\n--- Menjalankan Konsolidasi ---")
+        start = time.perf_counter()
+        try:
+            tahap_konsolidasi(hasil_rekap.values())
+            catat_tahap(state, "konsolidasi", *periods[-1])
+        except Exception as e:
+            # Tidak dicatat: run berikutnya menjalankan konsolidasi lagi
+            gagal_konsolidasi = str(e)
+            print(f"Konsolidasi GAGAL - {e}")
+        durasi['Konsolidasi'] = time.perf_counter() - start
+
+    total_durasi = time.perf_counter() - total_start_time
+    print("\n--- RINGKASAN BATCH ---")
+    for nama in ("scarper_lk", "rekap_fundamental", "Konsolidasi"):
+        _cetak_durasi(nama, durasi.get(nama))
+    for p in periods:
+        if p in gagal:
+            status = f"GAGAL - {gagal[p]}"
+        elif p in hasil_rekap:
+            status = f"{hasil_rekap[p]['new_rows']} data baru" if hasil_rekap[p] is not None else "tidak ada data"
+        else:
+            status = "tidak berubah"
+        print(f"{format_period(*p)}: {status}")
+    if gagal_konsolidasi:
+        print(f"Konsolidasi: GAGAL - {gagal_konsolidasi}")
+    print(f"Total Waktu Eksekusi: {_fmt_hms(total_durasi)} ({total_durasi:.2f} detik)")
+    _selesaikan_metrik(durasi, {"periode": [format_period(*p) for p in periods],
+                                "gagal": {format_period(*p): pesan for p, pesan in gagal.items()},
+                                "gagal_konsolidasi": gagal_konsolidasi})
+    return gagal
+
+def jalankan_semua_script(argv=None):
+    args = parse_args(argv)
     total_start_time = time.perf_counter()  # 1) mulai timer utama SEBELUM input
     try:
-        # 1) Input sekali di awal
-        tahun = input("Masukkan tahun (misal: 2025): ").strip()
-        kuartal = input("Masukkan kuartal (1/2/3/4): ").strip()
+        if args.periode:
+            _siapkan_sys_path()
+            jalankan_batch(parse_period_range(args.periode), _tahap_dipaksa(args.force))
+            return
+
+        # 1) Input sekali di awal (atau dari argumen)
+        tahun = (args.tahun or input("Masukkan tahun (misal: 2025): ")).strip()
+        kuartal = (args.kuartal or input("Masukkan kuartal (1/2/3/4): ")).strip()
 
         if not (tahun.isdigit() and len(tahun) == 4):
             print("Tahun harus 4 digit angka, contoh 2025.")
@@ -19,94 +298,100 @@ def jalankan_semua_script():
             print("Kuartal harus 1, 2, 3, atau 4.")
             return
 
-        # Input untuk dipipe ke stdin masing-masing script (akhiri newline)
-        piped_input = f"{tahun}\n{kuartal}\n"
-
-        # 2) Path dan file
-        path_script_1_dir = r"C:\Users\ASUS\Documents\Investasi\Automation\Web Scarping"
-        file_script_1 = "scarper_lk.py"
-
-        path_script_2_dir = r"C:\Users\ASUS\Documents\Investasi\Automation"
-        file_script_2 = "rekap_fundamental.py"
-        file_script_3 = "Konsolidasi.py"
-
-        # 3) Script 1
-        print(f"\n--- Menjalankan {file_script_1} untuk Tahun {tahun} Kuartal {kuartal} ---")
-        start_script_1 = time.perf_counter()
-        subprocess.run(
-            [sys.executable, file_script_1],
-            cwd=path_script_1_dir,
-            input=piped_input,
-            text=True,
-            check=True
-        )
-        durasi_script_1 = time.perf_counter() - start_script_1
-        print(f"--- Selesai {file_script_1} (Durasi: {_fmt_hms(durasi_script_1)} ({durasi_script_1:.2f} detik)) ---")
-
-        # 4) Script 2
-        print(f"\n--- Menjalankan {file_script_2} untuk Tahun {tahun} Kuartal {kuartal} ---")
-        start_script_2 = time.perf_counter()
-        subprocess.run(
-            [sys.executable, file_script_2],
-            cwd=path_script_2_dir,
-            input=piped_input,
-            text=True,
-            check=True
-        )
-        durasi_script_2 = time.perf_counter() - start_script_2
-        print(f"--- Selesai {file_script_2} (Durasi: {_fmt_hms(durasi_script_2)} ({durasi_script_2:.2f} detik)) ---")
-
-        # 5) Script 3 (tanpa input)
-        print(f"\n--- Menjalankan {file_script_3} ---")
-        start_script_3 = time.perf_counter()
-        subprocess.run(
-            [sys.executable, file_script_3],
-            cwd=path_script_2_dir,
-            check=True
-        )
-        durasi_script_3 = time.perf_counter() - start_script_3
-        print(f"--- Selesai {file_script_3} (Durasi: {_fmt_hms(durasi_script_3)} ({durasi_script_3:.2f} detik)) ---")
+        _siapkan_sys_path()
+        state = StageState(STATE_PATH)
+        dipaksa = _tahap_dipaksa(args.force)
+
+        stream = None
+        hasil_scraper = hasil_rekap = None
+        durasi_script_1 = durasi_script_2 = durasi_script_3 = None
+
+        jalankan_scraper = perlu_dijalankan(state, "scraper", tahun, kuartal, dipaksa)
+        if jalankan_scraper and PIPELINE_MODE:
+            # 2+3) Tahap 1 & 2 bersamaan: download -> antrean -> ekstraksi rekap
+            print(f"\n--- Menjalankan scarper_lk + rekap_fundamental (pipeline) untuk Tahun {tahun} Kuartal {kuartal} ---")
+            start_script_1 = time.perf_counter()
+            hasil_scraper, hasil_rekap, stream = tahap_scraper_dan_rekap(tahun, kuartal)
+            durasi_script_1 = time.perf_counter() - start_script_1
+            print(f"--- Selesai pipeline (Durasi: {_fmt_hms(durasi_script_1)} ({durasi_script_1:.2f} detik)) ---")
+            catat_scraper(state, tahun, kuartal, hasil_scraper)
+            catat_tahap(state, "rekap", tahun, kuartal)
+        else:
+            if jalankan_scraper:
+                # 2) Tahap 1: download laporan keuangan
+                print(f"\n--- Menjalankan scarper_lk untuk Tahun {tahun} Kuartal {kuartal} ---")
+                start_script_1 = time.perf_counter()
+                hasil_scraper = tahap_scraper(tahun, kuartal)
+                durasi_script_1 = time.perf_counter() - start_script_1
+                print(f"--- Selesai scarper_lk (Durasi: {_fmt_hms(durasi_script_1)} ({durasi_script_1:.2f} detik)) ---")
+                catat_scraper(state, tahun, kuartal, hasil_scraper)
+
+            if perlu_dijalankan(state, "rekap", tahun, kuartal, dipaksa):
+                # 3) Tahap 2: rekap fundamental
+                print(f"\n--- Menjalankan rekap_fundamental untuk Tahun {tahun} Kuartal {kuartal} ---")
+                start_script_2 = time.perf_counter()
+                hasil_rekap = tahap_rekap(tahun, kuartal)
+                durasi_script_2 = time.perf_counter() - start_script_2
+                print(f"--- Selesai rekap_fundamental (Durasi: {_fmt_hms(durasi_script_2)} ({durasi_script_2:.2f} detik)) ---")
+                catat_tahap(state, "rekap", tahun, kuartal)
+
+        if perlu_dijalankan(state, "konsolidasi", tahun, kuartal, dipaksa):
+            # 4) Tahap 3: konsolidasi semua kuartal (rekap yang dilewati dibaca dari Excel)
+            print("\n--- Menjalankan Konsolidasi ---")
+            start_script_3 = time.perf_counter()
+            tahap_konsolidasi([hasil_rekap])
+            durasi_script_3 = time.perf_counter() - start_script_3
+            print(f"--- Selesai Konsolidasi (Durasi: {_fmt_hms(durasi_script_3)} ({durasi_script_3:.2f} detik)) ---")
+            catat_tahap(state, "konsolidasi", tahun, kuartal)
 
         total_end_time = time.perf_counter()  # 3) selesai timer utama
         total_durasi = total_end_time - total_start_time
 
         print("\n=== SEMUA SCRIPT BERHASIL DIJALANKAN ===")
 
-        # 4) Minta input jumlah file baru
-        try:
-            jumlah_file_str = input("Masukkan total jumlah file baru yang diproses: ").strip()
-            jumlah_file = int(jumlah_file_str)
-            if jumlah_file <= 0:
-                print("Jumlah file harus > 0. Menggunakan 1 sebagai default.")
-                jumlah_file = 1
-        except ValueError:
-            print("Input tidak valid, menggunakan 1 sebagai default.")
-            jumlah_file = 1
-
-        # 5) Rata-rata
-        rata_rata_per_file = total_durasi / jumlah_file
+        # 5) Jumlah file baru langsung dari hasil rekap (tidak perlu input manual)
+        jumlah_file = hasil_rekap['new_rows'] if hasil_rekap is not None else 0
+        if jumlah_file <= 0:
+            print("Tidak ada file baru. Menggunakan 1 sebagai pembagi rata-rata.")
+        rata_rata_per_file = total_durasi / max(jumlah_file, 1)
 
         # 6) Ringkasan
         print("\n--- RINGKASAN WAKTU EKSEKUSI ---")
-        print(f"Waktu Eksekusi {file_script_1}: {_fmt_hms(durasi_script_1)} ({durasi_script_1:.2f} detik)")
-        print(f"Waktu Eksekusi {file_script_2}: {_fmt_hms(durasi_script_2)} ({durasi_script_2:.2f} detik)")
-        print(f"Waktu Eksekusi {file_script_3}: {_fmt_hms(durasi_script_3)} ({durasi_script_3:.2f} detik)")
+        if stream is not None:
+            _cetak_durasi("scarper_lk + rekap_fundamental (pipeline)", durasi_script_1)
+            jumlah_download = (hasil_scraper or {}).get('downloaded', 0)
+            print(f"  Download: {jumlah_download} file baru ({jumlah_download / max(durasi_script_1, 1e-9):.2f} file/detik)")
+            print(f"  Ekstraksi: {stream['submitted']} file ({stream['extract_rate']:.2f} file/detik, {stream['cache_hits']} dari cache)")
+            print(f"  Antrean: maks {stream['queue_max']}, rata-rata {stream['queue_avg']:.1f}")
+        else:
+            _cetak_durasi("scarper_lk", durasi_script_1)
+            _cetak_durasi("rekap_fundamental", durasi_script_2)
+        _cetak_durasi("Konsolidasi", durasi_script_3)
         print("------------------------------------------")
         print(f"Total Waktu Eksekusi: {_fmt_hms(total_durasi)} ({total_durasi:.2f} detik)")
         print(f"Jumlah file baru diproses: {jumlah_file}")
         print(f"Rata-rata waktu per file baru: {rata_rata_per_file:.2f} detik/file")
 
-    except subprocess.CalledProcessError as e:
-        print("\n!!! ERROR: Eksekusi script gagal !!!")
-        print(f"Command: {e.cmd}")
-        print(f"Return code: {e.returncode}")
-        print("Lihat output di atas untuk detail error dari script yang gagal.")
-    except FileNotFoundError as e:
-        print("\n!!! ERROR: File script tidak ditemukan !!!")
+        if stream is not None:
+            durasi_tahap = {"pipeline": durasi_script_1}
+        else:
+            durasi_tahap = {"scarper_lk": durasi_script_1, "rekap_fundamental": durasi_script_2}
+        durasi_tahap["Konsolidasi"] = durasi_script_3
+        _selesaikan_metrik(durasi_tahap, {"periode": format_period(tahun, kuartal), "file_baru": jumlah_file,
+                                          "pipeline": stream is not None})
+
+    except ImportError as e:
+        print("\n!!! ERROR: Script tahap tidak ditemukan / dependensi belum terpasang !!!")
         print(f"Error: {e}")
+        print(f"Pastikan folder script ada di SCRIPT_DIRS: {SCRIPT_DIRS}")
+    except SystemExit as e:
+        # Beberapa tahap masih menghentikan proses saat input/data tidak valid
+        print("\n!!! ERROR: Eksekusi tahap dihentikan !!!")
+        print(f"Kode keluar: {e.code}")
+        print("Lihat output di atas untuk detail error dari tahap yang gagal.")
     except Exception as e:
         print("\n!!! ERROR: Terjadi kesalahan yang tidak terduga !!!")
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    jalankan_semua_script()
\ No newline at end of file
+    jalankan_semua_script()
@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import hashlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import urllib3
+from urllib3.util.retry import Retry
+
+import metrics
+
+# ----------------------------
+# KONFIGURASI DEFAULT
+# ----------------------------
+
+DEFAULT_MAX_WORKERS = 6          # jumlah download paralel (jangan terlalu besar, server IDX membatasi)
+DEFAULT_RETRIES = 4              # percobaan ulang per file
+DEFAULT_BACKOFF = 0.8            # jeda 0.8s, 1.6s, 3.2s, ... antar percobaan
+DEFAULT_TIMEOUT = 60             # detik (connect + read)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+CHUNK_BYTES = 1 << 16
+
+# Semua file .xlsx adalah arsip zip -> diawali 'PK'
+XLSX_MAGIC = b"PK"
+
+MANIFEST_NAME = "_manifest_download.json"
+MANIFEST_SAVE_EVERY = 25         # simpan manifest tiap N perubahan (tetap disimpan saat close)
+
+
+def file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def session_headers_from_driver(driver) -> Dict[str, str]:
+    """
+    Ambil cookie + User-Agent dari sesi Selenium yang sudah membuka halaman IDX,
+    agar request HTTP biasa dianggap sesi browser yang sama.
+    """
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+    headers = {
+        "User-Agent": driver.execute_script("return navigator.userAgent;"),
+        "Referer": driver.current_url,
+        "Accept": "*/*",
+    }
+    if cookies:
+        headers["Cookie"] = cookies
+    return headers
+
+
+class DownloadManifest:
+    """
+    Manifest download per kuartal (JSON di DOWNLOAD_FOLDER), per nama file:
+    url, size, etag, last_modified, sha1, mtime_ns. Dipakai untuk
+      - memastikan file lokal benar-benar lengkap (ukuran + hash + zip valid),
+        bukan sekadar ada (file terpotong / 0 byte dari run yang terputus);
+      - request bersyarat (If-None-Match / If-Modified-Since) agar laporan
+        yang direvisi dengan nama sama tetap ter-update tanpa unduh ulang
+        file yang tidak berubah.
+    """
+
+    def __init__(self, folder: str):
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, file_name: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(file_name)
+
+    def verify(self, file_path: str) -> Optional[bool]:
+        """
+        True  = file ada, cocok dengan manifest, dan zip valid;
+        False = file ada tapi tidak lengkap/rusak/tidak cocok manifest;
+        None  = file ada tapi belum tercatat di manifest (atau file tidak ada).
+        """
+        if not os.path.exists(file_path):
+            return None
+        st = os.stat(file_path)
+        if st.st_size == 0 or not zipfile.is_zipfile(file_path):
+            return False
+        entry = self.get(os.path.basename(file_path))
+        if entry is None:
+            return None
+        if entry.get("size") != st.st_size:
+            return False
+        if entry.get("mtime_ns") != st.st_mtime_ns:
+            # File tersentuh: hash menentukan
+            if file_sha1(file_path) != entry.get("sha1"):
+                return False
+            with self._lock:
+                entry["mtime_ns"] = st.st_mtime_ns
+                self._dirty += 1
+        return True
+
+    def has_validators(self, file_name: str) -> bool:
+        entry = self.get(file_name) or {}
+        return bool(entry.get("etag") or entry.get("last_modified"))
+
+    def conditional_headers(self, file_name: str) -> Dict[str, str]:
+        entry = self.get(file_name) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, file_path: str, url: str, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, sha1: Optional[str] = None) -> None:
+        st = os.stat(file_path)
+        entry = {
+            "url": url,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha1": sha1 or file_sha1(file_path),
+            "etag": etag,
+            "last_modified": last_modified,
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._lock:
+            self.entries[os.path.basename(file_path)] = entry
+            self._dirty += 1
+            flush = self._dirty >= MANIFEST_SAVE_EVERY
+        if flush:
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+
+    def close(self) -> None:
+        if self._dirty:
+            self.save()
+
+
+class HttpDownloader:
+    """
+    Downloader HTTP paralel dengan connection pooling (urllib3), retry +
+    backoff eksponensial, dan penulisan atomik: isi ditulis ke
+    '<nama>.part' lalu di-rename ke nama akhir setelah lengkap, sehingga file
+    setengah jadi tidak pernah terlihat dengan nama aslinya.
+
+    Bila diberi `manifest`, file lokal yang terverifikasi diminta secara
+    bersyarat (304 = tidak berubah, tidak diunduh ulang) dan tiap download
+    yang berhasil dicatat ke manifest.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT, manifest: Optional[DownloadManifest] = None):
+        self.headers = dict(headers or {})
+        self.manifest = manifest
+        self.max_workers = max(1, int(max_workers))
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=backoff, status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET", "HEAD"}), raise_on_status=False,
+        )
+        self.http = urllib3.PoolManager(
+            num_pools=4, maxsize=self.max_workers, block=True,
+            retries=retry, timeout=urllib3.Timeout(total=timeout),
+        )
+        self._lock = threading.Lock()
+
+    def download(self, url: str, dest_path: str) -> Tuple[bool, str]:
+        """Unduh 1 file. Kembalikan (berhasil, pesan); pesan 'tidak berubah' untuk 304."""
+        with metrics.span("download", file=os.path.basename(dest_path)) as attrs:
+            ok, msg = self._download(url, dest_path)
+            attrs.update(ok=ok, status=msg)
+            if ok and msg == "ok":
+                attrs["bytes"] = os.path.getsize(dest_path)
+        return ok, msg
+
+    def _download(self, url: str, dest_path: str) -> Tuple[bool, str]:
+        tmp_path = dest_path + ".part"
+        file_name = os.path.basename(dest_path)
+        headers = self.headers
+        if self.manifest is not None and self.manifest.verify(dest_path):
+            headers = {**headers, **self.manifest.conditional_headers(file_name)}
+        try:
+            resp = self.http.request("GET", url, headers=headers, preload_content=False)
+        except urllib3.exceptions.HTTPError as e:
+            return False, f"koneksi gagal: {e}"
+
+        try:
+            if resp.status == 304 and os.path.exists(dest_path):
+                return True, "tidak berubah"
+            if resp.status != 200:
+                return False, f"HTTP {resp.status}"
+            first = True
+            written = 0
+            sha1 = hashlib.sha1()
+            with open(tmp_path, "wb") as f:
+                for chunk in resp.stream(CHUNK_BYTES):
+                    if first:
+                        # Server bisa membalas halaman HTML (misal sesi kedaluwarsa) dengan status 200
+                        if not chunk.startswith(XLSX_MAGIC):
+                            raise ValueError("isi bukan file xlsx")
+                        first = False
+                    f.write(chunk)
+                    sha1.update(chunk)
+                    written += len(chunk)
+            if first:
+                raise ValueError("respons kosong")
+            expected = resp.headers.get("Content-Length")
+            if expected and expected.isdigit() and int(expected) != written and not resp.headers.get("Content-Encoding"):
+                raise ValueError(f"file terpotong ({written}/{expected} byte)")
+            os.replace(tmp_path, dest_path)
+            if self.manifest is not None:
+                self.manifest.record(dest_path, url, etag=resp.headers.get("ETag"),
+                                     last_modified=resp.headers.get("Last-Modified"), sha1=sha1.hexdigest())
+            return True, "ok"
+        except (urllib3.exceptions.HTTPError, OSError, ValueError) as e:
+            return False, str(e)
+        finally:
+            resp.release_conn()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def download_many(self, jobs: Iterable[Tuple[str, str]],
+                      on_done: Optional[Callable[[str, str, bool, str], None]] = None) -> List[Tuple[str, str, bool, str]]:
+        """
+        Unduh banyak (url, dest_path) sekaligus dengan maksimal `max_workers`
+        koneksi paralel. `on_done(url, dest_path, ok, pesan)` dipanggil begitu
+        tiap file selesai (thread-safe).
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.download, url, dest): (url, dest) for url, dest in jobs}
+            for future in as_completed(futures):
+                url, dest = futures[future]
+                try:
+                    ok, msg = future.result()
+                except Exception as e:
+                    ok, msg = False, str(e)
+                results.append((url, dest, ok, msg))
+                if on_done:
+                    with self._lock:
+                        on_done(url, dest, ok, msg)
+        return results
+
+    def close(self) -> None:
+        self.http.clear()
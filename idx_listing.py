@@ -0,0 +1,170 @@
+import os
+import json
+import urllib.parse
+from typing import Dict, List, Optional
+
+import urllib3
+from urllib3.util.retry import Retry
+
+# ----------------------------
+# KONFIGURASI ENDPOINT
+# ----------------------------
+
+IDX_BASE = "https://www.idx.co.id"
+# Endpoint JSON yang dipanggil halaman "Laporan Keuangan dan Tahunan" IDX
+LISTING_ENDPOINT = IDX_BASE + "/primary/ListedCompany/GetFinancialReport"
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGES = 50  # pengaman bila server tidak pernah mengembalikan halaman kosong
+
+# Kuartal (1/2/3/4) -> nilai parameter 'periode' di API (laporan tahunan = audit)
+PERIODE_MAP = {'1': 'tw1', '2': 'tw2', '3': 'tw3', '4': 'audit'}
+
+
+class ListingError(Exception):
+    """Respons listing API tidak bisa dipakai (HTTP error, bukan JSON, diblokir, dsb.)."""
+
+
+def listing_params(tahun, kuartal, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, str]:
+    return {
+        "indexFrom": str(page),
+        "pageSize": str(page_size),
+        "year": str(tahun),
+        "reportType": "rdf",
+        "EmitenType": "s",
+        "periode": PERIODE_MAP.get(str(kuartal), f"tw{kuartal}"),
+        "kodeEmiten": "",
+        "SortColumn": "KodeEmiten",
+        "SortOrder": "asc",
+    }
+
+
+def listing_url(params: Dict[str, str]) -> str:
+    return f"{LISTING_ENDPOINT}?{urllib.parse.urlencode(params)}"
+
+
+def _parse_json(text: str, url: str) -> dict:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        raise ListingError(f"respons bukan JSON dari {url} (diblokir/halaman login?)")
+    if not isinstance(data, dict) or "Results" not in data:
+        raise ListingError(f"format JSON tidak dikenal dari {url}")
+    return data
+
+
+# ----------------------------
+# FETCHER
+# Semua fetcher menyediakan get_json(params) -> dict respons API.
+# ----------------------------
+
+class HttpJsonFetcher:
+    """Panggil API langsung lewat HTTP (pakai header/cookie sesi browser bila ada)."""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: float = 30, retries: int = 3):
+        self.headers = {"Accept": "application/json, text/plain, */*", **(headers or {})}
+        self.http = urllib3.PoolManager(
+            retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          raise_on_status=False),
+            timeout=urllib3.Timeout(total=timeout),
+        )
+
+    def get_json(self, params: Dict[str, str]) -> dict:
+        url = listing_url(params)
+        try:
+            resp = self.http.request("GET", url, headers=self.headers)
+        except urllib3.exceptions.HTTPError as e:
+            raise ListingError(f"koneksi gagal: {e}")
+        if resp.status != 200:
+            raise ListingError(f"HTTP {resp.status} dari {url}")
+        return _parse_json(resp.data.decode("utf-8", errors="replace"), url)
+
+
+class BrowserJsonFetcher:
+    """Cadangan: buka URL API di browser Selenium (lolos proteksi yang menolak HTTP biasa)."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def get_json(self, params: Dict[str, str]) -> dict:
+        url = listing_url(params)
+        self.driver.get(url)
+        return _parse_json(self.driver.execute_script("return document.body.innerText;"), url)
+
+
+def fixture_name(params: Dict[str, str]) -> str:
+    return f"{params['year']}_{params['periode']}_p{params['indexFrom']}_s{params['pageSize']}.json"
+
+
+class FixtureFetcher:
+    """Baca respons yang sudah direkam dari folder (tanpa jaringan)."""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def get_json(self, params: Dict[str, str]) -> dict:
+        path = os.path.join(self.folder, fixture_name(params))
+        if not os.path.exists(path):
+            # Halaman di luar rekaman dianggap kosong (akhir listing)
+            return {"ResultCount": 0, "Results": []}
+        with open(path, "r", encoding="utf-8") as f:
+            return _parse_json(f.read(), path)
+
+
+class RecordingFetcher:
+    """Bungkus fetcher lain dan simpan tiap respons sebagai fixture."""
+
+    def __init__(self, inner, folder: str):
+        self.inner = inner
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def get_json(self, params: Dict[str, str]) -> dict:
+        data = self.inner.get_json(params)
+        with open(os.path.join(self.folder, fixture_name(params)), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        return data
+
+
+# ----------------------------
+# LISTING
+# ----------------------------
+
+def attachment_url(file_path: str) -> str:
+    """File_Path API (relatif, kadang berisi spasi) -> URL absolut ter-encode."""
+    if file_path.startswith("http://") or file_path.startswith("https://"):
+        parts = urllib.parse.urlsplit(file_path)
+        return urllib.parse.urlunsplit(parts._replace(path=urllib.parse.quote(parts.path, safe="/%")))
+    return IDX_BASE + urllib.parse.quote("/" + file_path.lstrip("/"), safe="/%")
+
+
+def list_report_urls(fetcher, tahun, kuartal, page_size: int = DEFAULT_PAGE_SIZE) -> List[str]:
+    """
+    Semua URL lampiran .xlsx untuk tahun/kuartal, dari listing API yang
+    dipaginasi (halaman besar). Berhenti bila semua ResultCount sudah
+    terbaca, halaman kosong, atau halaman tidak menambah emiten baru.
+    """
+    urls = []
+    seen = set()
+    emiten_seen = set()
+    for page in range(1, MAX_PAGES + 1):
+        data = fetcher.get_json(listing_params(tahun, kuartal, page, page_size))
+        results = data.get("Results") or []
+        new_emiten = 0
+        for item in results:
+            kode = item.get("KodeEmiten")
+            if kode not in emiten_seen:
+                emiten_seen.add(kode)
+                new_emiten += 1
+            for att in item.get("Attachments") or []:
+                path = att.get("File_Path") or ""
+                name = att.get("File_Name") or os.path.basename(path)
+                if not name.lower().endswith(".xlsx") or not path:
+                    continue
+                url = attachment_url(path)
+                if url not in seen:
+                    seen.add(url)
+                    urls.append(url)
+        total = data.get("ResultCount") or 0
+        if not results or not new_emiten or len(emiten_seen) >= total:
+            break
+    return urls
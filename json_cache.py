@@ -0,0 +1,69 @@
+import os
+import json
+import threading
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+# ----------------------------
+# CACHE TABEL JSON
+# Dipakai tabel kecil hasil parse Excel (kurs, dimensi sektor): isi di-cache di
+# disk sebagai JSON bersama sidik file sumber (path + ukuran + mtime), lalu
+# objeknya disimpan per proses dan dimuat ulang hanya bila file sumber berubah.
+# ----------------------------
+
+T = TypeVar("T")
+
+
+def source_signature(path: str) -> dict:
+    """Sidik file sumber untuk validasi cache disk. OSError bila file tidak ada."""
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def cache_path_for(path: str, cache_name: str) -> str:
+    """Lokasi default file cache: di folder yang sama dengan file sumber."""
+    return os.path.join(os.path.dirname(path), cache_name)
+
+
+def read_cache(cache_path: str, version: int) -> Optional[dict]:
+    """Isi file cache bila ada, terbaca, dan versinya cocok; selain itu None."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def write_cache(cache_path: str, version: int, source: dict, payload: dict, label: str) -> None:
+    """Tulis cache secara atomik (file .tmp lalu replace). Gagal tulis hanya dicetak sebagai peringatan."""
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "source": source, **payload}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Peringatan: Cache {label} {cache_path} tidak bisa ditulis. Error: {e}")
+
+
+class ProcessCache(Generic[T]):
+    """
+    Objek hasil `loader(path)` per file, dimuat sekali per proses (thread-safe)
+    dan dimuat ulang bila ukuran/mtime file berubah. OSError bila file tidak ada.
+    """
+
+    def __init__(self, loader: Callable[[str], T]):
+        self._loader = loader
+        self._items: Dict[str, Tuple[Tuple[int, int], T]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> T:
+        st = os.stat(path)
+        signature = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._items.get(path)
+            if cached is None or cached[0] != signature:
+                cached = (signature, self._loader(path))
+                self._items[path] = cached
+            return cached[1]
@@ -0,0 +1,108 @@
+import os
+from typing import Dict, Optional, Tuple
+
+from json_cache import ProcessCache, cache_path_for, read_cache, source_signature, write_cache
+
+# ----------------------------
+# TABEL KURS
+# File kurs (Excel) di-parse sekali menjadi dict {(tahun, kuartal, mata_uang): nilai}.
+# Hasil parse di-cache di disk lewat json_cache (kunci = ukuran + mtime file kurs)
+# sehingga run berikutnya / proses worker tidak perlu membuka Excel lagi.
+# ----------------------------
+
+CACHE_VERSION = 1
+CACHE_NAME = "_cache_kurs.json"
+DEFAULT_CURRENCY = "USD"  # file tanpa kolom mata uang dianggap kurs USD
+
+
+class KursError(Exception):
+    """Kurs tidak tersedia: file tidak terbaca, kolom tidak dikenal, atau periode tidak ada."""
+
+
+def _parse_excel(path: str) -> Dict[Tuple[int, int, str], float]:
+    import pandas as pd  # hanya dimuat bila cache disk tidak bisa dipakai
+
+    try:
+        df = pd.read_excel(path)
+    except Exception as e:
+        raise KursError(f"Gagal membaca file kurs {path}: {e}")
+
+    # Normalisasi nama kolom
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    currency_col = next((c for c in df.columns if 'mata uang' in c or 'currency' in c or 'valuta' in c), None)
+    tahun_col = next((c for c in df.columns if 'tahun' in c), None)
+    kuartal_col = next((c for c in df.columns if 'kuartal' in c), None)
+    nilai_col = next((c for c in df.columns if c != currency_col and ('nilai' in c or 'kurs' in c)), None)
+    if not tahun_col or not kuartal_col or not nilai_col:
+        raise KursError(f"Kolom di file kurs {os.path.basename(path)} harus mengandung 'tahun', 'kuartal', "
+                        f"dan 'nilai'/'kurs'. Kolom ditemukan: {list(df.columns)}")
+
+    tahun = pd.to_numeric(df[tahun_col], errors='coerce')
+    kuartal = pd.to_numeric(df[kuartal_col], errors='coerce')
+    nilai = pd.to_numeric(df[nilai_col], errors='coerce')
+    if currency_col:
+        currency = df[currency_col].astype(str).str.strip().str.upper()
+    else:
+        currency = pd.Series(DEFAULT_CURRENCY, index=df.index)
+
+    rates = {}
+    valid = tahun.notna() & kuartal.notna() & nilai.notna()
+    for t, k, cur, v in zip(tahun[valid], kuartal[valid], currency[valid], nilai[valid]):
+        # Baris pertama menang bila periode yang sama tercatat lebih dari sekali
+        rates.setdefault((int(t), int(k), cur), float(v))
+    return rates
+
+
+class KursTable:
+    """Lookup kurs O(1) per (tahun, kuartal, mata_uang)."""
+
+    def __init__(self, rates: Dict[Tuple[int, int, str], float], source: str = ""):
+        self.rates = rates
+        self.source = source
+
+    @classmethod
+    def load(cls, path: str, cache_path: Optional[str] = None) -> "KursTable":
+        """Muat dari cache disk bila file kurs belum berubah; selain itu parse Excel lalu perbarui cache."""
+        try:
+            signature = source_signature(path)
+        except OSError as e:
+            raise KursError(f"File kurs tidak ditemukan: {path} ({e})")
+        cache_path = cache_path or cache_path_for(path, CACHE_NAME)
+
+        data = read_cache(cache_path, CACHE_VERSION)
+        if data is not None and data.get("source") == signature:
+            try:
+                return cls({(t, k, cur): v for t, k, cur, v in data["rates"]}, path)
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        rates = _parse_excel(path)
+        write_cache(cache_path, CACHE_VERSION, signature,
+                    {"rates": [[t, k, cur, v] for (t, k, cur), v in sorted(rates.items())]}, "kurs")
+        return cls(rates, path)
+
+    def get(self, tahun, kuartal, currency: str = DEFAULT_CURRENCY) -> float:
+        key = (int(tahun), int(kuartal), currency.upper())
+        try:
+            return self.rates[key]
+        except KeyError:
+            raise KursError(f"Kurs {key[2]} untuk tahun {key[0]} kuartal {key[1]} tidak ditemukan di "
+                            f"{os.path.basename(self.source) or 'tabel kurs'}.")
+
+    def __contains__(self, key) -> bool:
+        tahun, kuartal, *rest = key
+        return (int(tahun), int(kuartal), (rest[0] if rest else DEFAULT_CURRENCY).upper()) in self.rates
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+
+_TABLES: ProcessCache[KursTable] = ProcessCache(KursTable.load)
+
+
+def get_kurs_table(path: str) -> KursTable:
+    """KursTable untuk file ini, dimuat sekali per proses (dimuat ulang bila file kurs berubah)."""
+    try:
+        return _TABLES.get(path)
+    except OSError as e:
+        raise KursError(f"File kurs tidak ditemukan: {path} ({e})")
@@ -0,0 +1,154 @@
+import os
+import time
+import uuid
+import glob
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (engine Parquet untuk pandas)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# ----------------------------
+# SKEMA TABEL
+# ----------------------------
+
+# Sama dengan FINANCIAL_KEYS di rekap_fundamental.py (urutan kolom sheet Data)
+FINANCIAL_COLUMNS = (
+    "Aset Lancar", "Aset Tetap", "Total Aset", "Liabilitas Jangka Pendek",
+    "Liabilitas Jangka Panjang", "Dana Syirkah Temporer", "Total Liabilitas",
+    "Ekuitas", "Pendapatan", "Laba Bruto", "Laba Usaha", "Laba Bersih",
+    "Arus Kas Operasi", "Arus Kas Investasi", "Arus Kas Pendanaan"
+)
+
+REKAP_FLOAT_COLUMNS = (
+    "Harga", "Shares", "Total Liabilitas", "Ekuitas", "Pendapatan",
+    "Laba Bruto", "Laba Bersih", "EPS", "Cap", "PER (x)", "PBV (x)", "DER (x)",
+    "ROE (%)", "GPM (%)", "NPM (%)"
+)
+
+# Nama tabel -> (kolom kunci string, kolom float)
+TABLE_SCHEMAS = {
+    "data": ("Saham", FINANCIAL_COLUMNS),
+    "rekap": ("Saham", REKAP_FLOAT_COLUMNS),
+}
+
+
+def _new_part_name() -> str:
+    # Nama part berurutan waktu (ns) agar "part terakhir menang" konsisten
+    return f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def coerce_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Samakan kolom & tipe dengan skema tabel (kolom hilang diisi NaN, kolom asing dibuang)."""
+    key_col, float_cols = TABLE_SCHEMAS[table]
+    out = pd.DataFrame(index=df.index)
+    out[key_col] = df[key_col].astype(str).str.strip() if key_col in df.columns else pd.Series(dtype=str)
+    for col in float_cols:
+        if col in df.columns:
+            out[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        else:
+            out[col] = pd.Series(float("nan"), index=df.index, dtype="float64")
+    return out.reset_index(drop=True)
+
+
+class MasterStore:
+    """
+    Penyimpanan kolumnar (Parquet) untuk tabel Data dan Rekap, dipartisi per
+    tahun/kuartal:
+
+        <root>/data/tahun=2025/kuartal=3/part-<waktu ns>-<id>.parquet
+        <root>/rekap/tahun=2025/kuartal=3/rekap.parquet
+
+    Tabel `data` bersifat append-only: tiap run hanya menulis 1 file part baru
+    berisi baris baru; saat dibaca, part digabung berurutan dan duplikat
+    Saham diambil yang TERAKHIR. Tabel `rekap` adalah turunan per kuartal dan
+    ditulis ulang hanya untuk partisi kuartal tersebut.
+    """
+
+    def __init__(self, root: str):
+        if not PARQUET_AVAILABLE:
+            raise ImportError("pyarrow belum terpasang (pip install pyarrow)")
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def partition_dir(self, table: str, tahun: int, kuartal: int) -> str:
+        return os.path.join(self.root, table, f"tahun={int(tahun)}", f"kuartal={int(kuartal)}")
+
+    def _part_files(self, table: str, tahun: int, kuartal: int) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.partition_dir(table, tahun, kuartal), "*.parquet")))
+
+    def has_partition(self, table: str, tahun: int, kuartal: int) -> bool:
+        return bool(self._part_files(table, tahun, kuartal))
+
+    def partitions(self, table: str) -> List[Tuple[int, int]]:
+        """Daftar (tahun, kuartal) yang punya data untuk tabel ini."""
+        result = []
+        for path in glob.glob(os.path.join(self.root, table, "tahun=*", "kuartal=*")):
+            if not glob.glob(os.path.join(path, "*.parquet")):
+                continue
+            tahun = int(os.path.basename(os.path.dirname(path)).split("=", 1)[1])
+            kuartal = int(os.path.basename(path).split("=", 1)[1])
+            result.append((tahun, kuartal))
+        return sorted(result)
+
+    @staticmethod
+    def _write_atomic(df: pd.DataFrame, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _read_parts(self, files: List[str], table: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        key_col, float_cols = TABLE_SCHEMAS[table]
+        if not files:
+            empty = coerce_schema(pd.DataFrame(columns=[key_col, *float_cols]), table)
+            return empty[columns] if columns else empty
+        read_cols = None
+        if columns:
+            read_cols = list(dict.fromkeys([key_col, *columns]))
+        df = pd.concat([pd.read_parquet(f, columns=read_cols) for f in files], ignore_index=True)
+        # Append-only: baris terbaru untuk Saham yang sama menang
+        df = df.drop_duplicates(subset=[key_col], keep="last").reset_index(drop=True)
+        return df[columns] if columns else df
+
+    # --- Tabel Data (append-only) ---
+
+    def append_data(self, tahun: int, kuartal: int, df_new: pd.DataFrame) -> Optional[str]:
+        """Tulis baris baru sebagai 1 file part baru di partisi tahun/kuartal."""
+        if df_new.empty:
+            return None
+        path = os.path.join(self.partition_dir("data", tahun, kuartal), _new_part_name())
+        self._write_atomic(coerce_schema(df_new, "data"), path)
+        return path
+
+    def read_data(self, tahun: int, kuartal: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return self._read_parts(self._part_files("data", tahun, kuartal), "data", columns)
+
+    def existing_saham(self, tahun: int, kuartal: int) -> set:
+        """Kode saham yang sudah ada di partisi (hanya kolom Saham yang dibaca)."""
+        df = self.read_data(tahun, kuartal, columns=["Saham"])
+        return set(df["Saham"].dropna().astype(str))
+
+    def compact_data(self, tahun: int, kuartal: int) -> None:
+        """Gabungkan semua part partisi menjadi 1 file (opsional, untuk perawatan)."""
+        files = self._part_files("data", tahun, kuartal)
+        if len(files) <= 1:
+            return
+        df = self._read_parts(files, "data")
+        self._write_atomic(df, os.path.join(self.partition_dir("data", tahun, kuartal), _new_part_name()))
+        for f in files:
+            os.remove(f)
+
+    # --- Tabel Rekap (turunan per kuartal) ---
+
+    def write_rekap(self, tahun: int, kuartal: int, df_rekap: pd.DataFrame) -> str:
+        path = os.path.join(self.partition_dir("rekap", tahun, kuartal), "rekap.parquet")
+        self._write_atomic(coerce_schema(df_rekap, "rekap"), path)
+        return path
+
+    def read_rekap(self, tahun: int, kuartal: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        return self._read_parts(self._part_files("rekap", tahun, kuartal), "rekap", columns)
@@ -0,0 +1,161 @@
+import os
+import json
+import math
+import time
+import threading
+import contextlib
+import multiprocessing
+from typing import Dict, List, Optional
+
+# ----------------------------
+# METRIK TAHAP & PER FILE
+# Span = 1 pengukuran durasi (tahap + atribut seperti file, baris dipindai,
+# sheet dikunjungi, template). Dicatat per proses; event dari proses worker
+# dikirim balik bersama hasil batch lalu digabung di proses utama.
+# Akhir run: ditulis ke file JSON lines + ringkasan p50/p95/maks per tahap.
+# ----------------------------
+
+ENABLED = True
+TOP_LAMBAT = 5  # jumlah file paling lambat yang ditampilkan di ringkasan
+
+
+class MetricsRecorder:
+    """Penampung event metrik milik 1 proses (thread-safe)."""
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, **attrs) -> None:
+        if not ENABLED:
+            return
+        event = {"stage": stage, "seconds": round(seconds, 6), "pid": os.getpid()}
+        event.update(attrs)
+        with self._lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **attrs):
+        """
+        Ukur durasi blok kode. Dict atribut yang di-yield boleh diisi di dalam
+        blok (misal jumlah baris) dan ikut tercatat, juga bila blok error.
+        """
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.record(stage, time.perf_counter() - start, **attrs)
+
+    def mark(self) -> int:
+        with self._lock:
+            return len(self.events)
+
+    def export_since(self, mark: int) -> List[dict]:
+        """
+        Event sejak `mark` untuk dikirim ke proses utama (lalu dibuang dari
+        sini). Di proses utama (mode thread/sekuensial) event sudah tercatat
+        langsung, jadi kembalikan list kosong.
+        """
+        if multiprocessing.parent_process() is None:
+            return []
+        with self._lock:
+            exported = self.events[mark:]
+            del self.events[mark:]
+        return exported
+
+    def extend(self, events: List[dict]) -> None:
+        if events:
+            with self._lock:
+                self.events.extend(events)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events = []
+        self.started_at = time.time()
+
+    def write_jsonl(self, path: str, run_info: Optional[dict] = None) -> str:
+        """Tulis 1 baris header run lalu 1 baris per event."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {"type": "run", "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                  "seconds": round(time.time() - self.started_at, 3)}
+        header.update(run_info or {})
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header, default=str) + "\n")
+            for event in events:
+                f.write(json.dumps(event, default=str) + "\n")
+        return path
+
+    def summary(self) -> List[dict]:
+        """Statistik per tahap (dan per template untuk event yang punya atribut template)."""
+        with self._lock:
+            events = list(self.events)
+        groups: Dict[str, List[float]] = {}
+        for event in events:
+            groups.setdefault(event["stage"], []).append(event["seconds"])
+            if event.get("template"):
+                groups.setdefault(f"{event['stage']} [{event['template']}]", []).append(event["seconds"])
+        rows = []
+        for name, values in groups.items():
+            values.sort()
+            rows.append({"stage": name, "count": len(values), "total": sum(values),
+                         "p50": percentile(values, 50), "p95": percentile(values, 95), "max": values[-1]})
+        return rows
+
+    def print_summary(self) -> None:
+        rows = self.summary()
+        if not rows:
+            return
+        print("\n--- METRIK PER TAHAP ---")
+        print(f"{'Tahap':<34} {'n':>7} {'total (s)':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'maks (ms)':>10}")
+        for row in rows:
+            print(f"{row['stage']:<34} {row['count']:>7} {row['total']:>10.2f} {row['p50'] * 1000:>10.1f} "
+                  f"{row['p95'] * 1000:>10.1f} {row['max'] * 1000:>10.1f}")
+
+        with self._lock:
+            per_file = [e for e in self.events if e["stage"] == "file" and e.get("file")]
+        if per_file:
+            print("File paling lambat:")
+            for event in sorted(per_file, key=lambda e: e["seconds"], reverse=True)[:TOP_LAMBAT]:
+                detail = ", ".join(f"{k}={event[k]}" for k in ("template", "sheets_visited", "rows_scanned") if k in event)
+                print(f"  - {event['file']}: {event['seconds'] * 1000:.1f} ms ({detail})")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Persentil nearest-rank dari list yang sudah terurut."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+_RECORDER = MetricsRecorder()
+
+
+def get_recorder() -> MetricsRecorder:
+    return _RECORDER
+
+
+def span(stage: str, **attrs):
+    return _RECORDER.span(stage, **attrs)
+
+
+def record(stage: str, seconds: float, **attrs) -> None:
+    _RECORDER.record(stage, seconds, **attrs)
+
+
+def finish_run(folder: str, prefix: str = "metrik", run_info: Optional[dict] = None) -> Optional[str]:
+    """Tulis metrik run ini ke <folder>/<prefix>_<waktu>.jsonl dan cetak ringkasannya. Kembalikan path file."""
+    if not ENABLED:
+        return None
+    _RECORDER.print_summary()
+    path = os.path.join(folder, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+    try:
+        _RECORDER.write_jsonl(path, run_info)
+    except OSError as e:
+        print(f"Peringatan: File metrik {path} tidak bisa ditulis. Error: {e}")
+        return None
+    print(f"Metrik tersimpan di: {path}")
+    return path
@@ -0,0 +1,42 @@
+import re
+from typing import List, Tuple
+
+# ----------------------------
+# RENTANG PERIODE
+# "2025Q3", "2020Q1..2025Q3", atau gabungan dengan koma: "2023Q4,2025Q1..2025Q2"
+# ----------------------------
+
+_PERIODE_RE = re.compile(r"^\s*(\d{4})\s*[Qq]\s*([1-4])\s*$")
+
+
+def parse_period(text: str) -> Tuple[int, int]:
+    match = _PERIODE_RE.match(text)
+    if not match:
+        raise ValueError(f"Periode tidak valid: '{text}' (format: 2025Q3)")
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_period_range(text: str) -> List[Tuple[int, int]]:
+    """Daftar (tahun, kuartal) terurut tanpa duplikat dari teks rentang periode."""
+    periods = set()
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        if ".." in part:
+            start_text, end_text = part.split("..", 1)
+            start, end = parse_period(start_text), parse_period(end_text)
+            if start > end:
+                raise ValueError(f"Awal rentang setelah akhir rentang: '{part.strip()}'")
+            tahun, kuartal = start
+            while (tahun, kuartal) <= end:
+                periods.add((tahun, kuartal))
+                tahun, kuartal = (tahun + 1, 1) if kuartal == 4 else (tahun, kuartal + 1)
+        else:
+            periods.add(parse_period(part))
+    if not periods:
+        raise ValueError("Rentang periode kosong")
+    return sorted(periods)
+
+
+def format_period(tahun, kuartal) -> str:
+    return f"{int(tahun)}Q{int(kuartal)}"
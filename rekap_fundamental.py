@@ -1,13 +1,31 @@
 import os
 import sys
 import glob
+import re
+import functools
+import hashlib
+import json
+import sqlite3
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
 import pandas as pd
 import numpy as np
 from typing import List, Union, Optional
 import warnings
 import time
+import queue
+import threading
 import openpyxl
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import openpyxl.styles
+import openpyxl.cell
+import openpyxl.utils
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+from master_store import MasterStore, PARQUET_AVAILABLE
+from period_range import parse_period_range, format_period
+from kurs_table import KursError, get_kurs_table
+import metrics
 
 # Suppress openpyxl UserWarning (termasuk Data Validation extension warning)
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -15,65 +33,77 @@ warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 # ----------------------------
 # KONFIGURASI (input setelah run)
 # ----------------------------
-def get_kurs_usd_to_idr(year, quarter):
-    kurs_file = r'C:\Users\ASUS\Documents\Investasi\Kurs USD.xlsx'
-    try:
-        df_kurs = pd.read_excel(kurs_file)
-        # Normalisasi nama kolom
-        df_kurs.columns = [str(c).strip().lower() for c in df_kurs.columns]
-        tahun_col = next((c for c in df_kurs.columns if 'tahun' in c), None)
-        kuartal_col = next((c for c in df_kurs.columns if 'kuartal' in c), None)
-        nilai_col = next((c for c in df_kurs.columns if 'nilai' in c or 'kurs' in c), None)
-
-        if not tahun_col or not kuartal_col or not nilai_col:
-            print(f"Kolom di file Kurs USD.xlsx harus mengandung 'tahun', 'kuartal', dan 'nilai'/'kurs'. Kolom ditemukan: {df_kurs.columns}")
-            sys.exit(1)
-
-        match = df_kurs[
-            (df_kurs[tahun_col].astype(int) == int(year)) &
-            (df_kurs[kuartal_col].astype(int) == int(quarter))
-        ]
-        if not match.empty:
-            return float(match.iloc[0][nilai_col])
-        else:
-            print(f"Kurs USD untuk tahun {year} kuartal {quarter} tidak ditemukan di file Kurs USD.xlsx.")
-            sys.exit(1)
-    except Exception as e:
-        print(f"Gagal membaca file Kurs USD.xlsx: {e}")
-        sys.exit(1)
+KURS_FILE = r'C:\Users\ASUS\Documents\Investasi\Kurs USD.xlsx'
+
+def get_kurs_usd_to_idr(year, quarter) -> float:
+    """Kurs USD->IDR 1 periode dari tabel kurs (di-parse sekali, di-cache di disk). KursError bila tidak ada."""
+    return get_kurs_table(KURS_FILE).get(year, quarter, "USD")
 
 def get_user_input():
     try:
         year = int(input("Masukkan tahun laporan (misal 2025): "))
         quarter = int(input("Masukkan kuartal (1-4): "))
-        kurs = get_kurs_usd_to_idr(year, quarter)
-        print(f"Kurs USD ke IDR untuk {year} Q{quarter}: {kurs}")
-        return year, quarter, kurs
-    except Exception:
+    except ValueError:
         print("Input tidak valid. Silakan jalankan ulang.")
         sys.exit(1)
-
-YEAR, QUARTER, KURS_USD_TO_IDR = get_user_input()
-
-# Mulai stopwatch setelah input kurs
-start_time = time.time()
+    try:
+        kurs = get_kurs_usd_to_idr(year, quarter)
+    except KursError as e:
+        print(e)
+        sys.exit(1)
+    print(f"Kurs USD ke IDR untuk {year} Q{quarter}: {kurs}")
+    return year, quarter, kurs
 
 # Path (edit sekali)
 BASE_INPUT_PATH = r'C:\Users\ASUS\Documents\Investasi\Laporan Keuangan'
 OUTPUT_FOLDER = r'C:\Users\ASUS\Documents\Investasi\Rekap Analisa Fundamental\ID'
+
+# Paralelisme ekstraksi
+EXECUTOR_MODE = "process"   # "process" (multi-core) atau "thread"
+MAX_WORKERS = None          # None = jumlah core (os.cpu_count())
+CHUNK_SIZE = 16             # jumlah file per batch yang dikirim ke 1 worker
+
+# Mode pipeline (file diekstrak begitu selesai diunduh): ukuran antrean & interval laporan progres
+STREAM_QUEUE_SIZE = 256
+STREAM_REPORT_SECONDS = 5.0
+
+# Backend pembaca xlsx untuk ekstraksi: "openpyxl" atau "xml" (zip + XML streaming)
+EXTRACTOR_BACKEND = "openpyxl"
+
+# Indeks lokasi sheet per template (dipelajari otomatis, disimpan antar run)
+USE_SHEET_INDEX = True
+SHEET_INDEX_PATH = os.path.join(OUTPUT_FOLDER, "_indeks_lokasi_sheet.json")
+SHEET_INDEX_ROW_SLACK = 25  # baris ekstra di luar baris terjauh yang pernah tercatat
+
+# Cache hasil ekstraksi (SQLite) agar file yang tidak berubah tidak di-parse ulang
+USE_EXTRACTION_CACHE = True
+CACHE_PATH = os.path.join(OUTPUT_FOLDER, "_cache_ekstraksi.sqlite")
+CACHE_MAX_ENTRIES = 100_000
+
+# Master store kolumnar (Parquet, butuh pyarrow) sebagai sumber data utama
+USE_MASTER_STORE = True
+MASTER_STORE_ROOT = os.path.join(OUTPUT_FOLDER, "_master_store")
+EXPORT_EXCEL = True  # tetap tulis "TAHUN Kuartal Q.xlsx" dari data yang sama (dibaca Konsolidasi.py)
+
+# Metrik per tahap & per file (JSON lines) saat script dijalankan langsung
+METRICS_FOLDER = os.path.join(OUTPUT_FOLDER, "_metrik")
 # ----------------------------
 # End configuration
 # ----------------------------
 
-# Variabel otomatis (jangan diedit)
-INPUT_FOLDER = os.path.join(BASE_INPUT_PATH, f"{YEAR} Q{QUARTER}")
-OUTPUT_FILENAME = f"{YEAR} Kuartal {QUARTER}.xlsx"
-
 _ANNUALIZATION_MAP = {1: 4, 2: 2, 3: 4/3, 4: 1}
-if QUARTER not in _ANNUALIZATION_MAP:
-    print(f"Error: QUARTER must be 1-4 (got {QUARTER}). Exiting.")
-    sys.exit(1)
-ANNUALIZATION_FACTOR = _ANNUALIZATION_MAP[QUARTER]
+
+# Urutan kolom keuangan & kolom baris ringkas (tuple) hasil worker
+FINANCIAL_KEYS = (
+    "Aset Lancar", "Aset Tetap", "Total Aset", "Liabilitas Jangka Pendek",
+    "Liabilitas Jangka Panjang", "Dana Syirkah Temporer", "Total Liabilitas",
+    "Ekuitas", "Pendapatan", "Laba Bruto", "Laba Usaha", "Laba Bersih",
+    "Arus Kas Operasi", "Arus Kas Investasi", "Arus Kas Pendanaan"
+)
+ROW_FIELDS = ('Saham',) + FINANCIAL_KEYS + ('_source_file',)
+
+# Naikkan jika logika ekstraksi berubah tanpa mengubah LABEL_RULES (cache lama jadi basi)
+_EXTRACTOR_REVISION = 2
 
 # ----------------------------
 # HELPER FUNCTIONS (Cepat)
@@ -105,6 +135,60 @@ def parse_number(val) -> Optional[float]:
     except Exception:
         return None
 
+def _float_or_nan(s: str) -> float:
+    try:
+        return float(s)
+    except Exception:
+        return np.nan
+
+def parse_number_series(values) -> pd.Series:
+    """
+    Versi vektor dari parse_number untuk 1 kolom (Series/list). Aturan sama:
+    angka apa adanya, "(x)" negatif, "x%" dibagi 100, koma/spasi dibuang.
+    Nilai yang tidak bisa di-parse menjadi NaN (pengganti None).
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        return s.astype(float)
+
+    arr = s.to_numpy(dtype=object)
+    result = np.full(len(arr), np.nan)
+
+    if pd.api.types.infer_dtype(arr, skipna=True) == 'string':
+        is_number = np.zeros(len(arr), dtype=bool)
+    else:
+        is_number = np.fromiter((isinstance(v, (int, float, np.number)) for v in arr), dtype=bool, count=len(arr))
+        if is_number.any():
+            result[is_number] = arr[is_number].astype(float)
+
+    text_mask = ~is_number & pd.notna(arr)
+    if not text_mask.any():
+        return pd.Series(result, index=s.index)
+
+    # Operasi string NumPy (np.char) berjalan per kolom, bukan per sel Python
+    texts = np.char.strip(arr[text_mask].astype(str))
+    neg = np.char.startswith(texts, '(') & np.char.endswith(texts, ')')
+    if neg.any():
+        texts[neg] = [t[1:-1].strip() for t in texts[neg]]
+    pct = np.char.endswith(texts, '%')
+    if pct.any():
+        texts[pct] = np.char.rstrip(texts[pct], '%')
+    texts = np.char.replace(np.char.replace(texts, ',', ''), ' ', '')
+
+    parsed = np.full(len(texts), np.nan)
+    filled = texts != ''
+    try:
+        # Cast object -> float memakai float() per elemen (hasil identik dengan parse_number)
+        parsed[filled] = texts[filled].astype(object).astype(float)
+    except ValueError:
+        # Ada teks yang bukan angka: cek satu per satu
+        parsed[filled] = [_float_or_nan(t) for t in texts[filled]]
+    parsed[pct] /= 100.0
+    parsed[neg] *= -1.0
+
+    result[text_mask] = parsed
+    return pd.Series(result, index=s.index)
+
 def safe_div(a, b):
     try:
         a = 0.0 if pd.isna(a) else float(a)
@@ -115,6 +199,48 @@ def safe_div(a, b):
     except Exception:
         return 0.0
 
+# Spesifikasi rasio: (kolom output, pembilang, penyebut, faktor pengali).
+# Dievaluasi berurutan sehingga rasio boleh memakai hasil rasio sebelumnya;
+# kolom berawalan "_" hanya perantara dan tidak ikut dikembalikan.
+RATIO_SPEC = (
+    ("EPS", "Laba Bersih Tahunan", "Shares", 1.0),
+    ("PER (x)", "Harga", "EPS", 1.0),
+    ("_BVPS", "Ekuitas", "Shares", 1.0),
+    ("PBV (x)", "Harga", "_BVPS", 1.0),
+    ("DER (x)", "Total Liabilitas", "Ekuitas", 1.0),
+    ("ROE (%)", "Laba Bersih Tahunan", "Ekuitas", 100.0),
+    ("GPM (%)", "Laba Bruto", "Pendapatan", 100.0),
+    ("NPM (%)", "Laba Bersih", "Pendapatan", 100.0),
+)
+
+def compute_ratios(df: pd.DataFrame, spec=RATIO_SPEC) -> pd.DataFrame:
+    """
+    Versi vektor dari safe_div untuk banyak rasio sekaligus: tiap kolom
+    input dikonversi 1x ke array float (NaN/non-angka -> 0.0), lalu semua
+    rasio dihitung berurutan. Penyebut 0 menghasilkan 0.0 seperti safe_div.
+    """
+    arrays = {}
+
+    def _column(name: str) -> np.ndarray:
+        if name not in arrays:
+            values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            arrays[name] = np.nan_to_num(values, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        return arrays[name]
+
+    out = {}
+    for name, numerator, denominator, factor in spec:
+        a = _column(numerator)
+        b = _column(denominator)
+        ratio = np.zeros(len(df), dtype=float)
+        np.divide(a, b, out=ratio, where=(b != 0))
+        if factor != 1.0:
+            ratio *= factor
+        # Hasil rasio yang dipakai lagi sebagai input diperlakukan seperti safe_div (NaN -> 0.0)
+        arrays[name] = np.nan_to_num(ratio, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        if not name.startswith('_'):
+            out[name] = ratio
+    return pd.DataFrame(out, index=df.index)
+
 def find_column_ci(df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
     """Mencari kolom di df dengan nama case-insensitive di antara kandidat."""
     cols_lower = {c.lower(): c for c in df.columns}
@@ -132,127 +258,531 @@ def _norm(s: str) -> str:
     """Helper normalisasi string untuk pencarian."""
     return str(s).strip().lower()
 
-def fast_extract_all_metrics(xlsx_path: str) -> dict:
+# Tabel pencocokan label (kolom A) -> kolom output.
+# Format: (pola, kolom output, mode, prioritas)
+#   mode "exact"    : label (setelah _norm) harus sama persis dengan pola
+#   mode "contains" : pola cukup muncul sebagai substring label
+#   prioritas       : angka lebih kecil menang; prioritas sama -> yang pertama ketemu
+LABEL_RULES = (
+    # Kunci yang harus cocok PERSIS (exact match)
+    ("Jumlah laba (rugi) sebelum pajak penghasilan", "Laba Usaha", "exact", 0),
+    ("Jumlah laba (rugi)", "Laba Bersih", "exact", 0),
+    ("Jumlah liabilitas", "Total Liabilitas", "exact", 0),
+    ("Jumlah aset", "Total Aset", "exact", 0),
+    ("Kode entitas", "Saham", "exact", 0),
+    # Metadata
+    ("mata uang pelaporan", "Mata uang pelaporan", "contains", 0),
+    ("pembulatan yang digunakan", "Pembulatan", "contains", 0),
+    # Data Keuangan
+    ("jumlah aset lancar", "Aset Lancar", "contains", 0),
+    ("jumlah aset tidak lancar", "Aset Tetap", "contains", 0),
+    ("jumlah liabilitas jangka pendek", "Liabilitas Jangka Pendek", "contains", 0),
+    ("jumlah liabilitas jangka panjang", "Liabilitas Jangka Panjang", "contains", 0),
+    ("jumlah dana syirkah temporer", "Dana Syirkah Temporer", "contains", 0),
+    ("jumlah ekuitas yang diatribusikan kepada pemilik entitas induk", "Ekuitas", "contains", 0),
+    ("jumlah laba bruto", "Laba Bruto", "contains", 0),
+    ("jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas operasi", "Arus Kas Operasi", "contains", 0),
+    ("jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas investasi", "Arus Kas Investasi", "contains", 0),
+    ("jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas pendanaan", "Arus Kas Pendanaan", "contains", 0),
+    # Pendapatan (dengan prioritas)
+    ("penjualan dan pendapatan usaha", "Pendapatan", "contains", 0),
+    ("pendapatan bunga", "Pendapatan", "contains", 1),
+    ("pendapatan dari premi asuransi", "Pendapatan", "contains", 2),
+)
+
+class _LabelMatcher:
     """
-    Ekstraksi super cepat: scan semua sheet 1x, hanya kolom A (label) dan B (nilai)
-    menggunakan openpyxl read_only. Mencari SEMUA key yang dibutuhkan.
+    Matcher label yang dikompilasi sekali dari LABEL_RULES.
+    Exact match lewat dict; semua pola contains digabung jadi 1 regex
+    alternation (lookahead, sehingga match yang tumpang tindih tetap ketemu).
+    Hasil per label di-cache karena label antar file hampir selalu sama.
     """
-    # Definisikan semua kunci yang dibutuhkan
-    
-    # Kunci yang harus cocok PERSIS (exact match)
-    exact_map = {
-        _norm("Jumlah laba (rugi) sebelum pajak penghasilan"): "Laba Usaha",
-        _norm("Jumlah laba (rugi)"): "Laba Bersih",
-        _norm("Jumlah liabilitas"): "Total Liabilitas",
-        _norm("Jumlah aset"): "Total Aset",
-        _norm("Kode entitas"): "Saham",
-    }
-    
-    # Kunci yang boleh substring (contains)
-    contains_map = {
-        # Metadata
-        "mata uang pelaporan": "Mata uang pelaporan",
-        "pembulatan yang digunakan": "Pembulatan",
-        # Data Keuangan
-        "jumlah aset lancar": "Aset Lancar",
-        "jumlah aset tidak lancar": "Aset Tetap",
-        "jumlah liabilitas jangka pendek": "Liabilitas Jangka Pendek",
-        "jumlah liabilitas jangka panjang": "Liabilitas Jangka Panjang",
-        "jumlah dana syirkah temporer": "Dana Syirkah Temporer",
-        "jumlah ekuitas yang diatribusikan kepada pemilik entitas induk": "Ekuitas",
-        "jumlah laba bruto": "Laba Bruto",
-        "jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas operasi": "Arus Kas Operasi",
-        "jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas investasi": "Arus Kas Investasi",
-        "jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas pendanaan": "Arus Kas Pendanaan",
-        # Pendapatan (dengan prioritas)
-        "penjualan dan pendapatan usaha": "Pendapatan",
-        "pendapatan bunga": "Pendapatan",
-        "pendapatan dari premi asuransi": "Pendapatan",
-    }
-    
-    # Prioritas khusus untuk Pendapatan
-    pendapatan_priority = {
-        "penjualan dan pendapatan usaha": 0,
-        "pendapatan bunga": 1,
-        "pendapatan dari premi asuransi": 2,
-    }
 
-    # Kumpulan semua output kolom yang kita cari
-    all_keys = {
-        "Saham", "Mata uang pelaporan", "Pembulatan", "Aset Lancar", "Aset Tetap",
-        "Total Aset", "Liabilitas Jangka Pendek", "Liabilitas Jangka Panjang",
-        "Dana Syirkah Temporer", "Total Liabilitas", "Ekuitas", "Pendapatan",
-        "Laba Bruto", "Laba Usaha", "Laba Bersih", "Arus Kas Operasi",
-        "Arus Kas Investasi", "Arus Kas Pendanaan"
-    }
-    
-    needed = set(all_keys)
-    result = {k: None for k in all_keys}
-    best_pendapatan = (999, None) # (priority, value)
+    def __init__(self, rules):
+        self._exact = {}
+        contains = {}
+        for order, (pattern, out, mode, priority) in enumerate(rules):
+            hit = (order, out, priority)
+            if mode == "exact":
+                self._exact.setdefault(_norm(pattern), []).append(hit)
+            elif mode == "contains":
+                contains.setdefault(_norm(pattern), []).append(hit)
+            else:
+                raise ValueError(f"Mode pencocokan tidak dikenal: {mode!r} (pola {pattern!r})")
 
-    try:
-        wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
-    except Exception as e:
-        # Gagal buka file, kembalikan hasil kosong dengan error
-        result['_error'] = f"Gagal buka file: {e}"
-        return result
+        self._contains = contains
+        # Pola yang merupakan prefix pola lain ikut cocok saat pola panjangnya cocok
+        self._implied = {
+            p: [q for q in contains if q != p and p.startswith(q)] for p in contains
+        }
+        alternation = "|".join(re.escape(p) for p in sorted(contains, key=len, reverse=True))
+        self._regex = re.compile(f"(?=({alternation}))") if contains else None
+        self.match = functools.lru_cache(maxsize=65536)(self._match)
 
-    for ws in wb.worksheets:
-        if not needed: # Jika semua sudah ketemu, stop
-            break
-            
+    def _match(self, label: str) -> tuple:
+        """Kembalikan tuple (kolom output, prioritas) untuk 1 label, urut sesuai LABEL_RULES."""
+        lbl = _norm(label)
+        if lbl == "":
+            return ()
+        hits = list(self._exact.get(lbl, ()))
+        if self._regex is not None:
+            found = set()
+            for m in self._regex.finditer(lbl):
+                p = m.group(1)
+                found.add(p)
+                found.update(self._implied[p])
+            for p in found:
+                hits.extend(self._contains[p])
+        hits.sort()
+        return tuple((out, priority) for _, out, priority in hits)
+
+_LABEL_MATCHER = _LabelMatcher(LABEL_RULES)
+
+# Versi ekstraktor untuk kunci cache: revisi manual + sidik tabel pencocokan
+EXTRACTOR_VERSION = f"{_EXTRACTOR_REVISION}-" + hashlib.sha1(repr(LABEL_RULES).encode("utf-8")).hexdigest()[:8]
+
+# Kumpulan semua output kolom yang kita cari
+ALL_KEYS = (
+    "Saham", "Mata uang pelaporan", "Pembulatan", "Aset Lancar", "Aset Tetap",
+    "Total Aset", "Liabilitas Jangka Pendek", "Liabilitas Jangka Panjang",
+    "Dana Syirkah Temporer", "Total Liabilitas", "Ekuitas", "Pendapatan",
+    "Laba Bruto", "Laba Usaha", "Laba Bersih", "Arus Kas Operasi",
+    "Arus Kas Investasi", "Arus Kas Pendanaan"
+)
+
+# ----------------------------
+# BACKEND PEMBACA XLSX
+# ----------------------------
+
+class _OpenpyxlSheetReader:
+    """Backend openpyxl read_only: hanya kolom A (label) dan B (nilai)."""
+
+    def __init__(self, xlsx_path: str):
+        self._wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+        self.sheet_names = [ws.title for ws in self._wb.worksheets]
+
+    def iter_rows(self, index: int, max_row: Optional[int] = None, min_row: int = 1):
+        # iter_rows(values_only=True) sangat cepat
+        return self._wb.worksheets[index].iter_rows(min_row=min_row, min_col=1, max_col=2, max_row=max_row, values_only=True)
+
+    def close(self):
+        self._wb.close()
+
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_TAG_ROW = _NS_MAIN + "row"
+_TAG_SI = _NS_MAIN + "si"
+_TAG_T = _NS_MAIN + "t"
+_TAG_R = _NS_MAIN + "r"
+_TAG_V = _NS_MAIN + "v"
+_TAG_IS = _NS_MAIN + "is"
+
+
+def _xml_text(node) -> str:
+    """Gabungkan teks <t> langsung dan <r><t> (rich text), tanpa <rPh> (fonetik)."""
+    parts = []
+    for child in node:
+        if child.tag == _TAG_T:
+            parts.append(child.text or "")
+        elif child.tag == _TAG_R:
+            t = child.find(_TAG_T)
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts).replace("x005F_", "")
+
+
+def _xml_cell_value(cell, shared_strings: list):
+    """Decode 1 elemen <c> dengan aturan yang sama seperti openpyxl (data_only)."""
+    data_type = cell.get("t", "n")
+    if data_type == "inlineStr":
+        inline = cell.find(_TAG_IS)
+        return _xml_text(inline) if inline is not None else None
+
+    value = cell.findtext(_TAG_V) or None
+    if value is None:
+        return None
+    if data_type == "n":
+        if "." in value or "E" in value or "e" in value:
+            return float(value)
+        return int(value)
+    if data_type == "s":
+        return shared_strings[int(value)]
+    if data_type == "b":
+        return bool(int(value))
+    return value
+
+
+class _XmlSheetReader:
+    """
+    Backend tanpa openpyxl: membaca zip xlsx langsung dan men-stream
+    sharedStrings.xml serta sheetN.xml dengan iterparse. Hanya kolom A/B
+    yang di-decode; elemen baris dibuang setelah dibaca.
+    """
+
+    def __init__(self, xlsx_path: str):
+        self._zip = zipfile.ZipFile(xlsx_path)
+        try:
+            self._sheet_parts = self._read_sheet_parts()
+            self.sheet_names = [name for name, _ in self._sheet_parts]
+            self._shared_strings = self._read_shared_strings()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def _read_sheet_parts(self) -> list:
+        rels = {}
+        with self._zip.open("xl/_rels/workbook.xml.rels") as f:
+            for rel in ET.parse(f).getroot().iter(_NS_PKG_REL + "Relationship"):
+                rels[rel.get("Id")] = rel.get("Target", "")
+
+        parts = []
+        with self._zip.open("xl/workbook.xml") as f:
+            for sheet in ET.parse(f).getroot().iter(_NS_MAIN + "sheet"):
+                target = rels.get(sheet.get(_NS_DOC_REL + "id"), "")
+                if "worksheets/" not in target:
+                    continue  # chartsheet / dialogsheet, sama seperti wb.worksheets
+                if target.startswith("/"):
+                    part = target.lstrip("/")
+                else:
+                    part = posixpath.normpath(posixpath.join("xl", target))
+                parts.append((sheet.get("name"), part))
+        return parts
+
+    def _read_shared_strings(self) -> list:
         try:
-            # iter_rows(values_only=True) sangat cepat
-            for label, value in ws.iter_rows(min_col=1, max_col=2, values_only=True):
-                if label is None or value in (None, ""):
+            f = self._zip.open("xl/sharedStrings.xml")
+        except KeyError:
+            return []
+        strings = []
+        with f:
+            for _, node in ET.iterparse(f):
+                if node.tag == _TAG_SI:
+                    strings.append(_xml_text(node))
+                    node.clear()
+        return strings
+
+    def iter_rows(self, index: int, max_row: Optional[int] = None, min_row: int = 1):
+        shared_strings = self._shared_strings
+        next_row = 1
+        with self._zip.open(self._sheet_parts[index][1]) as f:
+            for _, node in ET.iterparse(f):
+                if node.tag != _TAG_ROW:
                     continue
-                
-                lbl = _norm(label)
-                if lbl == "":
+                row_number = int(node.get("r") or next_row)
+                if max_row is not None and row_number > max_row:
+                    return
+                if row_number < min_row:
+                    node.clear()
                     continue
+                # Baris kosong yang tidak ditulis di XML tetap di-yield (sama seperti openpyxl)
+                next_row = max(next_row, min_row)
+                while next_row < row_number:
+                    next_row += 1
+                    yield None, None
+                next_row = row_number + 1
+                label = value = None
+                col = 0
+                for cell in node:
+                    ref = cell.get("r")
+                    if ref:
+                        letters = ref.rstrip("0123456789")
+                        col = 1 if letters == "A" else 2 if letters == "B" else 3
+                    else:
+                        col += 1
+                    if col == 1:
+                        label = _xml_cell_value(cell, shared_strings)
+                    elif col == 2:
+                        value = _xml_cell_value(cell, shared_strings)
+                    else:
+                        break
+                node.clear()
+                yield label, value
 
-                # 1. Cek Exact Match
-                if lbl in exact_map:
-                    out = exact_map[lbl]
-                    if out in needed or result[out] is None:
-                        result[out] = value
-                        needed.discard(out)
-
-                # 2. Cek Contains Match
-                for sub, out in contains_map.items():
-                    if sub in lbl:
-                        if out == "Pendapatan":
-                            pr = pendapatan_priority.get(sub, 99)
-                            if pr < best_pendapatan[0]:
-                                best_pendapatan = (pr, value)
-                                result["Pendapatan"] = value
-                                needed.discard("Pendapatan")
-                        elif out in needed or result[out] is None:
-                            result[out] = value
-                            needed.discard(out)
-                            
-                if not needed: # Early-stop
-                    break
-        except Exception:
-            # Abaikan sheet yang error (misal: sheet terproteksi/aneh)
-            continue
+    def close(self):
+        self._zip.close()
+
+
+_SHEET_READERS = {
+    "openpyxl": _OpenpyxlSheetReader,
+    "xml": _XmlSheetReader,
+}
+
+# ----------------------------
+# EKSTRAKSI METRIK
+# ----------------------------
+
+class _ExtractState:
+    """Status pencarian 1 file: key yang masih dicari, hasil, dan lokasi temuan."""
+
+    def __init__(self):
+        self.needed = set(ALL_KEYS)
+        self.result = {k: None for k in ALL_KEYS}
+        self.best_priority = {} # kolom output -> prioritas pola yang terpakai
+        self.locations = {}     # kolom output -> (index sheet, nomor baris)
+        self.scanned_upto = {}  # index sheet -> nomor baris terakhir yang sudah dicocokkan
+        self.rows_scanned = 0
+        self.sheets_visited = 0
+
+    def satisfies(self, expected: dict) -> bool:
+        """True jika semua key di `expected` ketemu dengan prioritas minimal sama baiknya."""
+        best_priority = self.best_priority
+        return all(best_priority.get(k, 999) <= pr for k, pr in expected.items())
+
+def _scan_rows(rows, state: _ExtractState, sheet_index: int, stop_when: Optional[dict] = None, min_row: int = 1) -> None:
+    """
+    Cocokkan label (kolom A) dan isi state. Berhenti jika semua key ketemu,
+    atau jika key di `stop_when` (key -> prioritas) sudah terpenuhi.
+    `rows` dimulai dari baris `min_row` (lanjutan scan sebelumnya).
+    """
+    match = _LABEL_MATCHER.match
+    needed, result = state.needed, state.result
+    best_priority, locations = state.best_priority, state.locations
+    state.sheets_visited += 1
+    row_number = min_row - 1
+    try:
+        for row_number, (label, value) in enumerate(rows, start=min_row):
+            if label is None or value in (None, ""):
+                continue
+
+            hits = match(str(label))
+            if not hits:
+                continue
+
+            for out, priority in hits:
+                if out not in best_priority or priority < best_priority[out]:
+                    best_priority[out] = priority
+                    result[out] = value
+                    locations[out] = (sheet_index, row_number)
+                    needed.discard(out)
 
+            if not needed: # Early-stop
+                return
+            if stop_when is not None and state.satisfies(stop_when):
+                return
+    finally:
+        state.rows_scanned += row_number - min_row + 1
+        state.scanned_upto[sheet_index] = row_number
+
+def _scan_sheet(reader, state: _ExtractState, sheet_index: int, max_row: Optional[int] = None, stop_when: Optional[dict] = None) -> None:
+    """Scan 1 sheet, lanjut dari baris setelah scan sebelumnya di sheet yang sama (jika ada)."""
+    min_row = state.scanned_upto.get(sheet_index, 0) + 1
+    rows = reader.iter_rows(sheet_index, max_row, min_row)
     try:
-        wb.close()
+        _scan_rows(rows, state, sheet_index, stop_when, min_row)
     except Exception:
+        # Abaikan sheet yang error (misal: sheet terproteksi/aneh)
         pass
-        
-    return result
+    finally:
+        rows.close()
+
+# ----------------------------
+# INDEKS LOKASI SHEET
+# ----------------------------
+
+def _template_signature(sheet_names: List[str]) -> str:
+    """Sidik template workbook: hash dari urutan nama sheet."""
+    return hashlib.sha1("\x1f".join(sheet_names).encode("utf-8")).hexdigest()[:16]
+
+def _detect_industri(state: _ExtractState) -> str:
+    """Tebak jenis industri dari pola yang terpakai (untuk informasi di indeks)."""
+    if state.result.get("Dana Syirkah Temporer") is not None:
+        return "syariah"
+    return {1: "bank", 2: "asuransi"}.get(state.best_priority.get("Pendapatan"), "umum")
+
+class SheetLocationIndex:
+    """
+    Indeks lokasi sheet per template (disimpan sebagai JSON antar run).
+    Per template dicatat sheet mana (posisi) dan sampai baris berapa key
+    ditemukan, serta key apa saja yang memang ada di template tersebut.
+    Perubahan yang dipelajari worker dikumpulkan lewat take_updates() lalu
+    digabung di proses utama dengan merge() sebelum save().
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.templates = {}
+        self.hits = 0
+        self.misses = 0
+        self._updates = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.templates = data.get("templates", {})
+            except Exception as e:
+                print(f"Peringatan: Indeks lokasi sheet {path} tidak bisa dibaca, mulai dari kosong. Error: {e}")
+
+    def hint(self, signature: str) -> Optional[dict]:
+        return self.templates.get(signature)
+
+    def record_hit(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def learn(self, signature: str, sheet_count: int, state: _ExtractState) -> None:
+        if not state.locations:
+            return
+        sheets = {}
+        for sheet_index, row_number in state.locations.values():
+            key = str(sheet_index)
+            sheets[key] = max(sheets.get(key, 0), row_number)
+        entry = {
+            "industri": _detect_industri(state),
+            "jumlah_sheet": sheet_count,
+            "sheets": sheets,
+            "keys": {k: state.best_priority[k] for k in state.locations},
+            "files": 1,
+        }
+        with self._lock:
+            self._merge_entry(self.templates, signature, entry)
+            self._merge_entry(self._updates, signature, entry)
+
+    @staticmethod
+    def _merge_entry(target: dict, signature: str, entry: dict) -> None:
+        current = target.get(signature)
+        if current is None:
+            target[signature] = {**entry, "sheets": dict(entry["sheets"]), "keys": dict(entry["keys"])}
+            return
+        for key, row_number in entry["sheets"].items():
+            current["sheets"][key] = max(current["sheets"].get(key, 0), row_number)
+        for key, priority in entry["keys"].items():
+            current["keys"][key] = min(current["keys"].get(key, priority), priority)
+        current["files"] = current.get("files", 0) + entry.get("files", 1)
+        current["industri"] = entry["industri"]
+
+    def take_updates(self) -> dict:
+        """Ambil (dan kosongkan) perubahan + statistik sejak panggilan sebelumnya."""
+        with self._lock:
+            updates = {"pid": os.getpid(), "templates": self._updates, "hits": self.hits, "misses": self.misses}
+            self._updates = {}
+            self.hits = 0
+            self.misses = 0
+        return updates
+
+    def merge(self, updates: dict) -> None:
+        if updates.get("pid") == os.getpid():
+            return  # mode thread: worker memakai objek indeks yang sama
+        with self._lock:
+            for signature, entry in updates.get("templates", {}).items():
+                self._merge_entry(self.templates, signature, entry)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "templates": self.templates}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+_SHEET_INDEX = None
+
+def get_sheet_index() -> SheetLocationIndex:
+    """Indeks lokasi sheet milik proses ini (dimuat sekali per proses/worker)."""
+    global _SHEET_INDEX
+    if _SHEET_INDEX is None:
+        _SHEET_INDEX = SheetLocationIndex(SHEET_INDEX_PATH)
+    return _SHEET_INDEX
+
+# ----------------------------
+# EKSTRAKSI METRIK
+# ----------------------------
+
+def fast_extract_all_metrics(xlsx_path: str, backend: Optional[str] = None, use_index: Optional[bool] = None) -> dict:
+    """
+    Ekstraksi super cepat: hanya kolom A (label) dan B (nilai).
+    Mencari SEMUA key yang dibutuhkan. `backend` memilih pembaca xlsx
+    ("openpyxl" atau "xml"); default mengikuti EXTRACTOR_BACKEND.
+
+    Jika indeks lokasi sheet aktif dan template file sudah dikenal, hanya
+    sheet/baris dari indeks yang dibaca; key yang tidak tercatat di indeks
+    template dianggap memang tidak ada. Bila ada key template yang tidak
+    ketemu di sana (miss), scan dilanjutkan ke sisa baris dan sheet lain tanpa
+    membaca ulang baris yang sudah dibaca, lalu indeks belajar dari hasilnya.
+    """
+    reader_cls = _SHEET_READERS[backend or EXTRACTOR_BACKEND]
+    index = get_sheet_index() if (USE_SHEET_INDEX if use_index is None else use_index) else None
+    file_name = os.path.basename(xlsx_path)
+    t0 = time.perf_counter()
+
+    state = _ExtractState()
+
+    try:
+        with metrics.span("open_workbook", file=file_name):
+            reader = reader_cls(xlsx_path)
+    except Exception as e:
+        # Gagal buka file, kembalikan hasil kosong dengan error
+        state.result['_error'] = f"Gagal buka file: {e}"
+        metrics.record("file", time.perf_counter() - t0, file=file_name, error=state.result['_error'])
+        return state.result
+
+    t_scan = time.perf_counter()
+    sheet_count = len(reader.sheet_names)
+    signature = _template_signature(reader.sheet_names) if index is not None else None
+    hint = index.hint(signature) if index is not None else None
+
+    hinted_ok = False
+    if hint:
+        expected = hint["keys"]
+        for key in sorted(hint["sheets"], key=int):
+            sheet_index = int(key)
+            if sheet_index >= sheet_count:
+                continue
+            _scan_sheet(reader, state, sheet_index, hint["sheets"][key] + SHEET_INDEX_ROW_SLACK, expected)
+            if state.satisfies(expected):
+                break
+        hinted_ok = state.satisfies(expected)
+    if index is not None:
+        index.record_hit(hinted_ok)
+
+    if not hinted_ok:
+        # Scan penuh: semua sheet berurutan (lanjut dari baris terakhir bila sudah dibaca) sampai semua key ketemu
+        for sheet_index in range(sheet_count):
+            if not state.needed: # Jika semua sudah ketemu, stop
+                break
+            _scan_sheet(reader, state, sheet_index)
+        if index is not None:
+            index.learn(signature, sheet_count, state)
+
+    try:
+        reader.close()
+    except Exception:
+        pass
+
+    # Waktu scan termasuk tutup file; "file" = buka + scan, untuk mencari template/file yang lambat
+    now = time.perf_counter()
+    metrics.record("sheet_scan", now - t_scan, file=file_name,
+                   rows_scanned=state.rows_scanned, sheets_visited=state.sheets_visited)
+    metrics.record("file", now - t0, file=file_name, template=_detect_industri(state), sheets=sheet_count,
+                   rows_scanned=state.rows_scanned, sheets_visited=state.sheets_visited,
+                   index_hit=hinted_ok if index is not None else None)
+    return state.result
 
 def process_file_worker(xlsx_path: str, kurs_usd: float, existing_saham_set: set) -> dict:
     """
-    Worker function untuk ProcessPoolExecutor.
     Membaca 1 file, mem-parsing, dan mengembalikan 1 baris data (dict).
+    Dipanggil per file oleh process_file_batch.
     """
     
     # 1. Ekstrak semua data dalam 1x pemindaian
     raw_data = fast_extract_all_metrics(xlsx_path)
-    
+    return build_row(raw_data, xlsx_path, kurs_usd, existing_saham_set)
+
+def build_row(raw_data: dict, xlsx_path: str, kurs_usd: float, existing_saham_set: set) -> dict:
+    """
+    Mengubah hasil mentah fast_extract_all_metrics menjadi 1 baris data (dict):
+    cek kode saham, lalu terapkan multiplier mata uang & pembulatan.
+    Cukup murah sehingga bisa dijalankan ulang dari nilai mentah di cache.
+    """
     if '_error' in raw_data:
         return {'_error': raw_data['_error'], '_file': xlsx_path}
 
@@ -291,15 +821,8 @@ def process_file_worker(xlsx_path: str, kurs_usd: float, existing_saham_set: set
 
     # 6. Siapkan baris hasil, parse, dan kalikan
     row = {'Saham': saham_str}
-    
-    financial_keys = [
-        "Aset Lancar", "Aset Tetap", "Total Aset", "Liabilitas Jangka Pendek",
-        "Liabilitas Jangka Panjang", "Dana Syirkah Temporer", "Total Liabilitas",
-        "Ekuitas", "Pendapatan", "Laba Bruto", "Laba Usaha", "Laba Bersih",
-        "Arus Kas Operasi", "Arus Kas Investasi", "Arus Kas Pendanaan"
-    ]
-    
-    for key in financial_keys:
+
+    for key in FINANCIAL_KEYS:
         raw_val = raw_data.get(key)
         parsed = parse_number(raw_val)
         row[key] = (parsed * total_multiplier) if parsed is not None else 0.0
@@ -307,31 +830,266 @@ def process_file_worker(xlsx_path: str, kurs_usd: float, existing_saham_set: set
     row['_source_file'] = os.path.basename(xlsx_path)
     return row
 
+def _worker_id() -> str:
+    """Identitas worker untuk laporan throughput (PID, atau nama thread di mode thread)."""
+    current = threading.current_thread()
+    if current is threading.main_thread():
+        return f"PID {os.getpid()}"
+    return f"PID {os.getpid()} / {current.name}"
+
+def _collect_row(result_row: dict, xlsx_path: str, rows: list, errors: list) -> bool:
+    """Masukkan hasil build_row ke rows (tuple ROW_FIELDS) / errors. True jika dilewati."""
+    if '_skipped' in result_row:
+        return True
+    if '_error' in result_row:
+        errors.append((result_row.get('_file', xlsx_path), result_row['_error']))
+    else:
+        rows.append(tuple(result_row[k] for k in ROW_FIELDS))
+    return False
+
+def process_file_batch(xlsx_paths: List[str], kurs_usd: float, existing_saham_set: set, with_raw: bool = False,
+                       known_hashes: Optional[dict] = None) -> dict:
+    """
+    Worker function untuk ProcessPoolExecutor.
+    Memproses 1 batch file sekaligus dan mengembalikan baris ringkas (tuple
+    berurutan sesuai ROW_FIELDS) beserta statistik worker. Jika `with_raw`,
+    hasil mentah + sidik file ikut dikembalikan untuk disimpan di cache;
+    `known_hashes` (path -> (sidik, sha1)) dari lookup cache di proses utama
+    dipakai supaya file tidak di-hash dua kali.
+    """
+    t0 = time.perf_counter()
+    recorder = metrics.get_recorder()
+    metrics_mark = recorder.mark()
+    rows = []
+    errors = []
+    raw_entries = []
+    skipped = 0
+
+    for path in xlsx_paths:
+        try:
+            raw_data = fast_extract_all_metrics(path)
+            if with_raw and '_error' not in raw_data:
+                fingerprint, sha1 = _content_id(path, (known_hashes or {}).get(path))
+                raw_entries.append((path, fingerprint, sha1, raw_data))
+            with metrics.span("parse", file=os.path.basename(path)):
+                result_row = build_row(raw_data, path, kurs_usd, existing_saham_set)
+        except Exception as e:
+            result_row = {'_error': f"Worker gagal: {e}", '_file': path}
+
+        if _collect_row(result_row, path, rows, errors):
+            skipped += 1
+
+    return {
+        'worker': _worker_id(),
+        'files': len(xlsx_paths),
+        'rows': rows,
+        'skipped': skipped,
+        'errors': errors,
+        'raw': raw_entries,
+        'elapsed': time.perf_counter() - t0,
+        'sheet_index': get_sheet_index().take_updates() if USE_SHEET_INDEX else None,
+        'metrics': recorder.export_since(metrics_mark),
+    }
+
+# ----------------------------
+# CACHE EKSTRAKSI
+# ----------------------------
+
+def file_fingerprint(path: str) -> tuple:
+    """Sidik cepat file: (ukuran byte, mtime dalam nanodetik)."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _content_id(path: str, known: Optional[tuple] = None) -> tuple:
+    """(sidik, sha1) file; sha1 yang sudah dihitung (`known`) dipakai ulang bila sidik file belum berubah."""
+    fingerprint = file_fingerprint(path)
+    if known is not None and tuple(known[0]) == fingerprint:
+        return fingerprint, known[1]
+    return fingerprint, file_sha1(path)
+
+class ExtractionCache:
+    """
+    Cache hasil mentah fast_extract_all_metrics di SQLite, dialamatkan oleh
+    isi file (sha1) + EXTRACTOR_VERSION. Tabel `berkas` menyimpan alias
+    (path, ukuran, mtime) -> sha1 supaya file yang tidak berubah bahkan tidak
+    perlu di-hash ulang. Multiplier kurs/pembulatan tidak di-cache; build_row
+    menerapkannya lagi dari nilai mentah.
+    """
+
+    def __init__(self, path: str, version: str = None, max_entries: int = None):
+        self.version = version or EXTRACTOR_VERSION
+        self.max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Mode streaming: dibuat di thread utama, dipakai thread dispatcher (akses tetap bergiliran)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS konten (
+                sha1 TEXT NOT NULL,
+                versi TEXT NOT NULL,
+                raw TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (sha1, versi)
+            );
+            CREATE TABLE IF NOT EXISTS berkas (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha1 TEXT NOT NULL
+            );
+        """)
+
+    def lookup(self, xlsx_path: str) -> tuple:
+        """
+        (nilai mentah, None) bila ada di cache. Saat miss: (None, (sidik, sha1));
+        sha1 yang sudah dihitung di sini diteruskan ke worker supaya file tidak
+        di-hash dua kali.
+        """
+        path = os.path.abspath(xlsx_path)
+        size, mtime_ns = file_fingerprint(path)
+        row = self._conn.execute(
+            "SELECT k.sha1, k.raw FROM berkas b JOIN konten k ON k.sha1 = b.sha1 AND k.versi = ? "
+            "WHERE b.path = ? AND b.size = ? AND b.mtime_ns = ?",
+            (self.version, path, size, mtime_ns),
+        ).fetchone()
+        if row is None:
+            # File baru/tersentuh: cek berdasarkan isi (misal file yang di-download ulang tapi sama)
+            sha1 = file_sha1(path)
+            row = self._conn.execute(
+                "SELECT sha1, raw FROM konten WHERE sha1 = ? AND versi = ?", (sha1, self.version)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, ((size, mtime_ns), sha1)
+            self._remember_path(path, size, mtime_ns, sha1)
+
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE konten SET last_used = ? WHERE sha1 = ? AND versi = ?", (time.time(), row[0], self.version)
+        )
+        return json.loads(row[1]), None
+
+    def put(self, xlsx_path: str, fingerprint: tuple, sha1: str, raw_data: dict) -> None:
+        size, mtime_ns = fingerprint
+        self._conn.execute(
+            "INSERT OR REPLACE INTO konten (sha1, versi, raw, last_used) VALUES (?, ?, ?, ?)",
+            (sha1, self.version, json.dumps(raw_data, default=str), time.time()),
+        )
+        self._remember_path(os.path.abspath(xlsx_path), size, mtime_ns, sha1)
+
+    def _remember_path(self, path: str, size: int, mtime_ns: int, sha1: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO berkas (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+            (path, size, mtime_ns, sha1),
+        )
+
+    def prune(self) -> None:
+        """Buang entri versi ekstraktor lama dan entri terlama di atas max_entries."""
+        cur = self._conn.execute("DELETE FROM konten WHERE versi != ?", (self.version,))
+        self.evictions += cur.rowcount
+        cur = self._conn.execute(
+            "DELETE FROM konten WHERE rowid IN ("
+            "SELECT rowid FROM konten ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.evictions += cur.rowcount
+        self._conn.execute("DELETE FROM berkas WHERE sha1 NOT IN (SELECT sha1 FROM konten)")
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+    def summary(self) -> str:
+        return f"{self.hits} hit, {self.misses} miss, {self.evictions} eviction"
+
 # ----------------------------
 # FUNGSI SIMPAN (Robust)
 # ----------------------------
 
+_HEADER_FONT = openpyxl.styles.Font(bold=True)
+_HEADER_BORDER = openpyxl.styles.Border(
+    left=openpyxl.styles.Side(style="thin"), right=openpyxl.styles.Side(style="thin"),
+    top=openpyxl.styles.Side(style="thin"), bottom=openpyxl.styles.Side(style="thin"),
+)
+_HEADER_ALIGNMENT = openpyxl.styles.Alignment(horizontal="center", vertical="top")
+
+def _cell_text(values: pd.Series) -> pd.Series:
+    """
+    Teks nilai seperti tersimpan di sel xlsx: openpyxl menulis float dengan
+    format '%.16g' (1.0 -> '1', 0.1 + 0.2 -> '0.3'), bukan str() Python.
+    """
+    if pd.api.types.is_float_dtype(values.dtype):
+        return values.map("{:.16g}".format)
+    if values.dtype == object:
+        return values.map(lambda v: "%.16g" % v if isinstance(v, float) else str(v))
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.map(str)  # astype(str) membuang jam 00:00:00, sel xlsx tidak
+    return values.astype(str)
+
+def _column_widths(df: pd.DataFrame) -> List[float]:
+    """Lebar autofit (panjang teks sel terpanjang + 2) dihitung langsung dari DataFrame."""
+    widths = []
+    for i in range(df.shape[1]):
+        values = df.iloc[:, i]
+        lengths = _cell_text(values).str.len().where(values.notna(), 0)
+        max_length = max(len(str(df.columns[i])), int(lengths.max()) if len(lengths) else 0)
+        widths.append(max_length + 2)
+    return widths
+
+def _excel_rows(df: pd.DataFrame):
+    """Baris siap tulis: NaN -> sel kosong, inf -> teks 'inf' (sama seperti to_excel)."""
+    obj = df.astype(object).where(df.notna(), None)
+    for i in range(df.shape[1]):
+        if pd.api.types.is_float_dtype(df.dtypes.iloc[i]):
+            col = df.iloc[:, i].to_numpy()
+            inf_mask = np.isinf(col)
+            if inf_mask.any():
+                obj.iloc[inf_mask, i] = np.where(col[inf_mask] > 0, "inf", "-inf")
+    return obj.itertuples(index=False, name=None)
+
+def _write_sheet(wb, sheet_name: str, df: pd.DataFrame) -> None:
+    ws = wb.create_sheet(sheet_name)
+    if df.shape[1] == 0:
+        return
+    # Lebar kolom harus di-set sebelum baris pertama (mode write_only)
+    for idx, width in enumerate(_column_widths(df), start=1):
+        ws.column_dimensions[openpyxl.utils.get_column_letter(idx)].width = width
+
+    header = []
+    for col in df.columns:
+        cell = openpyxl.cell.WriteOnlyCell(ws, value=str(col))
+        cell.font = _HEADER_FONT
+        cell.border = _HEADER_BORDER
+        cell.alignment = _HEADER_ALIGNMENT
+        header.append(cell)
+    ws.append(header)
+    for row in _excel_rows(df):
+        ws.append(row)
+
 def save_workbook_with_autofit(target_path: str, df_data: pd.DataFrame, df_ringkasan: pd.DataFrame, df_rekap: pd.DataFrame) -> str:
-    """Menyimpan workbook dan autofit. Otomatis ganti nama jika file terkunci."""
+    """
+    Menyimpan workbook (sheet Data, Ringkasan, Rekap) dalam 1 kali tulis.
+    Lebar kolom dihitung dari DataFrame dan baris di-stream dengan openpyxl
+    write_only, jadi file tidak perlu dibuka & disimpan ulang untuk autofit.
+    Otomatis ganti nama jika file terkunci.
+    """
     def _write(path: str):
-        with pd.ExcelWriter(path, engine='openpyxl') as writer:
-            df_data.to_excel(writer, sheet_name='Data', index=False)
-            (df_ringkasan if not df_ringkasan.empty else pd.DataFrame()).to_excel(writer, sheet_name='Ringkasan', index=False)
-            df_rekap.to_excel(writer, sheet_name='Rekap', index=False)
-
-        # Autofit
-        wb = openpyxl.load_workbook(path)
-        for ws in wb.worksheets:
-            for col in ws.columns:
-                max_length = 0
-                col_letter = openpyxl.utils.get_column_letter(col[0].column)
-                for cell in col:
-                    val = "" if cell.value is None else str(cell.value)
-                    if len(val) > max_length:
-                        max_length = len(val)
-                ws.column_dimensions[col_letter].width = max_length + 2
-        wb.save(path)
-        wb.close()
+        with metrics.span("excel_write", file=os.path.basename(path), rows=len(df_data) + len(df_rekap)):
+            wb = openpyxl.Workbook(write_only=True)
+            _write_sheet(wb, 'Data', df_data)
+            _write_sheet(wb, 'Ringkasan', df_ringkasan if not df_ringkasan.empty else pd.DataFrame())
+            _write_sheet(wb, 'Rekap', df_rekap)
+            wb.save(path)
+            wb.close()
 
     try:
         _write(target_path)
@@ -346,91 +1104,402 @@ def save_workbook_with_autofit(target_path: str, df_data: pd.DataFrame, df_ringk
         print(f"Gagal menyimpan file: {e}")
         raise
 
+def open_master_store() -> Optional[MasterStore]:
+    """MasterStore di MASTER_STORE_ROOT, atau None jika dinonaktifkan / pyarrow tidak ada."""
+    if not USE_MASTER_STORE:
+        return None
+    if not PARQUET_AVAILABLE:
+        print("Peringatan: pyarrow belum terpasang, master store dinonaktifkan (hanya Excel).")
+        return None
+    try:
+        return MasterStore(MASTER_STORE_ROOT)
+    except Exception as e:
+        print(f"Peringatan: Master store {MASTER_STORE_ROOT} tidak bisa dibuka. Error: {e}")
+        return None
+
+def export_excel_from_store(tahun: int, kuartal: int, target_path: Optional[str] = None,
+                            df_ringkasan: Optional[pd.DataFrame] = None) -> str:
+    """Buat ulang "TAHUN Kuartal Q.xlsx" dari master store (export sesuai permintaan)."""
+    store = MasterStore(MASTER_STORE_ROOT)
+    if target_path is None:
+        target_path = os.path.join(OUTPUT_FOLDER, f"{tahun} Kuartal {kuartal}.xlsx")
+    os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+    return save_workbook_with_autofit(
+        target_path,
+        store.read_data(tahun, kuartal),
+        df_ringkasan if df_ringkasan is not None else pd.DataFrame(),
+        store.read_rekap(tahun, kuartal),
+    )
+
 # ----------------------------
-# MAIN EXECUTION
+# TAHAPAN (bisa dipanggil dari orkestrator tanpa subprocess)
 # ----------------------------
 
-if __name__ == "__main__":
-    if not os.path.isdir(INPUT_FOLDER):
-        print(f"Input folder tidak ada: {INPUT_FOLDER}")
-        sys.exit(1)
-
-    xlsx_files = [f for f in glob.glob(os.path.join(INPUT_FOLDER, "*.xlsx"))]
+def list_input_files(input_folder: str):
+    """(file laporan keuangan, file 'Ringkasan Saham-*') di folder input kuartal."""
+    xlsx_files = [f for f in glob.glob(os.path.join(input_folder, "*.xlsx"))]
     data_files = [f for f in xlsx_files if not os.path.basename(f).startswith("Ringkasan Saham-")]
     ringkasan_files = [f for f in xlsx_files if os.path.basename(f).startswith("Ringkasan Saham-")]
+    return data_files, ringkasan_files
 
-    # 1. Baca file output lama jika ada, untuk mendapatkan daftar saham yang sudah diproses
+def load_existing(tahun: int, kuartal: int, store: Optional[MasterStore], output_path: str):
+    """Daftar saham yang sudah diproses: dari master store, atau dari file output lama. Kembalikan (set, old_df)."""
     existing_saham = set()
-    output_path = os.path.join(OUTPUT_FOLDER, OUTPUT_FILENAME)
-    if os.path.exists(output_path):
+    old_df = None
+    if store is not None and store.has_partition('data', tahun, kuartal):
+        existing_saham = store.existing_saham(tahun, kuartal)
+        print(f"Ditemukan {len(existing_saham)} saham yang sudah ada di master store. Akan dilewati.")
+    elif os.path.exists(output_path):
         try:
             old_df = pd.read_excel(output_path, sheet_name='Data')
             if 'Saham' in old_df.columns:
                 existing_saham = set(old_df['Saham'].dropna().astype(str))
                 print(f"Ditemukan {len(existing_saham)} saham yang sudah ada di {output_path}. Akan dilewati.")
+                if store is not None:
+                    # Migrasi sekali: partisi master store diisi dari sheet Data lama
+                    store.append_data(tahun, kuartal, old_df)
         except Exception as e:
             print(f"Peringatan: Gagal membaca file output lama {output_path}. Error: {e}")
-            pass
+            old_df = None
+    return existing_saham, old_df
 
-    # 2. Proses semua file menggunakan ProcessPoolExecutor
-    records = []
-    files_to_process = data_files
-    print(f"Mulai memproses {len(files_to_process)} file (menggunakan parallel processing)...")
-    
-    start_process_time = time.time()
-    
-    with ThreadPoolExecutor() as executor:
-        # Submit semua pekerjaan
-        futures = {executor.submit(process_file_worker, f, KURS_USD_TO_IDR, existing_saham): f for f in files_to_process}
-        
-        processed_count = 0
-        skipped_count = 0
-        error_count = 0
-        
-        for future in as_completed(futures):
-            file_path = futures[future]
-            processed_count += 1
-            
+class _ExtractionRun:
+    """
+    Pembukuan 1 kali ekstraksi (dipakai mode batch maupun streaming): hasil
+    cache, hasil batch worker, error, statistik worker, indeks lokasi sheet,
+    dan ringkasan akhir.
+    """
+
+    def __init__(self, kurs_usd: float, existing_saham: set, shared: Optional[tuple] = None):
+        self.kurs_usd = kurs_usd
+        self.existing_saham = existing_saham
+        self.records = []
+        self.skipped = 0
+        self.errors = 0
+        self.processed = 0
+        self.total = 0
+        self.worker_stats = {}
+        self.index_hits = self.index_misses = 0
+        self.file_hashes = {}  # path -> (sidik, sha1) dari cache miss, diteruskan ke worker saat submit
+        self.start_time = time.time()
+        # shared = (cache, sheet_index) milik pemanggil (mode multi-periode); ditutup oleh pemanggil
+        self.owns_resources = shared is None
+        self.cache, self.sheet_index = _open_extraction_resources() if shared is None else shared
+
+    def _report_error(self, file_path: str, err) -> None:
+        self.errors += 1
+        print(f"ERROR: Gagal memproses {file_path}: {err}")
+
+    def take_from_cache(self, files: List[str]) -> List[str]:
+        """Ambil hasil mentah dari cache untuk file yang tidak berubah (tanpa parsing); kembalikan sisanya."""
+        if self.cache is None:
+            return list(files)
+        files_to_process = []
+        cache_errors = []
+        for f in files:
             try:
-                result_row = future.result()
-                
-                if not result_row:
-                    continue
-                
-                if '_skipped' in result_row:
-                    skipped_count += 1
-                elif '_error' in result_row:
-                    error_count += 1
-                    print(f"ERROR: Gagal memproses {result_row.get('_file', file_path)}: {result_row['_error']}")
-                else:
-                    records.append(result_row)
-                    
+                raw_data, content_id = self.cache.lookup(f)
             except Exception as e:
-                error_count += 1
-                print(f"FATAL ERROR: Gagal total pada worker untuk file {file_path}: {e}")
+                print(f"Peringatan: Gagal membaca cache untuk {f}. Error: {e}")
+                raw_data, content_id = None, None
+            if raw_data is None:
+                files_to_process.append(f)
+                if content_id is not None:
+                    self.file_hashes[f] = content_id
+            elif _collect_row(build_row(raw_data, f, self.kurs_usd, self.existing_saham), f, self.records, cache_errors):
+                self.skipped += 1
+        for file_path, err in cache_errors:
+            self._report_error(file_path, err)
+        return files_to_process
 
-            # Update progress
-            if processed_count % 20 == 0 or processed_count == len(files_to_process):
-                print(f"Proses... {processed_count}/{len(files_to_process)} file selesai. "
-                      f"(Baru: {len(records)}, Lewat: {skipped_count}, Gagal: {error_count})")
+    def submit(self, executor, chunk: List[str]):
+        known_hashes = {f: self.file_hashes.pop(f) for f in chunk if f in self.file_hashes}
+        return executor.submit(process_file_batch, chunk, self.kurs_usd, self.existing_saham, self.cache is not None,
+                               known_hashes)
 
-    print(f"Selesai memproses {len(files_to_process)} file dalam {time.time() - start_process_time:.2f} detik.")
-    print(f"Hasil: {len(records)} data baru, {skipped_count} dilewati, {error_count} gagal.")
+    def handle_result(self, future, chunk: List[str]) -> None:
+        self.processed += len(chunk)
+        try:
+            batch = future.result()
+        except Exception as e:
+            self.errors += len(chunk)
+            print(f"FATAL ERROR: Gagal total pada worker untuk batch {os.path.basename(chunk[0])} (+{len(chunk) - 1} file): {e}")
+            return
 
-    # 3. Gabungkan data baru ke file output lama
-    if not records and not os.path.exists(output_path):
-        print("Tidak ada data baru yang diproses dan tidak ada file lama. Keluar.")
-        sys.exit(0)
+        self.records.extend(batch['rows'])
+        self.skipped += batch['skipped']
+        if self.cache is not None:
+            for file_path, fingerprint, sha1, raw_data in batch['raw']:
+                try:
+                    self.cache.put(file_path, fingerprint, sha1, raw_data)
+                except Exception as e:
+                    print(f"Peringatan: Gagal menyimpan {file_path} ke cache. Error: {e}")
+        for file_path, err in batch['errors']:
+            self._report_error(file_path, err)
+
+        if self.sheet_index is not None and batch['sheet_index']:
+            self.sheet_index.merge(batch['sheet_index'])
+            self.index_hits += batch['sheet_index']['hits']
+            self.index_misses += batch['sheet_index']['misses']
+
+        metrics.get_recorder().extend(batch['metrics'])
+        stats = self.worker_stats.setdefault(batch['worker'], {'files': 0, 'elapsed': 0.0})
+        stats['files'] += batch['files']
+        stats['elapsed'] += batch['elapsed']
+
+    def progress(self) -> str:
+        return (f"Proses... {self.processed}/{self.total} file selesai. "
+                f"(Baru: {len(self.records)}, Lewat: {self.skipped}, Gagal: {self.errors})")
+
+    def finish(self) -> dict:
+        print(f"Selesai memproses {self.total} file dalam {time.time() - self.start_time:.2f} detik.")
+        if self.worker_stats:
+            print("Throughput per worker:")
+            for worker, stats in sorted(self.worker_stats.items()):
+                rate = stats['files'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+                print(f"  - {worker}: {stats['files']} file dalam {stats['elapsed']:.2f} detik ({rate:.1f} file/detik)")
+        if self.sheet_index is not None:
+            print(f"Indeks lokasi sheet: {self.index_hits} hit, {self.index_misses} miss (scan penuh), "
+                  f"{len(self.sheet_index.templates)} template dikenal.")
+        if self.owns_resources:
+            _close_extraction_resources(self.cache, self.sheet_index)
+        print(f"Hasil: {len(self.records)} data baru, {self.skipped} dilewati, {self.errors} gagal.")
+        return {'records': self.records, 'skipped': self.skipped, 'errors': self.errors}
+
+def _open_extraction_resources() -> tuple:
+    """(cache ekstraksi, indeks lokasi sheet) sesuai konfigurasi; masing-masing None bila nonaktif."""
+    cache = None
+    if USE_EXTRACTION_CACHE:
+        try:
+            cache = ExtractionCache(CACHE_PATH)
+        except Exception as e:
+            print(f"Peringatan: Cache ekstraksi {CACHE_PATH} tidak bisa dibuka, semua file di-parse. Error: {e}")
+    return cache, (get_sheet_index() if USE_SHEET_INDEX else None)
 
-    if not records and os.path.exists(output_path):
-        print("Tidak ada data baru yang diproses. Membaca data lama saja...")
+def _close_extraction_resources(cache, sheet_index) -> None:
+    if sheet_index is not None:
         try:
-            df_data = pd.read_excel(output_path, sheet_name='Data')
+            sheet_index.save()
         except Exception as e:
-            print(f"Gagal membaca data lama: {e}")
-            df_data = pd.DataFrame()
-    elif records:
-        new_df = pd.DataFrame(records)
+            print(f"Peringatan: Gagal menyimpan indeks lokasi sheet {sheet_index.path}. Error: {e}")
+    if cache is not None:
+        try:
+            cache.prune()
+            cache.close()
+        except Exception as e:
+            print(f"Peringatan: Gagal menyimpan cache ekstraksi {CACHE_PATH}. Error: {e}")
+        print(f"Cache ekstraksi: {cache.summary()}.")
+
+def _make_executor():
+    executor_cls = ProcessPoolExecutor if EXECUTOR_MODE == "process" else ThreadPoolExecutor
+    return executor_cls(max_workers=MAX_WORKERS)
+
+def extract_records(data_files: List[str], kurs_usd: float, existing_saham: set) -> dict:
+    """
+    Tahap ekstraksi: cache untuk file yang tidak berubah, sisanya di-parse
+    paralel (batch per worker). Kembalikan dict records (tuple ROW_FIELDS),
+    skipped, errors.
+    """
+    run = _ExtractionRun(kurs_usd, existing_saham)
+    files_to_process = run.take_from_cache(data_files)
+    if run.cache is not None:
+        print(f"Cache ekstraksi: {len(data_files) - len(files_to_process)} file dari cache, "
+              f"{len(files_to_process)} file perlu di-parse.")
+
+    # Proses file sisanya secara paralel (batch per worker)
+    chunks = [files_to_process[i:i + CHUNK_SIZE] for i in range(0, len(files_to_process), CHUNK_SIZE)]
+    print(f"Mulai memproses {len(files_to_process)} file dalam {len(chunks)} batch "
+          f"(mode: {EXECUTOR_MODE}, worker: {MAX_WORKERS or os.cpu_count()})...")
+    run.total = len(files_to_process)
+    run.start_time = time.time()
+
+    with _make_executor() as executor:
+        # Submit semua batch
+        futures = {run.submit(executor, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            run.handle_result(future, futures[future])
+            # Update progress
+            print(run.progress())
+
+    return run.finish()
+
+def extract_records_multi(jobs: dict) -> dict:
+    """
+    Ekstraksi banyak periode sekaligus: jobs = {(tahun, kuartal): (data_files,
+    kurs_usd, existing_saham)}. Semua file dari semua periode dijadwalkan ke
+    1 pool worker dengan 1 cache dan indeks sheet bersama; hasil dipisah lagi
+    per periode (format sama dengan extract_records).
+    """
+    shared = _open_extraction_resources()
+    runs = {key: _ExtractionRun(kurs_usd, existing_saham, shared=shared)
+            for key, (_, kurs_usd, existing_saham) in jobs.items()}
+    chunks = []
+    for key, (data_files, _, _) in jobs.items():
+        run = runs[key]
+        files_to_process = run.take_from_cache(data_files)
+        run.total = len(files_to_process)
+        chunks.extend((key, files_to_process[i:i + CHUNK_SIZE]) for i in range(0, len(files_to_process), CHUNK_SIZE))
+    total = sum(run.total for run in runs.values())
+    print(f"Mulai memproses {total} file dari {len(jobs)} periode dalam {len(chunks)} batch "
+          f"(mode: {EXECUTOR_MODE}, worker: {MAX_WORKERS or os.cpu_count()})...")
+
+    start_time = time.time()
+    done = 0
+    try:
+        with _make_executor() as executor:
+            futures = {runs[key].submit(executor, chunk): (key, chunk) for key, chunk in chunks}
+            for future in as_completed(futures):
+                key, chunk = futures[future]
+                runs[key].handle_result(future, chunk)
+                done += len(chunk)
+                print(f"Proses... {done}/{total} file selesai (periode {format_period(*key)}).")
+    finally:
+        results = {}
+        for key, run in runs.items():
+            print(f"\n[{format_period(*key)}]")
+            results[key] = run.finish()
+        _close_extraction_resources(*shared)
+    print(f"Selesai memproses {total} file dari {len(jobs)} periode dalam {time.time() - start_time:.2f} detik.")
+    return results
+
+class StreamingExtractor:
+    """
+    Ekstraksi mode pipeline: file dimasukkan satu per satu lewat submit()
+    (misal begitu download-nya selesai) ke antrean terbatas, lalu 1 thread
+    dispatcher mengambil isi antrean, memakai cache, dan mengirim batch ke
+    pool worker. Antrean penuh membuat submit() menunggu (backpressure);
+    jumlah batch yang sedang berjalan juga dibatasi.
+    """
+
+    def __init__(self, kurs_usd: float, existing_saham: set, queue_size: int = STREAM_QUEUE_SIZE,
+                 report_every: float = STREAM_REPORT_SECONDS):
+        self.run = _ExtractionRun(kurs_usd, existing_saham)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        self.report_every = report_every
+        self.max_in_flight = 2 * (MAX_WORKERS or os.cpu_count() or 1)
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._dispatch, name="rekap-dispatcher", daemon=True)
+        self._error = None
+        self.submitted = 0
+        self.cache_hits = 0
+        self.depth_max = 0
+        self.depth_sum = 0
+        self.depth_samples = 0
+        self.first_submit = None
+        self.last_submit = None
+
+    def start(self) -> "StreamingExtractor":
+        self.run.start_time = time.time()
+        self._thread.start()
+        return self
+
+    def submit(self, file_path: str) -> None:
+        """Masukkan 1 file laporan ke antrean (thread-safe, menunggu bila antrean penuh)."""
+        if os.path.basename(file_path).startswith("Ringkasan Saham-"):
+            return
+        with self._lock:
+            if file_path in self._seen:
+                return
+            self._seen.add(file_path)
+            self.run.total += 1
+        self.queue.put(file_path)
+        with self._lock:
+            now = time.time()
+            self.first_submit = self.first_submit or now
+            self.last_submit = now
+            self.submitted += 1
+
+    def _sample_depth(self) -> None:
+        depth = self.queue.qsize()
+        self.depth_max = max(self.depth_max, depth)
+        self.depth_sum += depth
+        self.depth_samples += 1
+
+    def _take_chunk(self, timeout: float) -> List[str]:
+        """Ambil hingga CHUNK_SIZE file: tunggu file pertama, sisanya hanya yang sudah ada di antrean."""
+        try:
+            chunk = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(chunk) < CHUNK_SIZE:
+            try:
+                chunk.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return chunk
+
+    def _dispatch(self) -> None:
+        # Cache (SQLite) & indeks sheet hanya disentuh dari thread ini
+        try:
+            in_flight = {}
+            last_report = time.time()
+            with _make_executor() as executor:
+                while True:
+                    done = [f for f in in_flight if f.done()]
+                    for future in done:
+                        self.run.handle_result(future, in_flight.pop(future))
+
+                    if time.time() - last_report >= self.report_every:
+                        last_report = time.time()
+                        print(f"{self.run.progress()} Antrean: {self.queue.qsize()}/{self.queue_size}, "
+                              f"batch berjalan: {len(in_flight)}")
+
+                    if self._closed.is_set() and self.queue.empty() and not in_flight:
+                        break
+                    if len(in_flight) >= self.max_in_flight:
+                        wait(list(in_flight), timeout=0.5, return_when=FIRST_COMPLETED)
+                        continue
+
+                    self._sample_depth()
+                    chunk = self._take_chunk(timeout=0.05 if in_flight else 0.2)
+                    if not chunk:
+                        continue
+                    to_parse = self.run.take_from_cache(chunk)
+                    hits = len(chunk) - len(to_parse)
+                    self.cache_hits += hits
+                    self.run.processed += hits
+                    if to_parse:
+                        in_flight[self.run.submit(executor, to_parse)] = to_parse
+        except BaseException as e:
+            self._error = e
+
+    def close(self) -> dict:
+        """Tandai tidak ada file lagi, tunggu antrean & worker habis, lalu kembalikan hasil + statistik."""
+        self._closed.set()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        elapsed = time.time() - self.run.start_time
+        result = self.run.finish()
+        produce_span = (self.last_submit - self.first_submit) if self.submitted > 1 else 0.0
+        stats = {
+            'submitted': self.submitted,
+            'cache_hits': self.cache_hits,
+            'queue_max': self.depth_max,
+            'queue_avg': self.depth_sum / self.depth_samples if self.depth_samples else 0.0,
+            'elapsed': elapsed,
+            'produce_rate': self.submitted / produce_span if produce_span > 0 else 0.0,
+            'extract_rate': self.submitted / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"Antrean ekstraksi: maks {stats['queue_max']}/{self.queue_size}, rata-rata {stats['queue_avg']:.1f}; "
+              f"masuk {stats['submitted']} file ({stats['produce_rate']:.1f} file/detik), "
+              f"diekstrak {stats['extract_rate']:.1f} file/detik, {stats['cache_hits']} dari cache.")
+        result['stream'] = stats
+        return result
+
+def build_data(records: list, tahun: int, kuartal: int, store: Optional[MasterStore],
+               old_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Gabungkan data baru dengan data lama (master store atau sheet Data lama). None jika tidak ada data sama sekali."""
+    has_old_data = old_df is not None or (store is not None and store.has_partition('data', tahun, kuartal))
+    if not records and not has_old_data:
+        return None
+
+    new_df = None
+    if records:
+        new_df = pd.DataFrame.from_records(records, columns=list(ROW_FIELDS))
         # Bagi data BARU dengan 1 Miliar
         cols_to_divide = [
             'Aset Lancar', 'Aset Tetap', 'Total Aset',
@@ -440,21 +1509,22 @@ if __name__ == "__main__":
         ]
         for col in cols_to_divide:
             if col in new_df.columns:
-                new_df[col] = pd.to_numeric(new_df[col], errors='coerce').fillna(0) / 1_000_000_000
-        
-        # Gabungkan
-        if os.path.exists(output_path):
-            try:
-                old_df = pd.read_excel(output_path, sheet_name='Data')
-                df_data = pd.concat([old_df, new_df], ignore_index=True)
-            except Exception as e:
-                print(f"Peringatan: Gagal menggabung dengan data lama. Menyimpan data baru saja. Error: {e}")
-                df_data = new_df
-        else:
-            df_data = new_df
+                new_df[col] = parse_number_series(new_df[col]).fillna(0) / 1_000_000_000
+
+    if not records:
+        print("Tidak ada data baru yang diproses. Memakai data lama saja...")
+
+    if store is not None:
+        # Hanya baris baru yang ditulis (1 file part baru di partisi kuartal ini)
+        if new_df is not None:
+            store.append_data(tahun, kuartal, new_df)
+        df_data = store.read_data(tahun, kuartal)
+    elif new_df is None:
+        df_data = old_df
+    elif old_df is not None:
+        df_data = pd.concat([old_df, new_df], ignore_index=True)
     else:
-        # Seharusnya tidak sampai sini, tapi sebagai penjaga
-        df_data = pd.DataFrame()
+        df_data = new_df
 
     # Hapus duplikat berdasarkan 'Saham', ambil yang TERAKHIR (data baru)
     if 'Saham' in df_data.columns:
@@ -463,16 +1533,19 @@ if __name__ == "__main__":
     # Hapus kolom _source_file
     if '_source_file' in df_data.columns:
         df_data = df_data.drop(columns=['_source_file'])
+    return df_data
 
-    # 4. Proses Ringkasan (tidak berubah dari script Anda)
+def read_ringkasan(ringkasan_files: List[str]) -> pd.DataFrame:
     df_ringkasan = pd.DataFrame()
     if ringkasan_files:
         try:
             df_ringkasan = pd.read_excel(ringkasan_files[0], sheet_name=0)
         except Exception as e:
             print(f"Peringatan: Gagal membaca file ringkasan {ringkasan_files[0]}: {e}")
+    return df_ringkasan
 
-    # 5. Buat sheet Rekap (tidak berubah dari script Anda)
+def build_rekap(df_data: pd.DataFrame, df_ringkasan: pd.DataFrame, annualization_factor: float) -> pd.DataFrame:
+    """Sheet Rekap: harga & jumlah saham dari Ringkasan, lalu rasio valuasi/profitabilitas."""
     rekap = df_data[['Saham', 'Total Liabilitas', 'Ekuitas', 'Pendapatan', 'Laba Bruto', 'Laba Bersih']].copy()
     for col in ['Total Liabilitas', 'Ekuitas', 'Pendapatan', 'Laba Bruto', 'Laba Bersih']:
         if col in rekap.columns:
@@ -508,20 +1581,16 @@ if __name__ == "__main__":
         df_merged['Penutupan'] = 0.0
         df_merged['Tradable Shares'] = 0.0
 
-    df_merged['Harga'] = df_merged.get('Penutupan', 0.0).apply(lambda x: parse_number(x) if not pd.isna(x) else 0.0)
-    df_merged['Shares_Raw'] = df_merged.get('Tradable Shares', 0.0).apply(lambda x: parse_number(x) if not pd.isna(x) else 0.0)
+    df_merged['Harga'] = parse_number_series(df_merged['Penutupan'])
+    df_merged['Shares_Raw'] = parse_number_series(df_merged['Tradable Shares'])
     df_merged['Shares'] = df_merged['Shares_Raw'].fillna(0.0).astype(float) / 1_000_000_000  # bagi 1 Miliar
     df_merged['Harga'] = df_merged['Harga'].fillna(0.0).astype(float)
 
-    df_merged['Laba Bersih Tahunan'] = df_merged['Laba Bersih'] * ANNUALIZATION_FACTOR
-    df_merged['EPS'] = df_merged.apply(lambda r: safe_div(r['Laba Bersih Tahunan'], r['Shares']), axis=1)
+    df_merged['Laba Bersih Tahunan'] = df_merged['Laba Bersih'] * annualization_factor
     df_merged['Cap'] = df_merged['Harga'] * df_merged['Shares']
-    df_merged['PER (x)'] = df_merged.apply(lambda r: safe_div(r['Harga'], r['EPS']), axis=1)
-    df_merged['PBV (x)'] = df_merged.apply(lambda r: safe_div(r['Harga'], safe_div(r['Ekuitas'], r['Shares'])), axis=1)
-    df_merged['DER (x)'] = df_merged.apply(lambda r: safe_div(r['Total Liabilitas'], r['Ekuitas']), axis=1)
-    df_merged['ROE (%)'] = df_merged.apply(lambda r: safe_div(r['Laba Bersih Tahunan'], r['Ekuitas']) * 100.0, axis=1)
-    df_merged['GPM (%)'] = df_merged.apply(lambda r: safe_div(r['Laba Bruto'], r['Pendapatan']) * 100.0, axis=1)
-    df_merged['NPM (%)'] = df_merged.apply(lambda r: safe_div(r['Laba Bersih'], r['Pendapatan']) * 100.0, axis=1)
+    ratios = compute_ratios(df_merged, RATIO_SPEC)
+    for col in ratios.columns:
+        df_merged[col] = ratios[col]
 
     final_cols = ['Saham', 'Harga', 'Shares', 'Total Liabilitas', 'Ekuitas', 'Pendapatan',
                   'Laba Bruto', 'Laba Bersih', 'EPS', 'Cap', 'PER (x)', 'PBV (x)', 'DER (x)',
@@ -536,19 +1605,165 @@ if __name__ == "__main__":
     for col in rekap_cols_to_round:
         if col in df_rekap.columns:
             df_rekap[col] = df_rekap[col].astype(float).round(1)
+    return df_rekap
 
-    # 6. Simpan ke Excel
+def save_outputs(tahun: int, kuartal: int, df_data: pd.DataFrame, df_ringkasan: pd.DataFrame, df_rekap: pd.DataFrame,
+                 store: Optional[MasterStore], output_path: str, export_excel: bool = True) -> str:
+    """Partisi Rekap di master store, lalu export ke Excel. Kembalikan path hasil."""
     os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-    
-    try:
+    saved_path = None
+    if store is not None:
+        store.write_rekap(tahun, kuartal, df_rekap)
+        saved_path = store.partition_dir('rekap', tahun, kuartal)
+    if export_excel or store is None:
         saved_path = save_workbook_with_autofit(output_path, df_data, df_ringkasan, df_rekap)
-        elapsed = time.time() - start_time
-        elapsed_hms = time.strftime("%H:%M:%S", time.gmtime(elapsed))  # format HH:MM:SS
-        print(f"\nSukses! Output disimpan ke {saved_path}")
-        print(f"Total waktu eksekusi: {elapsed_hms} ({elapsed:.2f} detik)")
+    return saved_path
+
+def prepare_rekap(tahun: int, kuartal: int, kurs_usd: Optional[float] = None, require_input: bool = True) -> dict:
+    """
+    Persiapan 1 kuartal: validasi, kurs, path, master store, dan daftar saham
+    yang sudah diproses. `require_input=False` untuk mode pipeline (folder
+    input baru terisi selama download berjalan).
+    """
+    tahun, kuartal = int(tahun), int(kuartal)
+    if kuartal not in _ANNUALIZATION_MAP:
+        raise ValueError(f"QUARTER must be 1-4 (got {kuartal})")
+    if kurs_usd is None:
+        kurs_usd = get_kurs_usd_to_idr(tahun, kuartal)
+
+    input_folder = os.path.join(BASE_INPUT_PATH, f"{tahun} Q{kuartal}")
+    if require_input and not os.path.isdir(input_folder):
+        raise FileNotFoundError(f"Input folder tidak ada: {input_folder}")
+    output_path = os.path.join(OUTPUT_FOLDER, f"{tahun} Kuartal {kuartal}.xlsx")
+
+    store = open_master_store()
+    existing_saham, old_df = load_existing(tahun, kuartal, store, output_path)
+    return {
+        'tahun': tahun, 'kuartal': kuartal, 'kurs_usd': kurs_usd,
+        'annualization_factor': _ANNUALIZATION_MAP[kuartal],
+        'input_folder': input_folder, 'output_path': output_path,
+        'store': store, 'existing_saham': existing_saham, 'old_df': old_df,
+    }
+
+def finish_rekap(ctx: dict, extracted: dict, export_excel: Optional[bool] = None) -> Optional[dict]:
+    """Dari hasil ekstraksi: sheet Data, Ringkasan, Rekap, lalu simpan. None jika tidak ada data sama sekali."""
+    tahun, kuartal, store = ctx['tahun'], ctx['kuartal'], ctx['store']
+    df_data = build_data(extracted['records'], tahun, kuartal, store, ctx['old_df'])
+    if df_data is None:
+        print("Tidak ada data baru yang diproses dan tidak ada file lama. Keluar.")
+        return None
+
+    _, ringkasan_files = list_input_files(ctx['input_folder'])
+    df_ringkasan = read_ringkasan(ringkasan_files)
+    with metrics.span("ratio", periode=format_period(tahun, kuartal), rows=len(df_data)):
+        df_rekap = build_rekap(df_data, df_ringkasan, ctx['annualization_factor'])
+    saved_path = save_outputs(tahun, kuartal, df_data, df_ringkasan, df_rekap, store, ctx['output_path'],
+                              EXPORT_EXCEL if export_excel is None else export_excel)
+    return {
+        'tahun': tahun, 'kuartal': kuartal,
+        'df_data': df_data, 'df_ringkasan': df_ringkasan, 'df_rekap': df_rekap,
+        'saved_path': saved_path,
+        'new_rows': len(extracted['records']), 'skipped': extracted['skipped'], 'errors': extracted['errors'],
+    }
+
+def run_rekap(tahun: int, kuartal: int, kurs_usd: Optional[float] = None, export_excel: Optional[bool] = None) -> Optional[dict]:
+    """
+    Jalankan seluruh rekap 1 kuartal. Kembalikan dict berisi df_data,
+    df_ringkasan, df_rekap (untuk diteruskan langsung ke Konsolidasi),
+    saved_path dan statistik; None jika tidak ada data sama sekali.
+    """
+    ctx = prepare_rekap(tahun, kuartal, kurs_usd)
+    data_files, _ = list_input_files(ctx['input_folder'])
+    extracted = extract_records(data_files, ctx['kurs_usd'], ctx['existing_saham'])
+    return finish_rekap(ctx, extracted, export_excel)
+
+def run_rekap_batch(periods, export_excel: Optional[bool] = None) -> tuple:
+    """
+    Rekap banyak periode [(tahun, kuartal), ...] dalam 1 run: ekstraksi
+    semua periode lewat 1 pool worker & cache bersama, lalu output tiap
+    periode disimpan sendiri-sendiri. Kegagalan 1 periode tidak
+    menghentikan periode lain. Kembalikan (hasil {periode: dict/None},
+    gagal {periode: pesan}).
+    """
+    results, failures, ctxs = {}, {}, {}
+    for tahun, kuartal in periods:
+        key = (int(tahun), int(kuartal))
+        try:
+            ctxs[key] = prepare_rekap(*key)
+        except Exception as e:
+            failures[key] = str(e)
+        if key in failures:
+            print(f"[{format_period(*key)}] dilewati: {failures[key]}")
+
+    jobs = {}
+    for key, ctx in ctxs.items():
+        data_files, _ = list_input_files(ctx['input_folder'])
+        jobs[key] = (data_files, ctx['kurs_usd'], ctx['existing_saham'])
+    extracted = extract_records_multi(jobs) if jobs else {}
+
+    for key, ctx in ctxs.items():
+        try:
+            results[key] = finish_rekap(ctx, extracted[key], export_excel)
+        except Exception as e:
+            failures[key] = str(e)
+            print(f"[{format_period(*key)}] gagal disimpan: {e}")
+    return results, failures
+
+# ----------------------------
+# MAIN EXECUTION
+# ----------------------------
+
+def main_batch(periode_text: str) -> int:
+    """Mode batch: `python rekap_fundamental.py 2020Q1..2025Q3`. Kode keluar 1 bila ada periode gagal."""
+    start_time = time.time()
+    try:
+        periods = parse_period_range(periode_text)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Rekap batch {len(periods)} periode: {format_period(*periods[0])} .. {format_period(*periods[-1])}")
+    results, failures = run_rekap_batch(periods)
+
+    elapsed = time.time() - start_time
+    print("\n--- RINGKASAN BATCH ---")
+    for key in periods:
+        key = (int(key[0]), int(key[1]))
+        if key in failures:
+            print(f"{format_period(*key)}: GAGAL - {failures[key]}")
+        elif results.get(key) is None:
+            print(f"{format_period(*key)}: tidak ada data")
+        else:
+            print(f"{format_period(*key)}: {results[key]['new_rows']} data baru -> {results[key]['saved_path']}")
+    print(f"Total waktu eksekusi: {time.strftime('%H:%M:%S', time.gmtime(elapsed))} ({elapsed:.2f} detik)")
+    metrics.finish_run(METRICS_FOLDER, "metrik_rekap", {"periode": periode_text})
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main_batch(",".join(sys.argv[1:])))
+
+    YEAR, QUARTER, KURS_USD_TO_IDR = get_user_input()
+
+    # Mulai stopwatch setelah input kurs
+    start_time = time.time()
+
+    try:
+        result = run_rekap(YEAR, QUARTER, KURS_USD_TO_IDR)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     except Exception as e:
         elapsed = time.time() - start_time
         elapsed_hms = time.strftime("%H:%M:%S", time.gmtime(elapsed))  # format HH:MM:SS
-        print(f"\nGagal menyimpan output: {e}")
+        print(f"\nGagal menjalankan rekap: {e}")
         print(f"Total waktu eksekusi (gagal): {elapsed_hms} ({elapsed:.2f} detik)")
+        sys.exit(1)
+
+    if result is None:
+        sys.exit(0)
+    elapsed = time.time() - start_time
+    elapsed_hms = time.strftime("%H:%M:%S", time.gmtime(elapsed))  # format HH:MM:SS
+    print(f"\nSukses! Output disimpan ke {result['saved_path']}")
+    print(f"Total waktu eksekusi: {elapsed_hms} ({elapsed:.2f} detik)")
+    metrics.finish_run(METRICS_FOLDER, "metrik_rekap", {"periode": format_period(YEAR, QUARTER)})
 
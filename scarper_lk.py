@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import urllib.parse
 from selenium import webdriver
@@ -8,27 +9,59 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException
+from http_downloader import HttpDownloader, DownloadManifest, session_headers_from_driver
+from download_watcher import DownloadWatcher
+from period_range import parse_period_range, format_period
+import metrics
+from idx_listing import (HttpJsonFetcher, BrowserJsonFetcher, FixtureFetcher, RecordingFetcher,
+                         ListingError, list_report_urls)
 
-# Input dinamis tahun dan kuartal (periode cukup 1/2/3/4)
-target_tahun = input("Masukkan tahun (misal: 2025): ").strip()
-target_quarter = input("Masukkan kuartal (1/2/3/4): ").strip()
-quarter_map = {'1': 'Triwulan 1', '2': 'Triwulan 2', '3': 'Triwulan 3', '4': 'Triwulan 4'}
-target_periode = quarter_map.get(target_quarter, f'Triwulan {target_quarter}')
-
-# Setup folder download dinamis
-DOWNLOAD_FOLDER = fr"C:\Users\ASUS\Documents\Investasi\Laporan Keuangan\{target_tahun} Q{target_quarter}"
-os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
-
-options = webdriver.ChromeOptions()
-prefs = {
-    "download.default_directory": DOWNLOAD_FOLDER,
-    "download.prompt_for_download": False,
-    "download.directory_upgrade": True,
-    "safebrowsing.enabled": True
-}
-options.add_experimental_option("prefs", prefs)
-options.add_argument("--start-maximized")
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# Folder download per kuartal: <BASE_DOWNLOAD_PATH>\<tahun> Q<kuartal>
+BASE_DOWNLOAD_PATH = r"C:\Users\ASUS\Documents\Investasi\Laporan Keuangan"
+
+# Mesin download: "http" = unduh paralel lewat HTTP memakai cookie sesi browser (Selenium hanya untuk listing),
+# "selenium" = cara lama, 1 tab browser per file
+DOWNLOAD_ENGINE = "http"
+HTTP_MAX_WORKERS = 6
+# Mode http: file yang sudah lengkap tetap dicek ke server (request bersyarat ETag/Last-Modified),
+# sehingga laporan revisi dengan nama sama ikut ter-update
+REFRESH_EXISTING = True
+
+# Sumber daftar link: "api" = endpoint JSON yang dipakai halaman IDX (tanpa klik & paginasi DOM),
+# "dom" = cara lama lewat UI (klik tahun/kuartal, Terapkan, tombol next)
+LISTING_BACKEND = "api"
+# Folder rekaman respons API: LISTING_FIXTURE_DIR = baca dari rekaman (tanpa jaringan),
+# LISTING_RECORD_DIR = simpan respons live ke folder ini
+LISTING_FIXTURE_DIR = None
+LISTING_RECORD_DIR = None
+
+# Browser tanpa jendela; bisa diubah tanpa edit script lewat env SCARPER_HEADLESS=0/1
+HEADLESS = os.environ.get("SCARPER_HEADLESS", "1").strip().lower() not in ("0", "false", "no")
+
+# State run aktif, diisi oleh run_scraper()
+target_tahun = target_quarter = None
+DOWNLOAD_FOLDER = None
+manifest = None          # manifest download kuartal ini (ukuran, ETag/Last-Modified, hash) untuk verifikasi & resume
+driver = None
+watcher = None           # penunggu download berbasis notifikasi folder (inotify/watchdog, cadangan polling)
+tw_token = roman_token = None
+CHROMEDRIVER_PATH = None
+
+def make_driver(download_dir: str):
+    options = webdriver.ChromeOptions()
+    prefs = {
+        "download.default_directory": download_dir,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": True
+    }
+    options.add_experimental_option("prefs", prefs)
+    if HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+    return webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=options)
 
 def js_click(el):
     driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
@@ -49,25 +82,54 @@ def dismiss_overlays():
         except Exception:
             pass
 
-def wait_download(file_path: str, timeout=90):
-    cr = file_path + ".crdownload"
-    for _ in range(timeout):
-        if os.path.exists(file_path):
-            return True
-        if os.path.exists(cr):
-            time.sleep(0.5)
-        else:
-            time.sleep(0.5)
-    return False
+def wait_downloads(file_paths, timeout=120):
+    """Tunggu banyak download sekaligus; kembalikan {file_path: berhasil}."""
+    names = {os.path.basename(p): p for p in file_paths}
+    # Batas waktu tumbuh dengan jumlah file karena Chrome mengantre download paralel
+    result = watcher.wait_for(names, timeout=timeout + 5 * max(0, len(names) - 1))
+    return {names[n]: ok for n, ok in result.items()}
+
+def start_download_via_tab(url: str):
+    # Tab baru hanya untuk memicu download; Chrome melanjutkan download walau tab ditutup
+    main_handle = driver.current_window_handle
+    driver.execute_script("window.open('about:blank','_blank');")
+    driver.switch_to.window(driver.window_handles[-1])
+    driver.get(url)
+    driver.close()
+    driver.switch_to.window(main_handle)
+
+def download_via_tabs(jobs):
+    """Picu semua (url, file_path) lewat browser lalu tunggu semuanya bersamaan."""
+    with metrics.span("download_browser", files=len(jobs)) as attrs:
+        for url, file_path in jobs:
+            print(f"Memulai download: {os.path.basename(file_path)}")
+            start_download_via_tab(url)
+        results = wait_downloads([file_path for _, file_path in jobs])
+        attrs["ok"] = sum(1 for ok in results.values() if ok)
+    return results
+
+def timed_pages(pages):
+    """Bungkus iterator listing: waktu ambil tiap halaman dicatat sebagai span "listing"."""
+    pages = iter(pages)
+    page_no = 0
+    while True:
+        with metrics.span("listing", backend=LISTING_BACKEND, page=page_no) as attrs:
+            hrefs = next(pages, None)
+            attrs["links"] = len(hrefs) if hrefs is not None else 0
+        if hrefs is None:
+            return
+        yield hrefs
+        page_no += 1
 
 # Map kuartal ke token yang muncul pada href/filename
 roman_map = {'1': 'I', '2': 'II', '3': 'III', '4': 'IV'}
-roman = roman_map.get(target_quarter, target_quarter)
-tw_token = f"/TW{target_quarter}/"
-roman_token = f"-{roman}-"  # contoh: -III-
 
-try:
-    print("🚀 Scarper LK mulai...")
+def filter_quarter(hrefs):
+    # Filter hanya kuartal target (TWx atau -ROMAN-)
+    return [h for h in hrefs if (tw_token in h) or (roman_token in os.path.basename(urllib.parse.urlsplit(h).path))]
+
+def iter_hrefs_dom():
+    """Listing lewat UI IDX: pilih tahun & kuartal, Terapkan, lalu baca tabel per halaman."""
     print("Membuka halaman IDX...")
     driver.get("https://idx.co.id/id/perusahaan-tercatat/laporan-keuangan-dan-tahunan/")
     wait = WebDriverWait(driver, 25)
@@ -102,9 +164,6 @@ try:
     except ElementClickInterceptedException:
         js_click(terapkan_btn)
 
-    total_files_found = 0
-    total_files_downloaded = 0
-
     # Tunggu tabel
     wait.until(EC.presence_of_element_located((By.XPATH, "//table")))
     time.sleep(1)
@@ -122,35 +181,7 @@ try:
                     hrefs.append(href)
             except StaleElementReferenceException:
                 continue
-
-        # Filter hanya kuartal target (TWx atau -ROMAN-)
-        filtered = [h for h in hrefs if (tw_token in h) or (roman_token in os.path.basename(urllib.parse.urlsplit(h).path))]
-        print(f"Link .xlsx halaman ini (match Q{target_quarter}): {len(filtered)}")
-        total_files_found += len(filtered)
-
-        # Download via tab baru (tanpa klik elemen, hindari intercepted/stale)
-        main_handle = driver.current_window_handle
-        for url in filtered:
-            file_name = os.path.basename(urllib.parse.urlsplit(url).path)
-            file_path = os.path.join(DOWNLOAD_FOLDER, file_name)
-            if os.path.exists(file_path):
-                print(f"File sudah ada: {file_name}")
-                continue
-
-            print(f"Memulai download: {file_name}")
-            driver.execute_script("window.open('about:blank','_blank');")
-            driver.switch_to.window(driver.window_handles[-1])
-            driver.get(url)
-
-            ok = wait_download(file_path, timeout=120)
-            driver.close()
-            driver.switch_to.window(main_handle)
-
-            if ok:
-                print(f"Berhasil mengunduh: {file_name}")
-                total_files_downloaded += 1
-            else:
-                print(f"Gagal mengunduh: {file_name}")
+        yield hrefs
 
         # Next page
         try:
@@ -169,8 +200,202 @@ try:
             print("Mencapai halaman terakhir.")
             break
 
-finally:
-    driver.quit()
-    print("Semua proses download selesai.")
-    print(f"Total link match kuartal {target_quarter}: {total_files_found}")
-    print(f"Total file berhasil diunduh: {total_files_downloaded}")
+def iter_hrefs_api():
+    """Listing lewat API JSON IDX: seluruh link tahun/kuartal dalam beberapa request (page size besar)."""
+    if LISTING_FIXTURE_DIR:
+        print(f"Listing dari rekaman: {LISTING_FIXTURE_DIR}")
+        fetcher = FixtureFetcher(LISTING_FIXTURE_DIR)
+        urls = list_report_urls(fetcher, target_tahun, target_quarter)
+    else:
+        print("Membuka halaman IDX (ambil sesi)...")
+        driver.get("https://idx.co.id/id/perusahaan-tercatat/laporan-keuangan-dan-tahunan/")
+        WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        fetcher = HttpJsonFetcher(session_headers_from_driver(driver))
+        if LISTING_RECORD_DIR:
+            fetcher = RecordingFetcher(fetcher, LISTING_RECORD_DIR)
+        try:
+            urls = list_report_urls(fetcher, target_tahun, target_quarter)
+        except ListingError as e:
+            # Misal ditolak proteksi bot: ulangi lewat browser
+            print(f"Listing API via HTTP gagal ({e}), dicoba lewat browser...")
+            fetcher = BrowserJsonFetcher(driver)
+            if LISTING_RECORD_DIR:
+                fetcher = RecordingFetcher(fetcher, LISTING_RECORD_DIR)
+            urls = list_report_urls(fetcher, target_tahun, target_quarter)
+    print(f"Listing API: {len(urls)} lampiran .xlsx")
+    yield urls
+
+def run_scraper(tahun, kuartal, on_file_ready=None) -> dict:
+    """
+    Unduh semua laporan keuangan .xlsx untuk tahun/kuartal ke
+    <BASE_DOWNLOAD_PATH>\\<tahun> Q<kuartal>. Kembalikan ringkasan
+    {folder, found, downloaded, failed}. `on_file_ready(file_path)` dipanggil begitu
+    tiap file lengkap tersedia (baru diunduh atau sudah ada), untuk mode
+    pipeline yang mengekstrak sambil download berjalan.
+    """
+    global target_tahun, target_quarter, DOWNLOAD_FOLDER, manifest, driver, watcher
+    global tw_token, roman_token, CHROMEDRIVER_PATH
+    target_tahun = str(tahun).strip()
+    target_quarter = str(kuartal).strip()
+
+    # Setup folder download dinamis
+    DOWNLOAD_FOLDER = os.path.join(BASE_DOWNLOAD_PATH, f"{target_tahun} Q{target_quarter}")
+    os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+
+    # Map kuartal ke token yang muncul pada href/filename
+    roman = roman_map.get(target_quarter, target_quarter)
+    tw_token = f"/TW{target_quarter}/"
+    roman_token = f"-{roman}-"  # contoh: -III-
+
+    manifest = DownloadManifest(DOWNLOAD_FOLDER)
+    if CHROMEDRIVER_PATH is None:
+        CHROMEDRIVER_PATH = ChromeDriverManager().install()
+    driver = make_driver(DOWNLOAD_FOLDER)
+    watcher = DownloadWatcher(DOWNLOAD_FOLDER)
+
+    total_files_found = 0
+    total_files_downloaded = 0
+    total_files_failed = 0
+
+    def file_ready(file_path):
+        if on_file_ready is not None:
+            on_file_ready(file_path)
+
+    try:
+        print("🚀 Scarper LK mulai...")
+        pending_downloads = {}  # file_path -> url (mode http)
+
+        pages = iter_hrefs_api() if LISTING_BACKEND == "api" else iter_hrefs_dom()
+
+        for hrefs in timed_pages(pages):
+            filtered = filter_quarter(hrefs)
+            print(f"Link .xlsx halaman ini (match Q{target_quarter}): {len(filtered)}")
+            total_files_found += len(filtered)
+
+            page_jobs = {}
+            for url in filtered:
+                file_name = os.path.basename(urllib.parse.urlsplit(url).path)
+                file_path = os.path.join(DOWNLOAD_FOLDER, file_name)
+                status = manifest.verify(file_path)
+                if status is False:
+                    # Terpotong / 0 byte / tidak cocok manifest (misal run sebelumnya terputus)
+                    print(f"File tidak lengkap, diunduh ulang: {file_name}")
+                    os.remove(file_path)
+                elif status is None and os.path.exists(file_path):
+                    # File lama sebelum ada manifest (zip valid): cukup dicatat
+                    manifest.record(file_path, url)
+                    print(f"File sudah ada: {file_name}")
+                    file_ready(file_path)
+                    continue
+                elif status and not (DOWNLOAD_ENGINE == "http" and REFRESH_EXISTING and manifest.has_validators(file_name)):
+                    print(f"File sudah ada: {file_name}")
+                    file_ready(file_path)
+                    continue
+
+                if DOWNLOAD_ENGINE == "http":
+                    # Dikumpulkan dulu, diunduh paralel setelah semua halaman selesai dibaca
+                    pending_downloads.setdefault(file_path, url)
+                else:
+                    page_jobs.setdefault(file_path, url)
+
+            # Download via tab baru (tanpa klik elemen, hindari intercepted/stale), ditunggu sekaligus per halaman
+            if page_jobs:
+                for file_path, ok in download_via_tabs([(url, fp) for fp, url in page_jobs.items()]).items():
+                    file_name = os.path.basename(file_path)
+                    if ok:
+                        manifest.record(file_path, page_jobs[file_path])
+                        print(f"Berhasil mengunduh: {file_name}")
+                        total_files_downloaded += 1
+                        file_ready(file_path)
+                    else:
+                        print(f"Gagal mengunduh: {file_name}")
+                        total_files_failed += 1
+
+        if pending_downloads:
+            print(f"Mengunduh {len(pending_downloads)} file via HTTP ({HTTP_MAX_WORKERS} paralel)...")
+            downloader = HttpDownloader(session_headers_from_driver(driver), max_workers=HTTP_MAX_WORKERS,
+                                        manifest=manifest)
+            jobs = [(url, file_path) for file_path, url in pending_downloads.items()]
+            failed = []
+            try:
+                # File yang selesai langsung diteruskan (tidak menunggu seluruh download)
+                on_done = (lambda url, file_path, ok, msg: ok and file_ready(file_path)) if on_file_ready else None
+                for url, file_path, ok, msg in downloader.download_many(jobs, on_done=on_done):
+                    file_name = os.path.basename(file_path)
+                    if ok and msg == "tidak berubah":
+                        print(f"File sudah ada (tidak berubah di server): {file_name}")
+                    elif ok:
+                        print(f"Berhasil mengunduh: {file_name}")
+                        total_files_downloaded += 1
+                    elif manifest.verify(file_path):
+                        # Hanya pengecekan pembaruan yang gagal; file lokal tetap lengkap
+                        print(f"Gagal cek pembaruan ({msg}), file lama dipakai: {file_name}")
+                        file_ready(file_path)
+                    else:
+                        print(f"Gagal via HTTP ({msg}): {file_name}")
+                        failed.append((url, file_path))
+            finally:
+                downloader.close()
+
+            # Cadangan: file yang gagal lewat HTTP dicoba lagi lewat browser
+            if failed:
+                print(f"Mencoba {len(failed)} file lewat browser...")
+                for file_path, ok in download_via_tabs(failed).items():
+                    file_name = os.path.basename(file_path)
+                    if ok:
+                        manifest.record(file_path, pending_downloads[file_path])
+                        print(f"Berhasil mengunduh: {file_name}")
+                        total_files_downloaded += 1
+                        file_ready(file_path)
+                    else:
+                        print(f"Gagal mengunduh: {file_name}")
+                        total_files_failed += 1
+
+    finally:
+        driver.quit()
+        watcher.close()
+        manifest.close()
+        print("Semua proses download selesai.")
+        print(f"Total link match kuartal {target_quarter}: {total_files_found}")
+        print(f"Total file berhasil diunduh: {total_files_downloaded}")
+        if total_files_failed:
+            print(f"Total file gagal diunduh: {total_files_failed}")
+    return {'folder': DOWNLOAD_FOLDER, 'found': total_files_found, 'downloaded': total_files_downloaded,
+            'failed': total_files_failed}
+
+
+def run_scraper_batch(periods, on_file_ready=None) -> tuple:
+    """
+    Unduh banyak periode [(tahun, kuartal), ...] berurutan dalam 1 proses
+    (chromedriver cukup di-install sekali). Kegagalan 1 periode tidak
+    menghentikan periode lain. Kembalikan (hasil {periode: dict},
+    gagal {periode: pesan}).
+    """
+    results, failures = {}, {}
+    for tahun, kuartal in periods:
+        key = (int(tahun), int(kuartal))
+        print(f"\n=== Periode {format_period(*key)} ===")
+        try:
+            results[key] = run_scraper(*key, on_file_ready=on_file_ready)
+        except Exception as e:
+            failures[key] = str(e)
+            print(f"[{format_period(*key)}] gagal: {e}")
+    return results, failures
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Mode batch: python scarper_lk.py 2020Q1..2025Q3
+        hasil, gagal = run_scraper_batch(parse_period_range(",".join(sys.argv[1:])))
+        print("\n--- RINGKASAN BATCH ---")
+        for key, info in sorted(hasil.items()):
+            print(f"{format_period(*key)}: {info['found']} file ditemukan, {info['downloaded']} diunduh, "
+                  f"{info['failed']} gagal")
+        for key, pesan in sorted(gagal.items()):
+            print(f"{format_period(*key)}: GAGAL - {pesan}")
+        sys.exit(1 if gagal else 0)
+
+    # Input dinamis tahun dan kuartal (periode cukup 1/2/3/4)
+    input_tahun = input("Masukkan tahun (misal: 2025): ").strip()
+    input_kuartal = input("Masukkan kuartal (1/2/3/4): ").strip()
+    run_scraper(input_tahun, input_kuartal)
@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from json_cache import ProcessCache, cache_path_for, read_cache, source_signature, write_cache
+
+# ----------------------------
+# DIMENSI KLASIFIKASI SEKTOR
+# 1 baris per emiten dengan kunci integer (ID Emiten) yang stabil: pemetaan
+# Kode Emiten -> ID disimpan di cache json_cache bersama hasil parse, jadi saat
+# file klasifikasi diedit emiten baru dapat ID baru dan ID lama tidak dipakai
+# ulang. Versi dimensi naik setiap isi klasifikasi berubah.
+# ----------------------------
+
+CACHE_VERSION = 1
+CACHE_NAME = "_cache_dimensi_sektor.json"
+KOLOM_KUNCI = "Kode Emiten"
+KOLOM_ID = "ID Emiten"
+KOLOM_ATRIBUT = ("Nama Entitas", "Sektor", "Subsektor", "Industri", "Subindustri")
+ID_TIDAK_DIKENAL = 0  # emiten yang tidak ada di file klasifikasi
+
+
+def _parse_excel(path: str) -> List[list]:
+    """Baris [kode, nama, sektor, subsektor, industri, subindustri]; kode ganda: baris pertama yang dipakai."""
+    df = pd.read_excel(path)
+    hilang = [col for col in (KOLOM_KUNCI,) + KOLOM_ATRIBUT if col not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom {hilang} tidak ada di file klasifikasi {os.path.basename(path)}. "
+                         f"Kolom ditemukan: {list(df.columns)}")
+    df = df[[KOLOM_KUNCI, *KOLOM_ATRIBUT]]
+    df = df[df[KOLOM_KUNCI].notna()].drop_duplicates(KOLOM_KUNCI)
+    return [[str(kode)] + [None if pd.isna(v) else str(v) for v in attrs]
+            for kode, *attrs in df.itertuples(index=False, name=None)]
+
+
+def _digest(rows: List[list]) -> str:
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class SectorDimension:
+    """
+    Tabel dimensi sektor + join kategorikal: Kode Emiten dicari lewat index
+    yang dibangun sekali, atribut diambil per kode integer (tanpa pd.merge).
+    """
+
+    def __init__(self, ids: Dict[str, int], rows: List[list], version: int = 1, source: str = ""):
+        self.ids = ids
+        self.version = version
+        self.source = source
+        self.rows = rows
+        kode = [row[0] for row in rows]
+        self._index = pd.Index(kode, dtype=object)
+        self._row_ids = np.array([ids[k] for k in kode], dtype=np.int32)
+        # Per atribut: kategori (string unik) + kode kategori per baris dimensi
+        self._atribut: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        for i, col in enumerate(KOLOM_ATRIBUT, start=1):
+            codes, categories = pd.factorize(pd.Series([row[i] for row in rows], dtype=object), use_na_sentinel=True)
+            self._atribut[col] = (np.append(codes, -1).astype(np.int32), categories)
+
+    @classmethod
+    def load(cls, path: str, cache_path: Optional[str] = None) -> "SectorDimension":
+        """Muat dari cache disk bila file klasifikasi belum berubah; selain itu parse Excel lalu perbarui cache."""
+        signature = source_signature(path)  # FileNotFoundError bila file klasifikasi tidak ada
+        cache_path = cache_path or cache_path_for(path, CACHE_NAME)
+
+        # Cache lama tetap dipakai untuk pemetaan ID walau file klasifikasi sudah berubah
+        cached = read_cache(cache_path, CACHE_VERSION)
+        try:
+            if cached is not None and cached.get("source") == signature:
+                return cls(cached["ids"], cached["rows"], cached["versi"], path)
+            if cached is not None:
+                cached = {"ids": dict(cached["ids"]), "versi": int(cached["versi"]), "digest": cached.get("digest")}
+        except (KeyError, TypeError, ValueError):
+            cached = None
+
+        rows = _parse_excel(path)
+        ids = cached["ids"] if cached else {}
+        next_id = max(ids.values(), default=ID_TIDAK_DIKENAL) + 1
+        for row in rows:
+            if row[0] not in ids:
+                ids[row[0]] = next_id
+                next_id += 1
+        digest = _digest(rows)
+        version = 1
+        if cached:
+            version = cached["versi"] + (cached.get("digest") != digest)
+
+        write_cache(cache_path, CACHE_VERSION, signature,
+                    {"versi": version, "digest": digest, "ids": ids, "rows": rows}, "dimensi sektor")
+        return cls(ids, rows, version, path)
+
+    def _positions(self, kode) -> np.ndarray:
+        """Posisi baris dimensi per kode; -1 -> baris kosong di akhir array atribut."""
+        return self._index.get_indexer(pd.Index(kode, dtype=object))
+
+    def keys(self, kode) -> np.ndarray:
+        """ID Emiten (int32) per kode; ID_TIDAK_DIKENAL bila kode tidak ada di klasifikasi."""
+        pos = self._positions(kode)
+        return np.where(pos >= 0, self._row_ids[pos], ID_TIDAK_DIKENAL).astype(np.int32)
+
+    def attributes(self, kode) -> Dict[str, pd.Categorical]:
+        """Kolom atribut sektor (kategori) untuk tiap kode, urutan sama dengan `kode`."""
+        pos = self._positions(kode)
+        return {col: pd.Categorical.from_codes(codes[pos], categories=categories)
+                for col, (codes, categories) in self._atribut.items()}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tabel dimensi: ID Emiten, Kode Emiten, dan atribut sektor (1 baris per emiten)."""
+        df = pd.DataFrame(self.rows, columns=[KOLOM_KUNCI, *KOLOM_ATRIBUT])
+        df.insert(0, KOLOM_ID, self._row_ids)
+        return df.sort_values(KOLOM_ID, ignore_index=True)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+_DIMENSIONS: ProcessCache[SectorDimension] = ProcessCache(SectorDimension.load)
+
+
+def get_sector_dimension(path: str) -> SectorDimension:
+    """SectorDimension untuk file ini, dimuat sekali per proses (dimuat ulang bila file klasifikasi berubah)."""
+    return _DIMENSIONS.get(path)
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import fnmatch
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+# ----------------------------
+# STATUS TAHAP (ala make)
+# Tiap tahap dicatat dengan sidik jari input & output-nya. Tahap dilewati bila
+# semua input sama dengan run sukses terakhir DAN output-nya masih utuh.
+# ----------------------------
+
+STATE_VERSION = 1
+
+
+def fingerprint(paths: Iterable[str], pattern: Optional[str] = None) -> str:
+    """
+    Sidik jari (sha1) dari daftar file/folder berdasarkan (nama, ukuran,
+    mtime_ns), tanpa membaca isi file sehingga tetap cepat untuk ribuan file.
+    Folder diperluas 1 level (hanya file yang cocok `pattern` bila diberikan);
+    path yang tidak ada ikut tercatat sehingga file yang dihapus terdeteksi.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            if pattern:
+                names = [n for n in names if fnmatch.fnmatch(n, pattern)]
+            entries = [os.path.join(path, n) for n in names]
+            entries = [p for p in entries if os.path.isfile(p)]
+        else:
+            entries = [path]
+        for p in entries:
+            try:
+                st = os.stat(p)
+                h.update(f"{p}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8"))
+            except OSError:
+                h.update(f"{p}|hilang\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class StageState:
+    """
+    Status run tahap yang disimpan sebagai JSON:
+    {tahap: {kunci: {inputs: {nama: sidik}, outputs: sidik, recorded_at: epoch}}}.
+    `kunci` memisahkan run per periode (misal '2025Q3') untuk tahap per kuartal.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, dict]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == STATE_VERSION:
+                    self.entries = data.get("stages", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def check(self, stage: str, key: str, inputs: Dict[str, str], outputs: str,
+              max_age: Optional[float] = None) -> Tuple[bool, str]:
+        """(masih_segar, alasan). Alasan menjelaskan kenapa tahap harus dijalankan ulang."""
+        entry = self.entries.get(stage, {}).get(key)
+        if entry is None:
+            return False, "belum pernah berhasil dijalankan"
+        changed = sorted(name for name in set(inputs) | set(entry["inputs"])
+                         if inputs.get(name) != entry["inputs"].get(name))
+        if changed:
+            return False, "input berubah: " + ", ".join(changed)
+        if entry["outputs"] != outputs:
+            return False, "output hilang/berubah sejak run terakhir"
+        if max_age is not None and time.time() - entry["recorded_at"] > max_age:
+            return False, "hasil run terakhir sudah kedaluwarsa"
+        return True, "tidak ada perubahan"
+
+    def record(self, stage: str, key: str, inputs: Dict[str, str], outputs: str) -> None:
+        self.entries.setdefault(stage, {})[key] = {
+            "inputs": dict(inputs),
+            "outputs": outputs,
+            "recorded_at": time.time(),
+        }
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "stages": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,383 @@
+import os
+import json
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import openpyxl
+
+# ----------------------------
+# GENERATOR LAPORAN KEUANGAN SINTETIS
+# Membuat workbook tiruan berformat laporan keuangan IDX (sheet per bagian
+# laporan, kolom A label Indonesia, B periode berjalan, C periode lalu,
+# D label Inggris) untuk benchmark & uji tanpa download IDX asli.
+# ----------------------------
+
+# Komposisi jenis laporan (mendekati sebaran emiten IDX)
+TEMPLATE_MIX = (("umum", 0.80), ("bank", 0.08), ("asuransi", 0.07), ("syariah", 0.05))
+USD_SHARE = 0.15          # porsi emiten yang melapor dalam USD
+TEXT_NUMBER_SHARE = 0.05  # porsi angka yang ditulis sebagai teks ("1,234" / "(1,234)")
+PEMBULATAN = (
+    ("Satuan Penuh / Full Amount", 1),
+    ("Ribuan / In Thousand", 1_000),
+    ("Jutaan / In Million", 1_000_000),
+)
+MATA_UANG = {"IDR": "Rupiah / IDR", "USD": "Dollar Amerika / USD"}
+ROMAWI = {1: "I", 2: "II", 3: "III", 4: "IV"}
+NOTE_SHEETS = 3           # sheet catatan tambahan (tidak berisi label yang dicari)
+NOTE_ROWS = 60
+EXPECTED_NAME = "_expected.json"
+
+# Kode sheet per jenis laporan (meniru pola kode taksonomi IDX)
+_SHEET_CODES = {
+    "umum": ("2210000", "3312000", "4220000", "5220000"),
+    "bank": ("2310000", "3322000", "4320000", "5320000"),
+    "asuransi": ("2410000", "3332000", "4420000", "5420000"),
+    "syariah": ("2510000", "3342000", "4520000", "5520000"),
+}
+
+_INFO_UMUM = (
+    ("Nama entitas", "Entity name"),
+    ("Kode entitas", "Entity code"),
+    ("Nomor identifikasi entitas", "Entity identification number"),
+    ("Sektor industri utama", "Main industry sector"),
+    ("Jenis entitas", "Type of entity"),
+    ("Periode laporan keuangan", "Financial statement period"),
+    ("Tanggal akhir periode berjalan", "Current period end date"),
+    ("Mata uang pelaporan", "Reporting currency"),
+    ("Pembulatan yang digunakan dalam penyajian jumlah dalam laporan keuangan",
+     "Level of rounding used in financial statements"),
+    ("Status emiten", "Status of issuer"),
+    ("Opini auditor", "Auditor's opinion"),
+)
+
+_ARUS_KAS = (
+    ("Penerimaan kas dari pelanggan", "Receipts from customers", 0.9),
+    ("Pembayaran kas kepada pemasok", "Payments to suppliers", -0.6),
+    ("Pembayaran kas kepada karyawan", "Payments to employees", -0.1),
+    ("Jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas operasi",
+     "Total net cash flows received from (used in) operating activities", None),
+    ("Perolehan aset tetap", "Acquisition of property, plant and equipment", -0.08),
+    ("Hasil penjualan aset tetap", "Proceeds from sale of property, plant and equipment", 0.01),
+    ("Jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas investasi",
+     "Total net cash flows received from (used in) investing activities", None),
+    ("Penerimaan pinjaman bank", "Proceeds from bank loans", 0.05),
+    ("Pembayaran dividen", "Dividends paid", -0.03),
+    ("Jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas pendanaan",
+     "Total net cash flows received from (used in) financing activities", None),
+    ("Kas dan setara kas akhir periode", "Cash and cash equivalents at end of period", 0.1),
+)
+
+
+def kode_emiten(i: int) -> str:
+    """Kode 4 huruf yang unik dan stabil untuk indeks ke-i (AAAA, AAAB, ...)."""
+    letters = []
+    for _ in range(4):
+        i, r = divmod(i, 26)
+        letters.append(chr(ord("A") + r))
+    return "".join(reversed(letters))
+
+
+def _pick(rng: random.Random, mix) -> str:
+    x = rng.random()
+    for name, share in mix:
+        if x < share:
+            return name
+        x -= share
+    return mix[-1][0]
+
+
+class _Sheet:
+    """Kumpulan baris 1 sheet: (label Indonesia, nilai berjalan, nilai lalu, label Inggris)."""
+
+    def __init__(self, name: str, title: str):
+        self.name = name
+        self.rows = [(title, None, None, None), (None, None, None, None),
+                     (None, "Periode berjalan", "Periode sebelumnya", None)]
+
+    def add(self, label: str, value, label_en: Optional[str] = None, prior=None):
+        self.rows.append((label, value, prior, label_en))
+
+
+class _ReportBuilder:
+    """Menyusun 1 laporan dengan angka yang konsisten (subtotal = jumlah rinciannya)."""
+
+    def __init__(self, rng: random.Random, template: str, divisor: int):
+        self.rng = rng
+        self.template = template
+        self.divisor = divisor
+        self.expected = {}
+
+    def amount(self, full_value: float) -> int:
+        return int(round(full_value / self.divisor))
+
+    def cell(self, value: int):
+        """Sebagian kecil angka ditulis sebagai teks, seperti sel yang diketik manual."""
+        if self.rng.random() < TEXT_NUMBER_SHARE:
+            return f"({abs(value):,})" if value < 0 else f"{value:,}"
+        return value
+
+    def put(self, sheet: _Sheet, label: str, label_en: str, value: int, key: Optional[str] = None):
+        if key is not None and key not in self.expected:
+            self.expected[key] = value
+        prior = int(value * self.rng.uniform(0.8, 1.1))
+        sheet.add(label, self.cell(value), label_en, self.cell(prior))
+
+    def split(self, total: int, labels) -> List[int]:
+        weights = [self.rng.uniform(0.2, 1.0) for _ in labels]
+        parts = [int(total * w / sum(weights)) for w in weights]
+        parts[-1] += total - sum(parts)
+        return parts
+
+    def posisi_keuangan(self, name: str, total_aset_full: float) -> _Sheet:
+        sh = _Sheet(name, "Laporan posisi keuangan")
+        total_aset = self.amount(total_aset_full)
+        bank_like = self.template in ("bank", "syariah")
+        if self.template == "umum":
+            lancar = int(total_aset * self.rng.uniform(0.25, 0.6))
+            items = ("Kas dan setara kas", "Piutang usaha pihak ketiga", "Persediaan", "Uang muka", "Pajak dibayar dimuka")
+            for label, v in zip(items, self.split(lancar, items)):
+                self.put(sh, label, label, v)
+            self.put(sh, "Jumlah aset lancar", "Total current assets", lancar, "Aset Lancar")
+            items = ("Aset tetap", "Properti investasi", "Aset pajak tangguhan", "Goodwill")
+            for label, v in zip(items, self.split(total_aset - lancar, items)):
+                self.put(sh, label, label, v)
+            self.put(sh, "Jumlah aset tidak lancar", "Total non-current assets", total_aset - lancar, "Aset Tetap")
+        else:
+            items = (("Kas", "Giro pada Bank Indonesia", "Penempatan pada bank lain", "Kredit yang diberikan",
+                      "Efek-efek", "Aset tetap") if bank_like else
+                     ("Kas dan setara kas", "Piutang premi", "Piutang reasuransi", "Investasi", "Aset tetap"))
+            for label, v in zip(items, self.split(total_aset, items)):
+                self.put(sh, label, label, v)
+        self.put(sh, "Jumlah aset", "Total assets", total_aset, "Total Aset")
+
+        total_liab = int(total_aset * self.rng.uniform(0.85 if bank_like else 0.3, 0.92 if bank_like else 0.7))
+        syirkah = int(total_aset * self.rng.uniform(0.02, 0.06)) if self.template == "syariah" else 0
+        if self.template == "umum":
+            jp = int(total_liab * self.rng.uniform(0.3, 0.7))
+            items = ("Utang usaha pihak ketiga", "Utang pajak", "Beban akrual")
+            for label, v in zip(items, self.split(jp, items)):
+                self.put(sh, label, label, v)
+            self.put(sh, "Jumlah liabilitas jangka pendek", "Total current liabilities", jp, "Liabilitas Jangka Pendek")
+            items = ("Utang bank jangka panjang", "Liabilitas imbalan pasca kerja")
+            for label, v in zip(items, self.split(total_liab - jp, items)):
+                self.put(sh, label, label, v)
+            self.put(sh, "Jumlah liabilitas jangka panjang", "Total non-current liabilities", total_liab - jp,
+                     "Liabilitas Jangka Panjang")
+        else:
+            items = (("Simpanan nasabah giro", "Tabungan", "Deposito berjangka", "Simpanan dari bank lain")
+                     if bank_like else ("Liabilitas kontrak asuransi", "Utang klaim", "Utang reasuransi"))
+            for label, v in zip(items, self.split(total_liab, items)):
+                self.put(sh, label, label, v)
+        self.put(sh, "Jumlah liabilitas", "Total liabilities", total_liab, "Total Liabilitas")
+        if syirkah:
+            self.put(sh, "Jumlah dana syirkah temporer", "Total temporary syirkah funds", syirkah, "Dana Syirkah Temporer")
+
+        ekuitas_total = total_aset - total_liab - syirkah
+        nci = int(ekuitas_total * self.rng.uniform(0.0, 0.1))
+        ekuitas = ekuitas_total - nci
+        items = ("Saham biasa", "Tambahan modal disetor", "Saldo laba")
+        for label, v in zip(items, self.split(ekuitas, items)):
+            self.put(sh, label, label, v)
+        self.put(sh, "Jumlah ekuitas yang diatribusikan kepada pemilik entitas induk",
+                 "Total equity attributable to equity owners of parent entity", ekuitas, "Ekuitas")
+        self.put(sh, "Kepentingan non-pengendali", "Non-controlling interests", nci)
+        self.put(sh, "Jumlah ekuitas", "Total equity", ekuitas_total)
+        self.put(sh, "Jumlah liabilitas dan ekuitas", "Total liabilities and equity", total_aset)
+        return sh
+
+    def laba_rugi(self, name: str, total_aset: int) -> _Sheet:
+        sh = _Sheet(name, "Laporan laba rugi dan penghasilan komprehensif lain")
+        pendapatan = int(total_aset * self.rng.uniform(0.05, 0.6))
+        if self.template == "umum":
+            self.put(sh, "Penjualan dan pendapatan usaha", "Sales and revenue", pendapatan, "Pendapatan")
+            bruto = int(pendapatan * self.rng.uniform(0.1, 0.5))
+            self.put(sh, "Beban pokok penjualan dan pendapatan", "Cost of sales and revenue", bruto - pendapatan)
+            self.put(sh, "Jumlah laba bruto", "Total gross profit", bruto, "Laba Bruto")
+            base = bruto
+            self.put(sh, "Beban penjualan", "Selling expenses", -int(base * 0.1))
+            self.put(sh, "Beban umum dan administrasi", "General and administrative expenses", -int(base * 0.15))
+            self.put(sh, "Pendapatan keuangan", "Finance income", int(base * 0.02))
+            self.put(sh, "Beban keuangan", "Finance costs", -int(base * 0.05))
+        elif self.template == "bank":
+            self.put(sh, "Pendapatan bunga", "Interest income", pendapatan, "Pendapatan")
+            self.put(sh, "Beban bunga", "Interest expenses", -int(pendapatan * 0.4))
+            base = int(pendapatan * 0.6)
+            self.put(sh, "Pendapatan bunga bersih", "Net interest income", base)
+            self.put(sh, "Beban operasional lainnya", "Other operating expenses", -int(base * 0.3))
+        elif self.template == "asuransi":
+            self.put(sh, "Pendapatan dari premi asuransi", "Revenue from insurance premiums", pendapatan, "Pendapatan")
+            self.put(sh, "Premi reasuransi", "Reinsurance premiums", -int(pendapatan * 0.2))
+            base = int(pendapatan * 0.8)
+            self.put(sh, "Beban klaim", "Claim expenses", -int(base * 0.6))
+            base = int(base * 0.4)
+        else:
+            self.put(sh, "Pendapatan dari jual beli", "Income from sales and purchases", int(pendapatan * 0.6))
+            self.put(sh, "Pendapatan dari bagi hasil", "Income from profit sharing", int(pendapatan * 0.4))
+            base = int(pendapatan * 0.5)
+            self.put(sh, "Hak pihak ketiga atas bagi hasil dana syirkah temporer",
+                     "Third parties' share on return of temporary syirkah funds", -int(pendapatan * 0.3))
+        laba_sebelum_pajak = int(base * self.rng.uniform(-0.3, 0.6))
+        self.put(sh, "Jumlah laba (rugi) sebelum pajak penghasilan", "Total profit (loss) before tax",
+                 laba_sebelum_pajak, "Laba Usaha")
+        pajak = -int(max(laba_sebelum_pajak, 0) * 0.22)
+        self.put(sh, "Pendapatan (beban) pajak", "Tax benefit (expenses)", pajak)
+        self.put(sh, "Jumlah laba (rugi)", "Total profit (loss)", laba_sebelum_pajak + pajak, "Laba Bersih")
+        self.put(sh, "Laba (rugi) yang dapat diatribusikan ke entitas induk",
+                 "Profit (loss) attributable to parent entity", int((laba_sebelum_pajak + pajak) * 0.95))
+        return sh
+
+    def arus_kas(self, name: str, total_aset: int) -> _Sheet:
+        sh = _Sheet(name, "Laporan arus kas")
+        scale = int(total_aset * self.rng.uniform(0.05, 0.3))
+        running = 0
+        for label, label_en, share in _ARUS_KAS:
+            if share is not None:
+                v = int(scale * share * self.rng.uniform(0.7, 1.3))
+                running += v
+                self.put(sh, label, label_en, v)
+            else:
+                key = "Arus Kas " + label.rsplit(" ", 1)[-1].capitalize()
+                self.put(sh, label, label_en, running, key)
+                running = 0
+        return sh
+
+
+def build_report(i: int, tahun: int, kuartal: int, seed: int = 0) -> tuple:
+    """(kode, daftar _Sheet, info expected) untuk laporan ke-i; deterministik per (seed, i)."""
+    rng = random.Random(f"{seed}-{tahun}-{kuartal}-{i}")
+    kode = kode_emiten(i)
+    template = _pick(rng, TEMPLATE_MIX)
+    currency = "USD" if rng.random() < USD_SHARE else "IDR"
+    pembulatan_label, divisor = rng.choice(PEMBULATAN)
+    total_aset_full = 10 ** rng.uniform(7, 10) if currency == "USD" else 10 ** rng.uniform(11, 14)
+
+    rb = _ReportBuilder(rng, template, divisor)
+    info = _Sheet("1000000", "Informasi umum")
+    for label, label_en in _INFO_UMUM:
+        value = {
+            "Nama entitas": f"PT {kode} Sintetis Tbk",
+            "Kode entitas": kode,
+            "Nomor identifikasi entitas": f"{kode}{i:06d}",
+            "Sektor industri utama": {"umum": "Barang Konsumen", "bank": "Keuangan", "asuransi": "Keuangan",
+                                      "syariah": "Keuangan"}[template],
+            "Jenis entitas": "Emiten",
+            "Periode laporan keuangan": f"TW{kuartal}" if kuartal < 4 else "Tahunan",
+            "Tanggal akhir periode berjalan": f"{tahun}-{kuartal * 3:02d}-30",
+            "Mata uang pelaporan": MATA_UANG[currency],
+            "Pembulatan yang digunakan dalam penyajian jumlah dalam laporan keuangan": pembulatan_label,
+            "Status emiten": "Aktif",
+            "Opini auditor": "Tidak diaudit" if kuartal < 4 else "Wajar tanpa modifikasian",
+        }[label]
+        info.add(label, value, label_en)
+
+    code_posisi, code_lr, code_ekuitas, code_ak = _SHEET_CODES[template]
+    posisi = rb.posisi_keuangan(code_posisi, total_aset_full)
+    total_aset = rb.expected["Total Aset"]
+    laba_rugi = rb.laba_rugi(code_lr, total_aset)
+
+    ekuitas = _Sheet(code_ekuitas, "Laporan perubahan ekuitas")
+    for label in ("Saldo awal periode", "Laba periode berjalan", "Dividen", "Saldo akhir periode"):
+        ekuitas.add(label, rb.cell(int(total_aset * rng.uniform(0.01, 0.3))), label)
+    arus_kas = rb.arus_kas(code_ak, total_aset)
+
+    notes = []
+    for n in range(NOTE_SHEETS):
+        sh = _Sheet(f"{6 + n}{code_posisi[1:]}", f"Catatan atas laporan keuangan {n + 1}")
+        for r in range(NOTE_ROWS):
+            sh.add(f"Rincian catatan {n + 1}.{r + 1}", rb.cell(int(total_aset * rng.uniform(0.0001, 0.01))),
+                   f"Note detail {n + 1}.{r + 1}")
+        notes.append(sh)
+
+    expected = {"template": template, "currency": currency, "divisor": divisor, "values": rb.expected}
+    return kode, [info, posisi, laba_rugi, ekuitas, arus_kas] + notes, expected
+
+
+def report_file_name(kode: str, tahun: int, kuartal: int) -> str:
+    return f"FinancialStatement-{tahun}-{ROMAWI[int(kuartal)]}-{kode}.xlsx"
+
+
+def write_report(folder: str, i: int, tahun: int, kuartal: int, seed: int = 0) -> tuple:
+    kode, sheets, expected = build_report(i, tahun, kuartal, seed)
+    wb = openpyxl.Workbook(write_only=True)
+    for sheet in sheets:
+        ws = wb.create_sheet(sheet.name)
+        for row in sheet.rows:
+            ws.append(list(row))
+    path = os.path.join(folder, report_file_name(kode, tahun, kuartal))
+    wb.save(path)
+    return kode, expected
+
+
+def _write_range(args) -> Dict[str, dict]:
+    folder, start, stop, tahun, kuartal, seed = args
+    return dict(write_report(folder, i, tahun, kuartal, seed) for i in range(start, stop))
+
+
+def write_ringkasan(folder: str, kodes: List[str], tahun: int, kuartal: int, seed: int = 0) -> str:
+    """File 'Ringkasan Saham-*' (harga penutupan & jumlah saham beredar) untuk kode-kode yang dibuat."""
+    rng = random.Random(f"{seed}-ringkasan-{tahun}-{kuartal}")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Ringkasan Saham")
+    ws.append(["No", "Kode Saham", "Nama Perusahaan", "Sebelumnya", "Penutupan", "Volume", "Listed Shares", "Tradable Shares"])
+    for n, kode in enumerate(kodes, start=1):
+        shares = rng.randint(500, 100_000) * 1_000_000
+        close = rng.randint(50, 20_000)
+        ws.append([n, kode, f"PT {kode} Sintetis Tbk", close, close + rng.randint(-50, 50),
+                   rng.randint(0, 10 ** 8), shares, int(shares * rng.uniform(0.5, 1.0))])
+    path = os.path.join(folder, f"Ringkasan Saham-{tahun}{kuartal * 3:02d}30.xlsx")
+    wb.save(path)
+    return path
+
+
+def write_sektor(path: str, kodes: List[str], seed: int = 0) -> str:
+    """File klasifikasi sektor (format yang dibaca Konsolidasi.py) untuk kode-kode yang dibuat."""
+    rng = random.Random(f"{seed}-sektor")
+    sektor = ("Energi", "Barang Baku", "Perindustrian", "Barang Konsumen Primer", "Keuangan", "Properti", "Teknologi")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sektor")
+    ws.append(["Kode Emiten", "Nama Entitas", "Sektor", "Subsektor", "Industri", "Subindustri"])
+    for kode in kodes:
+        s = rng.choice(sektor)
+        ws.append([kode, f"PT {kode} Sintetis Tbk", s, f"{s} A", f"{s} A1", f"{s} A1a"])
+    wb.save(path)
+    return path
+
+
+def generate_quarter(folder: str, n_files: int, tahun: int = 2025, kuartal: int = 3, seed: int = 0,
+                     workers: Optional[int] = None, ringkasan: bool = True) -> Dict[str, dict]:
+    """
+    Tulis n_files laporan sintetis (+ file Ringkasan Saham) ke folder, paralel
+    per rentang indeks. Kembalikan {kode: expected} dan simpan juga sebagai
+    _expected.json (nilai mentah sebelum kurs/pembulatan) untuk cek akurasi.
+    """
+    os.makedirs(folder, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    step = max(1, -(-n_files // (workers * 4)))
+    ranges = [(folder, s, min(s + step, n_files), tahun, kuartal, seed) for s in range(0, n_files, step)]
+    expected = {}
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(_write_range, ranges):
+                expected.update(part)
+    else:
+        for r in ranges:
+            expected.update(_write_range(r))
+    if ringkasan:
+        write_ringkasan(folder, sorted(expected), tahun, kuartal, seed)
+    with open(os.path.join(folder, EXPECTED_NAME), "w", encoding="utf-8") as f:
+        json.dump({"tahun": tahun, "kuartal": kuartal, "seed": seed, "reports": expected}, f)
+    return expected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat laporan keuangan IDX sintetis untuk benchmark/uji.")
+    parser.add_argument("folder", help="Folder tujuan (misal '<tmp>/2025 Q3')")
+    parser.add_argument("jumlah", type=int, help="Jumlah file laporan")
+    parser.add_argument("--tahun", type=int, default=2025)
+    parser.add_argument("--kuartal", type=int, default=3, choices=(1, 2, 3, 4))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    hasil = generate_quarter(args.folder, args.jumlah, args.tahun, args.kuartal, args.seed)
+    print(f"{len(hasil)} laporan sintetis ditulis ke {args.folder}")
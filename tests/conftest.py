@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Script repo ada di root (bukan package); tambahkan ke sys.path untuk import di test
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import rekap_fundamental as rf
+
+
+def _autofit_lama(path):
+    """Autofit versi lama: baca ulang workbook lalu ukur str(cell.value) tiap sel."""
+    wb = openpyxl.load_workbook(path)
+    hasil = {}
+    for ws in wb.worksheets:
+        for col in ws.columns:
+            max_length = max(len("" if cell.value is None else str(cell.value)) for cell in col)
+            hasil[(ws.title, col[0].column_letter)] = max_length + 2
+    wb.close()
+    return hasil
+
+
+def _lebar_tersimpan(path):
+    wb = openpyxl.load_workbook(path)
+    hasil = {(ws.title, huruf): dim.width for ws in wb.worksheets for huruf, dim in ws.column_dimensions.items()}
+    wb.close()
+    return hasil
+
+
+def test_widths_match_autofit_of_written_cells(tmp_path):
+    df_data = pd.DataFrame({
+        "Saham": ["AALI", "BBCA", "TLKM"],
+        # Float bulat tampil tanpa '.0' di sel, angka panjang dipotong ke 16 digit
+        "Harga": [1000.0, 123456789.0, np.nan],
+        "EPS": [0.1 + 0.2, -2.0, 1.0 / 3.0],
+        "PER": [np.inf, 12.5, -np.inf],
+        "Laba": [12345678901234567890.0, 1e16, 1.5e-07],
+        "Jumlah": [1, 250, 3000],
+        "Campuran": ["x", 2.0, None],
+        "Tanggal": pd.to_datetime(["2025-09-30", "2025-06-30", "2025-03-31"]),
+    })
+    df_rekap = pd.DataFrame({"Saham": ["AALI"], "ROE": [15.0]})
+    path = str(tmp_path / "rekap.xlsx")
+
+    rf.save_workbook_with_autofit(path, df_data, pd.DataFrame(), df_rekap)
+
+    assert _lebar_tersimpan(path) == _autofit_lama(path)
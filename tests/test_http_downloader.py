@@ -0,0 +1,257 @@
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_downloader import DownloadManifest, HttpDownloader, file_sha1
+
+
+def _xlsx_bytes(isi: str = "laporan") -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("xl/workbook.xml", f"<workbook>{isi}</workbook>")
+    return buf.getvalue()
+
+
+class _Server:
+    """
+    Server HTTP lokal untuk test. `routes[path]` = daftar respons
+    (status, headers, body) yang dipakai berurutan; respons terakhir diulang.
+    Header tiap request dicatat di `requests[path]`.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.setdefault(self.path, []).append(dict(self.headers))
+                antrean = server.routes[self.path]
+                status, headers, body = antrean.pop(0) if len(antrean) > 1 else antrean[0]
+                self.send_response(status)
+                headers = {"Content-Length": str(len(body)), **headers}
+                for nama, nilai in headers.items():
+                    self.send_header(nama, nilai)
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    srv = _Server()
+    yield srv
+    srv.close()
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    m = DownloadManifest(str(tmp_path))
+    yield m
+    m.close()
+
+
+def _downloader(manifest, retries=2):
+    return HttpDownloader(max_workers=2, retries=retries, backoff=0, timeout=5, manifest=manifest)
+
+
+def _sisa_part(tmp_path):
+    return [n for n in os.listdir(tmp_path) if n.endswith(".part")]
+
+
+def test_download_ok_writes_file_and_manifest(server, manifest, tmp_path):
+    body = _xlsx_bytes()
+    server.routes["/lk/AALI.xlsx"] = [(200, {"ETag": '"v1"'}, body)]
+    dest = str(tmp_path / "AALI.xlsx")
+
+    dl = _downloader(manifest)
+    try:
+        assert dl.download(server.url("/lk/AALI.xlsx"), dest) == (True, "ok")
+    finally:
+        dl.close()
+
+    with open(dest, "rb") as f:
+        assert f.read() == body
+    entry = manifest.get("AALI.xlsx")
+    assert entry["size"] == len(body)
+    assert entry["sha1"] == file_sha1(dest)
+    assert entry["etag"] == '"v1"'
+    assert manifest.verify(dest) is True
+    assert _sisa_part(tmp_path) == []
+
+
+def test_truncated_body_is_rejected_and_keeps_old_file(server, manifest, tmp_path):
+    body = _xlsx_bytes()
+    # Content-Length lebih besar dari isi yang dikirim: koneksi putus di tengah file
+    server.routes["/lk/BBCA.xlsx"] = [(200, {"Content-Length": str(len(body) + 500)}, body)]
+    dest = tmp_path / "BBCA.xlsx"
+    lama = _xlsx_bytes("versi lama")
+    dest.write_bytes(lama)
+
+    dl = _downloader(manifest)
+    try:
+        ok, msg = dl.download(server.url("/lk/BBCA.xlsx"), str(dest))
+    finally:
+        dl.close()
+
+    assert not ok
+    # urllib3 memutus stream pendek (IncompleteRead); cek Content-Length downloader sebagai lapis kedua
+    assert "IncompleteRead" in msg or "terpotong" in msg, msg
+    assert dest.read_bytes() == lama
+    assert manifest.get("BBCA.xlsx") is None
+    assert _sisa_part(tmp_path) == []
+
+
+def test_html_page_served_as_xlsx_is_rejected(server, manifest, tmp_path):
+    # Sesi kedaluwarsa: server membalas halaman login dengan status 200
+    server.routes["/lk/TLKM.xlsx"] = [(200, {"Content-Type": "text/html"}, b"<html><body>Login</body></html>")]
+    dest = tmp_path / "TLKM.xlsx"
+
+    dl = _downloader(manifest)
+    try:
+        assert dl.download(server.url("/lk/TLKM.xlsx"), str(dest)) == (False, "isi bukan file xlsx")
+    finally:
+        dl.close()
+
+    assert not dest.exists()
+    assert manifest.get("TLKM.xlsx") is None
+    assert _sisa_part(tmp_path) == []
+
+
+def test_5xx_is_retried_until_success(server, manifest, tmp_path):
+    body = _xlsx_bytes()
+    server.routes["/lk/ASII.xlsx"] = [(503, {}, b"sibuk"), (502, {}, b"sibuk"), (200, {}, body)]
+    dest = tmp_path / "ASII.xlsx"
+
+    dl = _downloader(manifest, retries=3)
+    try:
+        assert dl.download(server.url("/lk/ASII.xlsx"), str(dest)) == (True, "ok")
+    finally:
+        dl.close()
+
+    assert len(server.requests["/lk/ASII.xlsx"]) == 3
+    assert dest.read_bytes() == body
+
+
+def test_5xx_gives_up_after_retries(server, manifest, tmp_path):
+    server.routes["/lk/UNVR.xlsx"] = [(500, {}, b"error")]
+    dest = tmp_path / "UNVR.xlsx"
+
+    dl = _downloader(manifest, retries=2)
+    try:
+        assert dl.download(server.url("/lk/UNVR.xlsx"), str(dest)) == (False, "HTTP 500")
+    finally:
+        dl.close()
+
+    # 1 percobaan awal + 2 ulangan
+    assert len(server.requests["/lk/UNVR.xlsx"]) == 3
+    assert not dest.exists()
+    assert _sisa_part(tmp_path) == []
+
+
+def test_download_many_reports_each_file(server, manifest, tmp_path):
+    server.routes["/lk/A.xlsx"] = [(200, {}, _xlsx_bytes("a"))]
+    server.routes["/lk/B.xlsx"] = [(200, {}, b"<html>error</html>")]
+    jobs = [(server.url("/lk/A.xlsx"), str(tmp_path / "A.xlsx")),
+            (server.url("/lk/B.xlsx"), str(tmp_path / "B.xlsx"))]
+    selesai = []
+
+    dl = _downloader(manifest)
+    try:
+        hasil = dl.download_many(jobs, on_done=lambda url, dest, ok, msg: selesai.append(os.path.basename(dest)))
+    finally:
+        dl.close()
+
+    status = {os.path.basename(dest): ok for _, dest, ok, _ in hasil}
+    assert status == {"A.xlsx": True, "B.xlsx": False}
+    assert sorted(selesai) == ["A.xlsx", "B.xlsx"]
+
+
+def test_second_download_is_conditional_and_304_keeps_file(server, manifest, tmp_path):
+    body = _xlsx_bytes()
+    validator = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Oct 2025 08:00:00 GMT"}
+    server.routes["/lk/BBRI.xlsx"] = [(200, validator, body), (304, {}, b"")]
+    dest = tmp_path / "BBRI.xlsx"
+    url = server.url("/lk/BBRI.xlsx")
+
+    dl = _downloader(manifest)
+    try:
+        assert dl.download(url, str(dest)) == (True, "ok")
+        entry_awal = dict(manifest.get("BBRI.xlsx"))
+        mtime_awal = dest.stat().st_mtime_ns
+
+        assert dl.download(url, str(dest)) == (True, "tidak berubah")
+    finally:
+        dl.close()
+
+    pertama, kedua = server.requests["/lk/BBRI.xlsx"]
+    assert "If-None-Match" not in pertama
+    assert kedua["If-None-Match"] == '"v1"'
+    assert kedua["If-Modified-Since"] == validator["Last-Modified"]
+    # 304: file tidak ditulis ulang dan entri manifest tetap
+    assert dest.stat().st_mtime_ns == mtime_awal
+    assert dest.read_bytes() == body
+    assert manifest.get("BBRI.xlsx") == entry_awal
+    assert _sisa_part(tmp_path) == []
+
+
+def test_revised_file_replaces_old_one(server, manifest, tmp_path):
+    lama, baru = _xlsx_bytes("v1"), _xlsx_bytes("revisi")
+    server.routes["/lk/BMRI.xlsx"] = [(200, {"ETag": '"v1"'}, lama), (200, {"ETag": '"v2"'}, baru)]
+    dest = tmp_path / "BMRI.xlsx"
+    url = server.url("/lk/BMRI.xlsx")
+
+    dl = _downloader(manifest)
+    try:
+        assert dl.download(url, str(dest)) == (True, "ok")
+        assert dl.download(url, str(dest)) == (True, "ok")
+    finally:
+        dl.close()
+
+    assert server.requests["/lk/BMRI.xlsx"][1]["If-None-Match"] == '"v1"'
+    assert dest.read_bytes() == baru
+    assert manifest.get("BMRI.xlsx")["etag"] == '"v2"'
+    assert manifest.get("BMRI.xlsx")["sha1"] == file_sha1(str(dest))
+
+
+def test_manifest_survives_reload(server, tmp_path):
+    server.routes["/lk/ICBP.xlsx"] = [(200, {"ETag": '"v1"'}, _xlsx_bytes()), (304, {}, b"")]
+    dest = tmp_path / "ICBP.xlsx"
+    url = server.url("/lk/ICBP.xlsx")
+
+    m = DownloadManifest(str(tmp_path))
+    dl = _downloader(m)
+    try:
+        assert dl.download(url, str(dest)) == (True, "ok")
+    finally:
+        dl.close()
+        m.close()
+
+    # Run berikutnya: manifest dibaca dari disk dan tetap dipakai untuk request bersyarat
+    m2 = DownloadManifest(str(tmp_path))
+    dl = _downloader(m2)
+    try:
+        assert dl.download(url, str(dest)) == (True, "tidak berubah")
+    finally:
+        dl.close()
+        m2.close()
+    assert server.requests["/lk/ICBP.xlsx"][1]["If-None-Match"] == '"v1"'
@@ -0,0 +1,133 @@
+import json
+import os
+import urllib.parse
+
+import pytest
+
+from idx_listing import (IDX_BASE, FixtureFetcher, ListingError, RecordingFetcher, fixture_name,
+                         list_report_urls, listing_params)
+
+TAHUN, KUARTAL = 2025, 3
+FOLDER_LK = "Portals/0/StaticData/ListedCompanies/Corporate_Actions/New_Info_JSX/Jenis_Informasi/01_Laporan_Keuangan/02_Soft_Copy_Laporan_Keuangan//Laporan Keuangan Tahun 2025/TW3"
+
+
+def _emiten(kode, lampiran):
+    return {"KodeEmiten": kode, "NamaEmiten": f"PT {kode} Tbk", "Report_Period": "TW3", "Report_Year": "2025",
+            "Attachments": [{"File_Name": nama, "File_Path": path} for nama, path in lampiran]}
+
+
+def _lk(kode, nama):
+    return nama, f"/{FOLDER_LK}/{kode}/{nama}"
+
+
+# Rekaman respons API: 3 emiten, pageSize 2 -> 2 halaman
+HALAMAN = {
+    1: {"ResultCount": 3, "Results": [
+        _emiten("AALI", [_lk("AALI", "FinancialStatement-2025-III-AALI.xlsx"),
+                         _lk("AALI", "FinancialStatement-2025-III-AALI.pdf"),
+                         _lk("AALI", "Lampiran Laporan Keuangan AALI.zip")]),
+        _emiten("BBCA", [_lk("BBCA", "FinancialStatement-2025-III-BBCA.xlsx"),
+                         # File_Name kosong: nama diambil dari File_Path
+                         ("", f"/{FOLDER_LK}/BBCA/Inline XBRL BBCA.XLSX"),
+                         _lk("BBCA", "FinancialStatement-2025-III-BBCA.pdf")]),
+    ]},
+    2: {"ResultCount": 3, "Results": [
+        _emiten("TLKM", [("FinancialStatement-2025-III-TLKM.xlsx",
+                          f"https://www.idx.co.id/{FOLDER_LK}/TLKM/FinancialStatement-2025-III-TLKM.xlsx"),
+                         _lk("TLKM", "Surat Pengantar TLKM.pdf"),
+                         # Lampiran tanpa path dilewati
+                         ("FinancialStatement-2025-III-TLKM-revisi.xlsx", "")]),
+    ]},
+}
+
+
+def _rekam(folder, halaman, page_size=2):
+    os.makedirs(folder, exist_ok=True)
+    for page, data in halaman.items():
+        path = os.path.join(folder, fixture_name(listing_params(TAHUN, KUARTAL, page, page_size)))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+
+def _tuples(urls):
+    hasil = []
+    for url in urls:
+        path = urllib.parse.unquote(urllib.parse.urlsplit(url).path)
+        nama = os.path.basename(path)
+        hasil.append((os.path.basename(os.path.dirname(path)), url, os.path.splitext(nama)[1].lower()))
+    return hasil
+
+
+class _Hitung:
+    """Bungkus fetcher dan catat halaman yang diminta."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.pages = []
+
+    def get_json(self, params):
+        self.pages.append(int(params["indexFrom"]))
+        return self.inner.get_json(params)
+
+
+def test_listing_parses_recorded_pages(tmp_path):
+    _rekam(str(tmp_path), HALAMAN)
+    fetcher = _Hitung(FixtureFetcher(str(tmp_path)))
+
+    urls = list_report_urls(fetcher, TAHUN, KUARTAL, page_size=2)
+
+    quote = lambda kode, nama: IDX_BASE + urllib.parse.quote(f"/{FOLDER_LK}/{kode}/{nama}", safe="/%")
+    assert _tuples(urls) == [
+        ("AALI", quote("AALI", "FinancialStatement-2025-III-AALI.xlsx"), ".xlsx"),
+        ("BBCA", quote("BBCA", "FinancialStatement-2025-III-BBCA.xlsx"), ".xlsx"),
+        ("BBCA", quote("BBCA", "Inline XBRL BBCA.XLSX"), ".xlsx"),
+        ("TLKM", quote("TLKM", "FinancialStatement-2025-III-TLKM.xlsx"), ".xlsx"),
+    ]
+    # Halaman 2 ikut dibaca; berhenti setelah semua ResultCount emiten terbaca
+    assert fetcher.pages == [1, 2]
+    # Spasi di path ter-encode, tidak ada lampiran PDF/ZIP
+    assert all(" " not in u for u in urls)
+    assert not any(u.lower().endswith((".pdf", ".zip")) for u in urls)
+
+
+def test_listing_stops_on_empty_page(tmp_path):
+    halaman = {1: dict(HALAMAN[1], ResultCount=10)}
+    _rekam(str(tmp_path), halaman)
+    fetcher = _Hitung(FixtureFetcher(str(tmp_path)))
+
+    urls = list_report_urls(fetcher, TAHUN, KUARTAL, page_size=2)
+
+    # Halaman 2 tidak direkam -> dianggap kosong (akhir listing)
+    assert fetcher.pages == [1, 2]
+    assert [kode for kode, _, _ in _tuples(urls)] == ["AALI", "BBCA", "BBCA"]
+
+
+def test_listing_stops_when_page_repeats(tmp_path):
+    # Server yang mengabaikan indexFrom mengembalikan halaman yang sama terus
+    halaman = {p: dict(HALAMAN[1], ResultCount=10) for p in (1, 2, 3)}
+    _rekam(str(tmp_path), halaman)
+    fetcher = _Hitung(FixtureFetcher(str(tmp_path)))
+
+    urls = list_report_urls(fetcher, TAHUN, KUARTAL, page_size=2)
+
+    assert fetcher.pages == [1, 2]
+    assert len(urls) == len(set(urls)) == 3
+
+
+def test_recording_fetcher_round_trip(tmp_path):
+    sumber, rekaman = str(tmp_path / "sumber"), str(tmp_path / "rekaman")
+    _rekam(sumber, HALAMAN)
+
+    live = list_report_urls(RecordingFetcher(FixtureFetcher(sumber), rekaman), TAHUN, KUARTAL, page_size=2)
+    replay = list_report_urls(FixtureFetcher(rekaman), TAHUN, KUARTAL, page_size=2)
+
+    assert replay == live
+    assert sorted(os.listdir(rekaman)) == sorted(os.listdir(sumber))
+
+
+def test_non_json_fixture_raises(tmp_path):
+    path = tmp_path / fixture_name(listing_params(TAHUN, KUARTAL, 1, 2))
+    path.write_text("<html>Access denied</html>", encoding="utf-8")
+
+    with pytest.raises(ListingError):
+        list_report_urls(FixtureFetcher(str(tmp_path)), TAHUN, KUARTAL, page_size=2)
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pandas as pd
+
+from Konsolidasi import kumpulkan_sumber_kuartal
+
+
+def _tulis_kuartal(folder, tahun, kuartal, kode):
+    path = os.path.join(folder, f"{tahun} Kuartal {kuartal}.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Saham": kode, "Harga": [1000.0 + i for i in range(len(kode))]}).to_excel(
+            writer, sheet_name="Data", index=False)
+        pd.DataFrame({"Saham": kode, "PER": [10.5 + i for i in range(len(kode))]}).to_excel(
+            writer, sheet_name="Rekap", index=False)
+    return path
+
+
+def _manifest(folder_cache):
+    with open(os.path.join(folder_cache, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _sumber(daftar):
+    return {(tahun, kuartal): sumber for tahun, kuartal, _, sumber, _ in daftar}
+
+
+def test_overridden_quarter_keeps_its_cache(tmp_path):
+    folder, folder_cache = str(tmp_path), str(tmp_path / "_cache_konsolidasi")
+    _tulis_kuartal(folder, 2025, 2, ["AALI", "BBCA"])
+    _tulis_kuartal(folder, 2025, 3, ["AALI", "BBCA", "TLKM"])
+
+    awal = _sumber(kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1))
+    entry_q3 = _manifest(folder_cache)["2025 Kuartal 3.xlsx"]
+    assert awal[(2025, 3)] == entry_q3["cache_file"]
+
+    # Run dengan hasil rekap Q3 dari memori: file Q3 tidak dibaca, cache-nya tidak dibuang
+    override = pd.DataFrame({"Kode Emiten": ["AALI"], "Tahun": [2025], "Kuartal": [3]})
+    hasil = _sumber(kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1,
+                                             frames_override={(2025, 3): override}))
+    assert hasil[(2025, 3)] is override
+    assert _manifest(folder_cache)["2025 Kuartal 3.xlsx"] == entry_q3
+    assert os.path.exists(entry_q3["cache_file"])
+
+    # Run berikutnya tanpa override memakai cache lama, bukan membaca ulang file
+    berikut = _sumber(kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1))
+    assert berikut == awal
+    assert len(pd.read_pickle(berikut[(2025, 3)])) == 3
+
+
+def test_changed_file_after_override_is_read_again(tmp_path):
+    folder, folder_cache = str(tmp_path), str(tmp_path / "_cache_konsolidasi")
+    _tulis_kuartal(folder, 2025, 3, ["AALI"])
+    kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1)
+    cache_lama = _manifest(folder_cache)["2025 Kuartal 3.xlsx"]["cache_file"]
+
+    # File ditulis ulang oleh rekap bersamaan dengan override di memori
+    _tulis_kuartal(folder, 2025, 3, ["AALI", "BBCA"])
+    override = pd.DataFrame({"Kode Emiten": ["AALI", "BBCA"], "Tahun": [2025, 2025], "Kuartal": [3, 3]})
+    kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1, frames_override={(2025, 3): override})
+
+    hasil = _sumber(kumpulkan_sumber_kuartal(folder, folder_cache, max_workers=1))
+    assert hasil[(2025, 3)] != cache_lama
+    assert not os.path.exists(cache_lama)
+    assert len(pd.read_pickle(hasil[(2025, 3)])) == 2
@@ -0,0 +1,50 @@
+import importlib.util
+import os
+
+import pytest
+
+import Konsolidasi
+from stage_cache import StageState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def orkestrator(tmp_path, monkeypatch):
+    # Nama file memakai tanda hubung, jadi dimuat lewat importlib
+    spec = importlib.util.spec_from_file_location("orkestrator", os.path.join(ROOT, "end-to-end_valuation_analysis.py"))
+    modul = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modul)
+    monkeypatch.setattr(modul, "STATE_PATH", str(tmp_path / "status.json"))
+    monkeypatch.setattr(modul, "METRICS_FOLDER", str(tmp_path / "metrik"))
+    monkeypatch.setattr(modul, "PIPELINE_MODE", False)
+    monkeypatch.setattr(modul, "SCRIPT_DIRS", [])
+    monkeypatch.setattr(modul, "tahap_rekap", lambda tahun, kuartal: None)
+    return modul
+
+
+def _jalankan(modul):
+    modul.jalankan_semua_script(["--tahun", "2025", "--kuartal", "3"])
+    return StageState(modul.STATE_PATH)
+
+
+def test_failed_konsolidasi_is_not_skipped_next_run(orkestrator, monkeypatch):
+    monkeypatch.setattr(orkestrator, "tahap_scraper", lambda tahun, kuartal: {'found': 1, 'downloaded': 1, 'failed': 0})
+    monkeypatch.setattr(Konsolidasi, "run_konsolidasi", lambda **kwargs: None)
+    state = _jalankan(orkestrator)
+    assert orkestrator.perlu_dijalankan(state, "konsolidasi", "2025", "3", set())
+    assert not orkestrator.perlu_dijalankan(state, "scraper", "2025", "3", set())
+
+    dipanggil = []
+    monkeypatch.setattr(Konsolidasi, "run_konsolidasi",
+                        lambda **kwargs: dipanggil.append(kwargs) or {'baris': 0, 'kuartal': 0})
+    state = _jalankan(orkestrator)
+    assert len(dipanggil) == 1
+    assert not orkestrator.perlu_dijalankan(state, "konsolidasi", "2025", "3", set())
+
+
+def test_scraper_with_failed_downloads_is_not_recorded(orkestrator, monkeypatch):
+    monkeypatch.setattr(orkestrator, "tahap_scraper", lambda tahun, kuartal: {'found': 3, 'downloaded': 1, 'failed': 2})
+    monkeypatch.setattr(Konsolidasi, "run_konsolidasi", lambda **kwargs: {'baris': 0, 'kuartal': 0})
+    state = _jalankan(orkestrator)
+    assert orkestrator.perlu_dijalankan(state, "scraper", "2025", "3", set())
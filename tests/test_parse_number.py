@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rekap_fundamental import parse_number, parse_number_series
+
+SEEDS = range(20)
+TEXT_SAMPLES = ("-", "", "   ", "()", "%", "(-)", "Rp 1.000", "abc", "12a", "1,2,3x", "N/A", "nan", "inf", "--5", "1e", "(5")
+
+
+def _thousands(rng: random.Random, value: float) -> str:
+    text = f"{value:,.{rng.choice([0, 0, 2])}f}"
+    return text.replace(",", rng.choice([",", ",", " "]))
+
+
+def _random_text(rng: random.Random) -> str:
+    value = rng.uniform(-1e12, 1e12) if rng.random() < 0.5 else rng.randint(-10**9, 10**9)
+    kind = rng.randrange(8)
+    if kind == 0:
+        text = _thousands(rng, abs(value))
+    elif kind == 1:
+        text = f"({_thousands(rng, abs(value))})"
+    elif kind == 2:
+        text = f"{value:.{rng.randint(1, 6)}{rng.choice('eE')}}"
+    elif kind == 3:
+        text = f"{rng.uniform(-100, 100):.2f}%"
+        if rng.random() < 0.3:
+            text = f"({text.lstrip('-')})"
+    elif kind == 4:
+        text = rng.choice(TEXT_SAMPLES)
+    elif kind == 5:
+        text = _thousands(rng, abs(value)) + rng.choice([" juta", "x", " *", "Rp"])
+    elif kind == 6:
+        text = str(value)
+    else:
+        text = str(int(value))
+    pad = rng.choice(["", " ", "  ", "\t", "\xa0"])
+    return pad + text + pad[::-1]
+
+
+def _random_value(rng: random.Random):
+    kind = rng.randrange(10)
+    if kind == 0:
+        return rng.choice([None, np.nan, float("nan"), pd.NA])
+    if kind == 1:
+        return rng.randint(-10**12, 10**12)
+    if kind == 2:
+        return rng.uniform(-1e12, 1e12)
+    if kind == 3:
+        return np.float64(rng.uniform(-1e6, 1e6))
+    if kind == 4:
+        return np.int64(rng.randint(-10**6, 10**6))
+    return _random_text(rng)
+
+
+def _expected(values) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in map(parse_number, values)], dtype=float)
+
+
+def _assert_same(values) -> None:
+    hasil = parse_number_series(pd.Series(values, dtype=object))
+    np.testing.assert_array_equal(hasil.to_numpy(dtype=float), _expected(values), err_msg=repr(values))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_mixed_values_match_scalar(seed):
+    rng = random.Random(seed)
+    _assert_same([_random_value(rng) for _ in range(rng.randint(1, 300))])
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_text_only_values_match_scalar(seed):
+    rng = random.Random(1000 + seed)
+    _assert_same([_random_text(rng) for _ in range(rng.randint(1, 300))])
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_numeric_column_matches_scalar(seed):
+    rng = random.Random(2000 + seed)
+    values = [rng.choice([np.nan, rng.uniform(-1e9, 1e9), float(rng.randint(-10**6, 10**6))]) for _ in range(100)]
+    hasil = parse_number_series(pd.Series(values))
+    np.testing.assert_array_equal(hasil.to_numpy(), _expected(values))
+
+
+def test_edge_cases_match_scalar():
+    _assert_same(["-", "", " ", None, np.nan, pd.NA, "(1,234)", "1.5e3", "(2E-2)", "12%", "(12 %)", "1 234 567",
+                  "abc", "Rp 5", "()", "%", "nan", "-inf"])
+    _assert_same([])
@@ -0,0 +1,55 @@
+import importlib
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+import scarper_lk
+
+
+class _ChromePalsu:
+    """Pengganti webdriver.Chrome: simpan options tanpa membuka browser."""
+
+    def __init__(self, service=None, options=None):
+        self.service = service
+        self.options = options
+
+
+@pytest.fixture
+def buat_driver(monkeypatch):
+    monkeypatch.setattr(scarper_lk.webdriver, "Chrome", _ChromePalsu)
+    monkeypatch.setattr(scarper_lk, "Service", lambda path: path)
+    monkeypatch.setattr(scarper_lk, "CHROMEDRIVER_PATH", "chromedriver")
+    return scarper_lk.make_driver
+
+
+def _args(drv):
+    return list(drv.options.arguments)
+
+
+def test_headless_flag_sets_headless_options(buat_driver, monkeypatch, tmp_path):
+    monkeypatch.setattr(scarper_lk, "HEADLESS", True)
+    drv = buat_driver(str(tmp_path))
+    assert "--headless=new" in _args(drv)
+    assert "--window-size=1920,1080" in _args(drv)
+    assert "--start-maximized" not in _args(drv)
+    assert drv.options.experimental_options["prefs"]["download.default_directory"] == str(tmp_path)
+
+
+def test_headless_off_opens_maximized_window(buat_driver, monkeypatch, tmp_path):
+    monkeypatch.setattr(scarper_lk, "HEADLESS", False)
+    drv = buat_driver(str(tmp_path))
+    assert "--start-maximized" in _args(drv)
+    assert not any(a.startswith("--headless") for a in _args(drv))
+
+
+@pytest.mark.parametrize("nilai, headless", [("1", True), ("0", False), ("false", False), ("yes", True)])
+def test_env_var_controls_headless(monkeypatch, nilai, headless):
+    monkeypatch.setenv("SCARPER_HEADLESS", nilai)
+    try:
+        modul = importlib.reload(scarper_lk)
+        assert modul.HEADLESS is headless
+    finally:
+        monkeypatch.delenv("SCARPER_HEADLESS")
+        importlib.reload(scarper_lk)
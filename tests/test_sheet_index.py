@@ -0,0 +1,92 @@
+import openpyxl
+import pytest
+
+import metrics
+import rekap_fundamental as rf
+
+SHEETS = ("1000000", "1210000", "2210000", "3312000", "4510000", "6000000")
+FILLER = 30
+TAIL = 100
+
+LABA_RUGI = [("Penjualan dan pendapatan usaha", 50), ("Jumlah laba bruto", 20), ("Jumlah laba (rugi)", 5)]
+
+
+def _write_report(path, kode, rows_per_sheet):
+    """Workbook dengan nama sheet tetap (1 template); rows_per_sheet: sheet -> [(label, nilai)]."""
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name in SHEETS:
+        ws = wb.create_sheet(name)
+        for i in range(FILLER):
+            ws.append([f"Keterangan {name} {i}", None])
+        for label, value in rows_per_sheet.get(name, []):
+            ws.append([label, value])
+        for i in range(TAIL):
+            ws.append([f"Rincian {name} {i}", i])
+    wb["1000000"].cell(row=1, column=1, value="Kode entitas")
+    wb["1000000"].cell(row=1, column=2, value=kode)
+    wb.save(path)
+    return str(path)
+
+
+def _report(tmp_path, kode, laba_rugi=LABA_RUGI, catatan=()):
+    return _write_report(tmp_path / f"{kode}.xlsx", kode, {
+        "2210000": [("Jumlah aset", 100), ("Jumlah liabilitas", 60)],
+        "3312000": list(laba_rugi),
+        "4510000": [("Jumlah arus kas bersih yang diperoleh dari (digunakan untuk) aktivitas operasi", 11)],
+        "6000000": list(catatan),
+    })
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    index = rf.SheetLocationIndex(None)
+    monkeypatch.setattr(rf, "_SHEET_INDEX", index)
+    return index
+
+
+def _extract(path, backend, use_index):
+    hasil = rf.fast_extract_all_metrics(path, backend=backend, use_index=use_index)
+    scan = [e for e in metrics.get_recorder().events if e["stage"] == "sheet_scan"][-1]
+    return hasil, scan
+
+
+@pytest.mark.parametrize("backend", sorted(rf._SHEET_READERS))
+def test_warm_template_scans_less_than_cold(tmp_path, fresh_index, backend):
+    _extract(_report(tmp_path, "AAAA"), backend, True)
+    path_b = _report(tmp_path, "BBBB")
+
+    cold, cold_scan = _extract(path_b, backend, False)
+    warm, warm_scan = _extract(path_b, backend, True)
+    assert warm == cold
+    assert warm_scan["rows_scanned"] < cold_scan["rows_scanned"]
+    assert warm_scan["sheets_visited"] < cold_scan["sheets_visited"]
+    assert (fresh_index.hits, fresh_index.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("backend", sorted(rf._SHEET_READERS))
+def test_miss_falls_back_to_full_scan_and_learns(tmp_path, fresh_index, backend):
+    _extract(_report(tmp_path, "AAAA"), backend, True)
+    # Template sama, tapi Laba Bruto (key template) pindah ke sheet di luar indeks
+    laba_rugi = [row for row in LABA_RUGI if row[0] != "Jumlah laba bruto"]
+    path_c = _report(tmp_path, "CCCC", laba_rugi, [("Jumlah laba bruto", 25), ("Jumlah dana syirkah temporer", 9)])
+
+    hasil, _ = _extract(path_c, backend, True)
+    assert hasil == rf.fast_extract_all_metrics(path_c, backend=backend, use_index=False)
+    assert hasil["Laba Bruto"] == 25
+    assert hasil["Dana Syirkah Temporer"] == 9
+    assert fresh_index.misses == 2
+
+    entry = fresh_index.hint(rf._template_signature(list(SHEETS)))
+    assert str(SHEETS.index("6000000")) in entry["sheets"]
+    assert "Dana Syirkah Temporer" in entry["keys"]
+
+
+@pytest.mark.parametrize("backend", sorted(rf._SHEET_READERS))
+def test_resumed_rows_match_full_read(tmp_path, backend):
+    reader = rf._SHEET_READERS[backend](_report(tmp_path, "AAAA"))
+    try:
+        full = list(reader.iter_rows(3))
+        assert list(reader.iter_rows(3, 10)) + list(reader.iter_rows(3, None, 11)) == full
+    finally:
+        reader.close()